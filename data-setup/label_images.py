@@ -3,9 +3,11 @@
 import argparse
 import dataclasses
 import glob
+import importlib
 import json
 import logging
 import os
+import sys
 
 import deeplay as dl
 import matplotlib.pyplot as plt
@@ -235,24 +237,26 @@ def _collect_detections(batch_detections, out_list):
             out_list.append(batch_detections)
 
 
-def _nms(detections, min_dist):
-    if min_dist <= 0 or len(detections) == 0:
-        return detections
-    arr = np.array(detections)
-    keep = []
-    suppressed = np.zeros(len(arr), dtype=bool)
-    for idx_i, det_i in enumerate(detections):
-        if suppressed[idx_i]:
-            continue
-        keep.append(det_i)
-        target_y, target_x = arr[idx_i, 0], arr[idx_i, 1]
-        for idx_j in range(idx_i + 1, len(arr)):
-            if suppressed[idx_j]:
-                continue
-            dist = np.sqrt((arr[idx_j, 0] - target_y) ** 2 + (arr[idx_j, 1] - target_x) ** 2)
-            if dist < min_dist:
-                suppressed[idx_j] = True
-    return keep
+def _import_from_tracking(module_name):
+    """Import a shared module (e.g. nms, frame_source) from ../particle-tracking."""
+    tracking_dir = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "particle-tracking"
+    )
+    if tracking_dir not in sys.path:
+        sys.path.append(tracking_dir)
+    return importlib.import_module(module_name)
+
+
+def _nms(all_detections, min_dist):
+    """Drop detections closer than min_dist to an earlier one in the same frame.
+
+    all_detections holds one (N, outputs) array of (y, x, ...) rows per frame; all frames
+    are suppressed in one call.
+    """
+    if min_dist <= 0:
+        return all_detections
+    keeps = _import_from_tracking("nms").suppress_close_batch(all_detections, min_dist)
+    return [np.asarray(dets)[keep] for dets, keep in zip(all_detections, keeps)]
 
 
 def _run_inference(lodestar, data_tensor, args, beta):
@@ -445,7 +449,7 @@ def main():
     all_detections = _run_inference(lodestar, data_tensor, args, 1.0 - args.alpha)
 
     if args.nms_distance > 0:
-        all_detections = [_nms(list(d), args.nms_distance) for d in all_detections]
+        all_detections = _nms(all_detections, args.nms_distance)
 
     _print_detection_summary(all_detections)
 
@@ -18,7 +18,7 @@ import tifffile
 from tqdm import tqdm
 
 # Reuse shared utilities from label_images
-from label_images import _nms, _load_model, _SaveConfig, _write_frame
+from label_images import _import_from_tracking, _nms, _load_model, _SaveConfig, _write_frame
 
 # Suppress pint logging
 logging.getLogger("pint").setLevel(logging.ERROR)
@@ -145,6 +145,8 @@ class AutolabelDataset(torch.utils.data.Dataset):
         self.items = items  # list of indices (for TIFF) or paths (for PNG)
         self.tif_path = tif_path
         self._tif = None
+        self._stack = None  # memory-mapped pages, opened lazily in each worker
+        self._stack_checked = False
 
     def __len__(self):
         return len(self.items)
@@ -154,12 +156,29 @@ class AutolabelDataset(torch.utils.data.Dataset):
             self._tif = tifffile.TiffFile(self.tif_path)
         return self._tif
 
+    def _get_stack(self):
+        """Memory-maps the pages of a contiguous, uncompressed TIFF as one (pages, H, W) array.
+
+        Returns None for compressed or fragmented files, which are read page by page.
+        """
+        if not self._stack_checked:
+            self._stack_checked = True
+            tif = self._get_tif()
+            shape = (len(tif.pages),) + tif.pages[0].shape
+            series = _import_from_tracking("frame_source").memmap_tiff_series(tif, self.tif_path)
+            if series is not None and series.size == np.prod(shape):
+                self._stack = series.reshape(shape)
+        return self._stack
+
     def __getitem__(self, idx):
         item = self.items[idx]
         if self.tif_path:
-            # Lazy read from TIFF
-            tif = self._get_tif()
-            frame = tif.pages[item].asarray()
+            # Lazy read from TIFF: slice the memory map when possible, else decode the page
+            stack = self._get_stack()
+            if stack is not None:
+                frame = np.array(stack[item], dtype=stack.dtype.newbyteorder("="))
+            else:
+                frame = self._get_tif().pages[item].asarray()
         else:
             # Read from PNG
             frame = cv2.imread(item, cv2.IMREAD_UNCHANGED)
@@ -222,16 +241,18 @@ def _detect_batch(batch_norm, ctx):
     if not isinstance(detections, list):
         detections = [detections]
 
-    # Post-processing: NMS for each frame in batch
-    processed_dets = []
-    for frame_dets in detections:
-        if frame_dets is None or np.isnan(frame_dets).any() or np.isinf(frame_dets).any():
-            processed_dets.append(None)
-            continue
-
-        if ctx.args.nms_distance > 0:
-            frame_dets = _nms(list(frame_dets), ctx.args.nms_distance)
-        processed_dets.append(frame_dets)
+    # Post-processing: NMS over the valid frames of the batch
+    valid = [
+        i
+        for i, frame_dets in enumerate(detections)
+        if frame_dets is not None
+        and not np.isnan(frame_dets).any()
+        and not np.isinf(frame_dets).any()
+    ]
+    processed_dets = [None] * len(detections)
+    kept = _nms([detections[i] for i in valid], ctx.args.nms_distance)
+    for i, frame_dets in zip(valid, kept):
+        processed_dets[i] = frame_dets
 
     return processed_dets
 
@@ -0,0 +1,173 @@
+"""
+Single-pass analysis pipeline for LAMMPS trajectory files.
+
+Instead of running hexatic_order_graph.py, velocity_graph.py and temp_graph.py as
+separate processes that each re-read the dump, the pipeline reads every frame once
+and feeds it to a set of registered observables. All plots and a combined CSV are
+written at the end.
+"""
+
+import functools
+import os
+from abc import ABC, abstractmethod
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from hexatic_order_analysis import frame_mean_psi6
+from hexatic_order_graph import plot_lammps_hexatic
+from lammps_parser import read_lammps_frames
+from parallel_frames import map_frames
+from temp_graph import frame_temperatures, plot_dump_temperatures
+from velocity_graph import frame_velocity_stats, plot_velocity_stats
+
+
+class Observable(ABC):
+    """
+    A per-frame quantity computed by the pipeline.
+
+    Subclasses list the CSV columns they produce, compute one value per column for a
+    frame (as a static method, so it can be sent to worker processes), and plot the
+    finished columns.
+    """
+
+    name = ""
+    columns = ()
+
+    @staticmethod
+    @abstractmethod
+    def compute(frame):
+        """Returns one value per entry of columns for a parsed frame."""
+
+    @classmethod
+    @abstractmethod
+    def plot(cls, filename, table, output_dir=None, no_show=False):
+        """Plots the finished columns of the pipeline's table."""
+
+
+class Psi6Observable(Observable):
+    name = "psi6"
+    columns = ("psi6_mean",)
+
+    @staticmethod
+    def compute(frame):
+        return (frame_mean_psi6(frame),)
+
+    @classmethod
+    def plot(cls, filename, table, output_dir=None, no_show=False):
+        plot_lammps_hexatic(
+            filename, table["timestep"].tolist(), table["psi6_mean"].tolist(), output_dir, no_show
+        )
+
+
+class VelocityObservable(Observable):
+    name = "velocity"
+    columns = ("velocity_mean", "velocity_std")
+
+    @staticmethod
+    def compute(frame):
+        return frame_velocity_stats(frame)
+
+    @classmethod
+    def plot(cls, filename, table, output_dir=None, no_show=False):
+        plot_velocity_stats(
+            filename,
+            table["timestep"].tolist(),
+            table["velocity_mean"].tolist(),
+            table["velocity_std"].tolist(),
+            output_dir,
+            no_show,
+        )
+
+
+class TemperatureObservable(Observable):
+    name = "temperature"
+    columns = ("temp_raw", "temp_corrected")
+
+    @staticmethod
+    def compute(frame):
+        temps = frame_temperatures(frame)
+        return (np.nan, np.nan) if temps is None else temps
+
+    @classmethod
+    def plot(cls, filename, table, output_dir=None, no_show=False):
+        valid = table.dropna(subset=list(cls.columns))
+        if valid.empty:
+            print("No valid temperature data found.")
+            return
+        plot_dump_temperatures(
+            filename,
+            valid["timestep"].tolist(),
+            valid["temp_raw"].tolist(),
+            valid["temp_corrected"].tolist(),
+            output_dir,
+            no_show,
+        )
+
+
+OBSERVABLES = {
+    observable.name: observable
+    for observable in (Psi6Observable, VelocityObservable, TemperatureObservable)
+}
+
+
+def _compute_frame(observables, frame):
+    """Evaluates every observable on one frame, returning a flat tuple of column values."""
+    values = []
+    for observable in observables:
+        values.extend(observable.compute(frame))
+    return tuple(values)
+
+
+def run_pipeline(filename, names=None, output_dir=None, no_show=False, workers=1):
+    """
+    Reads a LAMMPS dump once and computes all requested observables in the same pass.
+
+    Args:
+        filename (str or Path): Path to the LAMMPS trajectory file.
+        names (list of str, optional): Observables to compute (default: all in OBSERVABLES).
+        output_dir (str or Path, optional): Directory to save plots and the CSV.
+        no_show (bool, optional): If True, suppresses plot display.
+        workers (int, optional): Worker processes; frames are analyzed in parallel when
+            this is not 1 (0 = all cores).
+
+    Returns:
+        pd.DataFrame: one row per frame with a timestep column and every observable column.
+    """
+    filename = str(filename)
+    unknown = [name for name in names or () if name not in OBSERVABLES]
+    if unknown:
+        raise ValueError(f"Unknown observables {unknown}; choose from {list(OBSERVABLES)}")
+    observables = [OBSERVABLES[name] for name in (names or OBSERVABLES)]
+    compute = functools.partial(_compute_frame, observables)
+
+    print(f"Analyzing {filename} ({', '.join(o.name for o in observables)})...")
+    if workers != 1:
+        results = map_frames(filename, compute, workers=workers, verbose=1)
+    else:
+        results = [(frame["timestep"], compute(frame)) for frame in read_lammps_frames(filename)]
+
+    columns = [column for observable in observables for column in observable.columns]
+    table = pd.DataFrame([values for _, values in results], columns=columns)
+    table.insert(0, "timestep", [timestep for timestep, _ in results])
+
+    if table.empty:
+        print(f"No frames found in {filename}.")
+        return table
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    for observable in observables:
+        observable.plot(filename, table, output_dir, no_show)
+        plt.close("all")
+
+    base_name = os.path.basename(filename)
+    if "." in base_name:
+        base_name = base_name[: base_name.rfind(".")]
+    csv_path = f"{base_name}_analysis.csv"
+    if output_dir:
+        csv_path = os.path.join(output_dir, csv_path)
+    table.to_csv(csv_path, index=False)
+    print(f"Combined results saved to {csv_path}")
+    return table
@@ -2,6 +2,8 @@
 This module serves as a wrapper to run multiple analysis scripts
 (hexatic_order_graph.py, velocity_graph.py, temp_graph.py) on LAMMPS
 trajectory files. It can process individual files or directories of files.
+With --single-pass the same analyses run in-process over a single read of
+each dump (see analysis_pipeline.py).
 """
 
 import argparse
@@ -10,8 +12,10 @@ import subprocess
 import sys
 from pathlib import Path
 
+from lammps_parser import ensure_cache
 
-def run_script(script_name, file_path, output_dir=None, no_show=False):
+
+def run_script(script_name, file_path, output_dir=None, no_show=False, workers=1):
     """
     Executes a single analysis script on the target file.
 
@@ -20,6 +24,7 @@ def run_script(script_name, file_path, output_dir=None, no_show=False):
         file_path (str or Path): Path to the input file (e.g. .lammpstrj).
         output_dir (str or Path, optional): Directory to save output.
         no_show (bool, optional): If True, suppresses plot display.
+        workers (int, optional): Worker processes for frame-parallel analysis.
     """
     # Resolve script path relative to this script's location
     script_dir = Path(__file__).resolve().parent
@@ -38,6 +43,9 @@ def run_script(script_name, file_path, output_dir=None, no_show=False):
     if no_show:
         cmd.append("--no-show")
 
+    if workers != 1:
+        cmd.extend(["--workers", str(workers)])
+
     print(f"Running {script_name} on {file_path}...")
     try:
         subprocess.run(cmd, check=True)
@@ -45,7 +53,15 @@ def run_script(script_name, file_path, output_dir=None, no_show=False):
         print(f"Error running {script_name}: {e}")
 
 
-def process_file(file_path, output_dir=None, no_show=False):
+def process_file(
+    file_path,
+    output_dir=None,
+    no_show=False,
+    cache=False,
+    workers=1,
+    single_pass=False,
+    observables=None,
+):
     """
     Runs all analysis scripts on a single LAMMPS trajectory file.
 
@@ -53,10 +69,29 @@ def process_file(file_path, output_dir=None, no_show=False):
         file_path (str or Path): Path to the input file.
         output_dir (str or Path, optional): Directory to save output.
         no_show (bool, optional): If True, suppresses plot display.
+        cache (bool, optional): If True, converts the dump to a columnar cache first so
+            each script loads the binary cache instead of re-parsing the text.
+        workers (int, optional): Worker processes for frame-parallel analysis.
+        single_pass (bool, optional): If True, computes every observable in one read of
+            the dump in this process instead of running each script as a subprocess.
+        observables (list of str, optional): With single_pass, the observables to compute
+            (default: all; see analysis_pipeline.OBSERVABLES).
     """
+    if cache:
+        print(f"Caching {file_path}...")
+        ensure_cache(file_path)
+
+    if single_pass:
+        from analysis_pipeline import run_pipeline
+
+        run_pipeline(
+            file_path, observables, output_dir=output_dir, no_show=no_show, workers=workers
+        )
+        return
+
     scripts = ["hexatic_order_graph.py", "velocity_graph.py", "temp_graph.py"]
     for script in scripts:
-        run_script(script, file_path, output_dir, no_show)
+        run_script(script, file_path, output_dir, no_show, workers)
 
 
 def main():
@@ -74,7 +109,33 @@ def main():
     parser.add_argument(
         "--no-show", action="store_true", help="Do not display the graphs interactively."
     )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Convert each dump to a binary columnar cache once and analyze from it.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for frame-parallel analysis (0 = all cores)",
+    )
+    parser.add_argument(
+        "--single-pass",
+        action="store_true",
+        help="Read each dump once and compute all observables in-process, "
+        "writing every plot plus a combined CSV.",
+    )
+    parser.add_argument(
+        "--observables",
+        nargs="+",
+        metavar="NAME",
+        default=None,
+        help="With --single-pass, only compute these observables (psi6, velocity, temperature).",
+    )
     args = parser.parse_args()
+    if args.observables and not args.single_pass:
+        parser.error("--observables requires --single-pass")
 
     input_path = Path(args.input_path)
     output_dir = args.output_dir
@@ -85,7 +146,15 @@ def main():
 
     if input_path.is_file():
         if input_path.suffix == ".lammpstrj":
-            process_file(input_path, output_dir, no_show)
+            process_file(
+                input_path,
+                output_dir,
+                no_show,
+                args.cache,
+                args.workers,
+                args.single_pass,
+                args.observables,
+            )
         else:
             print(f"Error: {input_path} is not a .lammpstrj file.")
             sys.exit(1)
@@ -98,7 +167,15 @@ def main():
 
         print(f"Found {len(files)} files processing...")
         for file_path in files:
-            process_file(file_path, output_dir, no_show)
+            process_file(
+                file_path,
+                output_dir,
+                no_show,
+                args.cache,
+                args.workers,
+                args.single_pass,
+                args.observables,
+            )
 
     else:
         print(f"Error: {input_path} does not exist.")
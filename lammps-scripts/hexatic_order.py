@@ -7,7 +7,6 @@ from particle position data.
 """
 
 import ast
-import math
 import os
 
 import matplotlib.patches as mpatches
@@ -79,37 +78,25 @@ def draw_voronoi(points):
 
 
 def hexatic_order(points):
-    """Calculate the hexatic order parameter for each particle."""
+    """Calculate the hexatic order parameter for each particle.
+
+    Uses each particle's seven nearest neighbours (the particle itself included).
+    Neighbours directly above or below a particle (zero x offset) are skipped, which
+    also drops the particle itself. The whole neighbour array is processed at once.
+    """
     neighbors_model = NearestNeighbors(n_neighbors=7, algorithm="ball_tree").fit(points)
     _, indices = neighbors_model.kneighbors(points)
 
-    angle_array = []
-    # Loops through each point in points using range function
-    for i in range(len(indices)):
-        angle_array_row = []
-        # loops through seven nearest neighbors of the current point
-        for j in range(7):
-            index_neighbor = indices[i][j]
-            neighbor_x = points[index_neighbor, 0]
-            neighbor_y = points[index_neighbor, 1]
-            original_x = points[i, 0]
-            original_y = points[i, 1]
-
-            delta_x = neighbor_x - original_x
-            delta_y = neighbor_y - original_y
-            if delta_x != 0:
-                angle = math.atan(delta_y / delta_x)
-                angle_array_row.append(angle)
-        angle_array.append(angle_array_row)
-
-    hexatic_order_params = []
-    for i in range(len(angle_array)):
-        hex_sum = 0
-        for j in range(len(angle_array[i])):
-            hex_sum += np.exp(complex(0, 6 * angle_array[i][j]))
-
-        hexatic_order_params.append(abs(hex_sum) / 6)
-    return hexatic_order_params
+    # Offsets from each point to its neighbours, shape (N, 7)
+    delta_x = points[indices, 0] - points[:, 0, np.newaxis]
+    delta_y = points[indices, 1] - points[:, 1, np.newaxis]
+
+    # exp(6i * atan(dy/dx)) == exp(6i * atan2(dy, dx)): the two angles differ by a
+    # multiple of pi, which vanishes after multiplying by 6.
+    bond_phases = np.exp(6j * np.arctan2(delta_y, delta_x))
+    bond_phases[delta_x == 0] = 0
+
+    return np.abs(bond_phases.sum(axis=1)) / 6
 
 
 def draw_histogram(points):
@@ -4,67 +4,299 @@ hexatic order parameter using the freud library.
 """
 
 import argparse
+import functools
 
 import freud
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
-from lammps_parser import parse_lammps_dump
+from lammps_parser import read_lammps_frames
+from parallel_frames import map_frames
 
 
-def _process_box(box_lines):
-    """Parses box bounds from list of strings."""
-    x_range = [float(x) for x in box_lines[0].split()]
-    y_range = [float(y) for y in box_lines[1].split()]
-
-    box_lx = x_range[1] - x_range[0]
-    box_ly = y_range[1] - y_range[0]
+def _process_box(box_bounds):
+    """Builds a 2-D freud box from a (3, 2) array of box bounds."""
+    box_lx = box_bounds[0, 1] - box_bounds[0, 0]
+    box_ly = box_bounds[1, 1] - box_bounds[1, 0]
     return freud.Box(Lx=box_lx, Ly=box_ly, is2D=True)
 
 
-def _process_atoms(atom_lines):
+def _process_atoms(atoms):
     """
-    Parses atom data from list of strings.
+    Extracts positions from a structured atom array.
     Returns positions array (Nx3).
     """
-    data_list = [line.split() for line in atom_lines]
-    data = np.array(data_list, dtype=float)
-    positions = data[:, 2:4]  # Grab x and y columns (index 2 and 3)
     # Add a zero z-column for freud compatibility
-    return np.column_stack((positions, np.zeros(len(atom_lines))))
+    return np.column_stack((atoms["x"], atoms["y"], np.zeros(len(atoms))))
+
+
+def frame_mean_psi6(frame):
+    """Computes the mean |psi6| of a single parsed frame."""
+    current_box = _process_box(frame["box_bounds"])
+    positions = _process_atoms(frame["atoms"])
+
+    # Calculate Hexatic Order
+    hexatic_order_calculator = freud.order.Hexatic(k=6)
+    hexatic_order_calculator.compute(
+        system=(current_box, positions), neighbors={"num_neighbors": 6}
+    )
+
+    # Magnitude of psi6 for each atom
+    mag_psi6 = np.abs(hexatic_order_calculator.particle_order)
+    return np.mean(mag_psi6)
+
+
+class HexaticNeighborReuse:
+    """
+    Reuses freud state across frames when computing psi6 with 6 nearest neighbours.
+
+    The freud box is kept until the box size changes. Neighbour lists
+    use a Verlet-style skin: at each rebuild an AABB query collects, for every particle,
+    all candidates within (distance to its 6th neighbour + 2 * skin). If no particle has
+    moved more than D <= skin / 2 since the rebuild, every pair distance has changed by
+    at most 2 * D, so:
+
+    * the 6 nearest neighbours of every particle are still among its candidates, and
+    * a particle whose 7th neighbour was more than 4 * D further away than its 6th at
+      the rebuild still has the same 6 neighbours.
+
+    Each frame therefore keeps the rebuild neighbours of most particles, re-ranks the
+    candidates of the few with near-ties, and only rebuilds once some particle has moved
+    more than skin / 2, or the set of particles changes. psi6 is then evaluated directly
+    from the neighbour bond vectors with the same (unweighted, k = 6) definition as
+    freud.order.Hexatic, which avoids building a freud NeighborList every frame.
+    """
+
+    def __init__(self, skin, num_neighbors=6, num_candidates=18):
+        self.skin = float(skin)
+        self.num_neighbors = num_neighbors
+        self.num_candidates = max(num_candidates, num_neighbors + 1)
+        self.box = None
+        self.particle_order = None
+        self.rebuilds = 0
+        self._box_lengths = None
+        self._ids = None
+        self._reference = None
+        self._candidates = None
+        self._neighbors = None
+        self._gaps = None
+
+    def _update_box(self, box_lx, box_ly):
+        if self._box_lengths != (box_lx, box_ly):
+            self.box = freud.Box(Lx=box_lx, Ly=box_ly, is2D=True)
+            self._box_lengths = (box_lx, box_ly)
+            self._reference = None
+
+    def _minimum_image(self, vectors):
+        lengths = np.array(self._box_lengths)
+        vectors[..., :2] -= lengths * np.round(vectors[..., :2] / lengths)
+        return vectors
+
+    def _max_displacement(self, positions, ids):
+        """Largest displacement since the last rebuild, or None if a rebuild is needed."""
+        if self._reference is None or len(positions) != len(self._reference):
+            return None
+        if ids is not None and (self._ids is None or not np.array_equal(ids, self._ids)):
+            return None
+        displacement = self._minimum_image(positions[:, :2] - self._reference[:, :2])
+        max_displacement = np.sqrt(np.max(np.einsum("ij,ij->i", displacement, displacement)))
+        return max_displacement if max_displacement <= self.skin / 2 else None
+
+    def _rebuild(self, positions, ids):
+        num_points = len(positions)
+        # Frames with fewer than num_neighbors + 1 particles use every other particle,
+        # as freud does
+        num_found = min(self.num_candidates, num_points - 1)
+        k = min(self.num_neighbors, num_found)
+        wrapped = self.box.wrap(positions)
+        query = freud.locality.AABBQuery(self.box, wrapped)
+        nlist = query.query(
+            wrapped, {"num_neighbors": num_found, "exclude_ii": True}
+        ).toNeighborList()
+        pair_i = nlist.query_point_indices.astype(np.intp)
+        pair_j = nlist.point_indices.astype(np.intp)
+        distances = nlist.distances.astype(np.float64)
+
+        table, table_distances = self._to_table(num_points, pair_i, pair_j, distances)
+        cutoff = table_distances[:, k - 1] + 2 * self.skin
+
+        # Particles whose kNN candidates may stop short of the cutoff need a radius query
+        if num_found < num_points - 1:
+            incomplete = np.flatnonzero(table_distances[:, num_found - 1] <= cutoff)
+        else:
+            incomplete = np.empty(0, dtype=np.intp)
+        if len(incomplete):
+            extra_i, extra_j, extra_distances = self._pairs_within(
+                wrapped, incomplete, float(cutoff[incomplete].max()) * (1 + 1e-6), query
+            )
+            redo = np.isin(pair_i, incomplete)
+            pair_i = np.concatenate((pair_i[~redo], extra_i))
+            pair_j = np.concatenate((pair_j[~redo], extra_j))
+            distances = np.concatenate((distances[~redo], extra_distances))
+
+        keep = distances <= cutoff[pair_i]
+        table, table_distances = self._to_table(
+            num_points, pair_i[keep], pair_j[keep], distances[keep]
+        )
+        self._candidates = table
+        self._neighbors = table[:, :k].copy()
+        self._gaps = table_distances[:, k] - table_distances[:, k - 1]
+        self._reference = positions.copy()
+        self._ids = None if ids is None else ids.copy()
+        self.rebuilds += 1
+
+    def _pairs_within(self, wrapped, rows, r_max, query):
+        """
+        Returns (i, j, distance) for every j within r_max of the particles in rows.
+
+        freud only accepts radius queries below half the box length; larger cutoffs
+        (small or sparse frames) fall back to minimum-image distances to every particle.
+        """
+        if r_max < min(self._box_lengths) / 2:
+            extra = query.query(wrapped[rows], {"r_max": r_max}).toNeighborList()
+            extra_i = rows[extra.query_point_indices]
+            extra_j = extra.point_indices.astype(np.intp)
+            keep = extra_i != extra_j
+            return extra_i[keep], extra_j[keep], extra.distances[keep].astype(np.float64)
+
+        vectors = self._minimum_image(wrapped[None, :, :2] - wrapped[rows, None, :2])
+        distances = np.sqrt(np.einsum("ijk,ijk->ij", vectors, vectors))
+        distances[np.arange(len(rows)), rows] = np.inf
+        row, extra_j = np.nonzero(distances <= r_max)
+        return rows[row], extra_j, distances[row, extra_j]
+
+    @staticmethod
+    def _to_table(num_points, pair_i, pair_j, distances):
+        """
+        Packs (i, j) pairs into an (N, width) table of j indices sorted by distance,
+        padded with -1, and the matching distance table padded with inf.
+        """
+        order = np.lexsort((distances, pair_i))
+        sorted_i = pair_i[order]
+        rank = np.arange(len(order)) - np.searchsorted(sorted_i, sorted_i, side="left")
+        width = int(rank.max()) + 2 if len(rank) else 1
+        table = np.full((num_points, width), -1, dtype=np.intp)
+        table_distances = np.full((num_points, width), np.inf)
+        table[sorted_i, rank] = pair_j[order]
+        table_distances[sorted_i, rank] = distances[order]
+        return table, table_distances
+
+    def _rerank(self, positions, rows):
+        """Picks the 6 nearest candidates of the given particles at their current positions."""
+        candidates = self._candidates[rows]
+        vectors = self._minimum_image(positions[candidates, :2] - positions[rows, None, :2])
+        distances = np.einsum("ijk,ijk->ij", vectors, vectors)
+        distances[candidates < 0] = np.inf
+        k = self._neighbors.shape[1]
+        nearest = np.argpartition(distances, k - 1, axis=1)
+        return np.take_along_axis(candidates, nearest[:, :k], axis=1)
+
+    def compute(self, box_lx, box_ly, positions, ids=None):
+        """
+        Returns the mean |psi6| of one frame.
+
+        Args:
+            box_lx, box_ly (float): Box side lengths.
+            positions (np.ndarray): (N, 3) positions with z = 0.
+            ids (np.ndarray, optional): Particle identities in the same (stable) order as
+                positions; a change of identities forces a neighbour-list rebuild.
+        """
+        self._update_box(box_lx, box_ly)
+        positions = np.asarray(positions, dtype=np.float64)
+        max_displacement = self._max_displacement(positions, ids)
+        if max_displacement is None:
+            self._rebuild(positions, ids)
+            neighbors = self._neighbors
+        else:
+            neighbors = self._neighbors.copy()
+            ties = np.flatnonzero(self._gaps <= 4 * max_displacement)
+            if len(ties):
+                neighbors[ties] = self._rerank(positions, ties)
+
+        bonds = self._minimum_image(positions[neighbors, :2] - positions[:, None, :2])
+        self.particle_order = np.mean(np.exp(6j * np.arctan2(bonds[..., 1], bonds[..., 0])), axis=1)
+        return np.mean(np.abs(self.particle_order))
+
+
+def _frame_mean_psi6_reused(frame, reuse):
+    """Computes the mean |psi6| of a parsed frame through a HexaticNeighborReuse."""
+    atoms = frame["atoms"]
+    if "id" in frame["columns"]:
+        atoms = atoms[np.argsort(atoms["id"], kind="stable")]
+        ids = atoms["id"]
+    else:
+        ids = None
+    box_bounds = frame["box_bounds"]
+    return reuse.compute(
+        box_bounds[0, 1] - box_bounds[0, 0],
+        box_bounds[1, 1] - box_bounds[1, 0],
+        _process_atoms(atoms),
+        ids,
+    )
+
+
+_WORKER_REUSE = {}
+
+
+def _frame_mean_psi6_worker_reuse(frame, skin):
+    """
+    Per-process HexaticNeighborReuse for frame-parallel runs.
+
+    parse_and_calc_hexatic gives each worker one contiguous range of frames, so
+    consecutive calls in a process see consecutive frames and the neighbour lists carry
+    over. Compressed dumps are handed out in interleaved batches instead; results stay
+    correct because a jump between frames exceeds the skin and forces a rebuild.
+    """
+    if skin not in _WORKER_REUSE:
+        _WORKER_REUSE[skin] = HexaticNeighborReuse(skin)
+    return _frame_mean_psi6_reused(frame, _WORKER_REUSE[skin])
 
 
-def parse_and_calc_hexatic(filename, verbose=1):
+def parse_and_calc_hexatic(filename, verbose=1, workers=1, skin=None, last=None):
     """
     Parses a LAMMPS trajectory file and calculates the hexatic order parameter.
 
     Args:
         filename (str): Path to the LAMMPS trajectory file.
         verbose (int): Verbosity level (default: 1).
+        workers (int): Worker processes; frames are analyzed in parallel when this is
+            not 1 (0 = all cores).
+        skin (float, optional): Enables frame-to-frame reuse of the box and neighbour
+            lists (see HexaticNeighborReuse) with this Verlet skin distance.
+        last (int, optional): Only analyze the final `last` frames, found by seeking back
+            from the end of the file; these are always processed serially.
 
     Returns:
         tuple: A tuple containing two lists: steps and mean psi6 values.
     """
+    if skin is None:
+        frame_psi6 = frame_mean_psi6
+    elif workers != 1:
+        frame_psi6 = functools.partial(_frame_mean_psi6_worker_reuse, skin=skin)
+    else:
+        frame_psi6 = functools.partial(_frame_mean_psi6_reused, reuse=HexaticNeighborReuse(skin))
+
+    if workers != 1 and last is None:
+        # Neighbour reuse needs consecutive frames, so each worker gets one contiguous range
+        results = map_frames(
+            filename,
+            frame_psi6,
+            workers=workers,
+            chunks_per_worker=4 if skin is None else 1,
+            verbose=verbose,
+        )
+    else:
+        results = (
+            (frame["timestep"], frame_psi6(frame))
+            for frame in read_lammps_frames(filename, last=last)
+        )
+
     steps = []
     psi6_means = []
 
-    for frame in parse_lammps_dump(filename):
-        step = frame["timestep"]
+    for step, mean_psi6 in results:
         steps.append(step)
-
-        current_box = _process_box(frame["box_bounds"])
-        positions = _process_atoms(frame["atoms"])
-
-        # Calculate Hexatic Order
-        hexatic_order_calculator = freud.order.Hexatic(k=6)
-        hexatic_order_calculator.compute(
-            system=(current_box, positions), neighbors={"num_neighbors": 6}
-        )
-
-        # Magnitude of psi6 for each atom
-        mag_psi6 = np.abs(hexatic_order_calculator.particle_order)
-        mean_psi6 = np.mean(mag_psi6)
         psi6_means.append(mean_psi6)
 
         if verbose:
@@ -73,7 +305,7 @@ def parse_and_calc_hexatic(filename, verbose=1):
     return steps, psi6_means
 
 
-def calc_hexatic_from_tracks(df, frame_width, frame_height, verbose=1):
+def calc_hexatic_from_tracks(df, frame_width, frame_height, verbose=1, skin=None):
     """Calculate hexatic order per frame from a particle tracking DataFrame.
 
     Args:
@@ -81,22 +313,32 @@ def calc_hexatic_from_tracks(df, frame_width, frame_height, verbose=1):
         frame_width: Image width in pixels — used as freud box Lx
         frame_height: Image height in pixels — used as freud box Ly
         verbose: print per-frame values when 1
+        skin: Verlet skin distance in pixels; enables neighbour-list reuse across frames
+            (see HexaticNeighborReuse). Requires a track_id column to match particles.
 
     Returns:
         tuple: (frames, psi6_means) — parallel lists, same signature as parse_and_calc_hexatic
     """
     box = freud.Box(Lx=frame_width, Ly=frame_height, is2D=True)
+    reuse = HexaticNeighborReuse(skin) if skin is not None and "track_id" in df.columns else None
     frames_out, psi6_means = [], []
 
     for frame_idx, group in df.groupby("frame"):
+        if reuse is not None:
+            group = group.sort_values("track_id", kind="stable")
         positions = group[["x", "y"]].to_numpy()
         if len(positions) < 6:
             continue
         positions_3d = np.column_stack((positions, np.zeros(len(positions))))
 
-        hexatic = freud.order.Hexatic(k=6)
-        hexatic.compute(system=(box, positions_3d), neighbors={"num_neighbors": 6})
-        mean_psi6 = float(np.mean(np.abs(hexatic.particle_order)))
+        if reuse is not None:
+            mean_psi6 = float(
+                reuse.compute(frame_width, frame_height, positions_3d, group["track_id"].to_numpy())
+            )
+        else:
+            hexatic = freud.order.Hexatic(k=6)
+            hexatic.compute(system=(box, positions_3d), neighbors={"num_neighbors": 6})
+            mean_psi6 = float(np.mean(np.abs(hexatic.particle_order)))
 
         frames_out.append(int(frame_idx))
         psi6_means.append(mean_psi6)
@@ -111,9 +353,29 @@ def main():
     parser.add_argument(
         "filename", nargs="?", default="dump.lammps", help="Path to LAMMPS dump file"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for frame-parallel analysis (0 = all cores)",
+    )
+    parser.add_argument(
+        "--neighbor-skin",
+        type=float,
+        default=None,
+        help="Reuse neighbour lists across frames with this Verlet skin distance",
+    )
+    parser.add_argument(
+        "--last-frames",
+        type=int,
+        default=None,
+        help="Only analyze the final N frames, read by seeking back from the end of the file",
+    )
     args = parser.parse_args()
 
-    timesteps, values = parse_and_calc_hexatic(args.filename)
+    timesteps, values = parse_and_calc_hexatic(
+        args.filename, workers=args.workers, skin=args.neighbor_skin, last=args.last_frames
+    )
 
     plt.figure(figsize=(10, 6))
     plt.plot(timesteps, values, "o-", color="#2c3e50")
@@ -12,6 +12,25 @@ import pandas as pd
 from hexatic_order_analysis import calc_hexatic_from_tracks, parse_and_calc_hexatic
 from phase_diagram import extract_epsilon_and_molecules
 
+# Only these track columns are needed for the hexatic order (track_id for neighbour reuse)
+TRACK_COLUMNS = ["frame", "x", "y", "track_id"]
+
+
+def read_track_table(path):
+    """
+    Loads the columns needed for hexatic order from a particle-tracking output file,
+    choosing the reader from the suffix (.csv, .parquet, .feather, .h5/.hdf5).
+    Columnar formats only read those columns from disk.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == ".parquet":
+        return pd.read_parquet(path, columns=TRACK_COLUMNS)
+    if suffix == ".feather":
+        return pd.read_feather(path, columns=TRACK_COLUMNS)
+    if suffix in (".h5", ".hdf5"):
+        return pd.read_hdf(path, "tracks", columns=TRACK_COLUMNS)
+    return pd.read_csv(path, usecols=lambda column: column in TRACK_COLUMNS)
+
 
 def main():
     """Main function to parse arguments and plot hexatic order."""
@@ -28,7 +47,10 @@ def main():
     parser.add_argument("--no-show", action="store_true", help="Do not display the graph")
     parser.add_argument(
         "--tracks-csv",
-        help="Path to tracks.csv from particle tracking (alternative to LAMMPS file)",
+        "--tracks",
+        dest="tracks_csv",
+        help="Path to the tracks file from particle tracking (.csv, .parquet, .feather or .h5; "
+        "alternative to LAMMPS file)",
     )
     parser.add_argument(
         "--image-width", type=int, help="Frame width in pixels (required with --tracks-csv)"
@@ -36,14 +58,28 @@ def main():
     parser.add_argument(
         "--image-height", type=int, help="Frame height in pixels (required with --tracks-csv)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for frame-parallel analysis (0 = all cores)",
+    )
+    parser.add_argument(
+        "--neighbor-skin",
+        type=float,
+        default=None,
+        help="Reuse neighbour lists across frames with this Verlet skin distance",
+    )
     args = parser.parse_args()
 
     if args.tracks_csv:
         if not args.image_width or not args.image_height:
             parser.error("--image-width and --image-height are required with --tracks-csv")
 
-        df = pd.read_csv(args.tracks_csv)
-        frames, hexatic_order = calc_hexatic_from_tracks(df, args.image_width, args.image_height)
+        df = read_track_table(args.tracks_csv)
+        frames, hexatic_order = calc_hexatic_from_tracks(
+            df, args.image_width, args.image_height, skin=args.neighbor_skin
+        )
 
         plt.figure(figsize=(10, 6))
         plt.plot(frames, hexatic_order, alpha=0.7)
@@ -67,44 +103,48 @@ def main():
         return
 
     if args.filename:
-        filepath = args.filename
-
-        plt.figure(figsize=(10, 6))
-        filename = os.path.basename(filepath)
-
-        num_molecules, epsilon = extract_epsilon_and_molecules(filename)
-
-        frames, hexatic_order = parse_and_calc_hexatic(filepath)
-
-        label_str = f"N={num_molecules}, ε={epsilon}"
-        plt.plot(frames, hexatic_order, label=label_str, alpha=0.7)
-
-        plt.xlabel("Frame")
-        plt.ylabel(r"Global Hexatic Order $|\Psi_6|$")
-        plt.title(f"Hexatic Order Parameter: N={num_molecules}, ε={epsilon}")
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-
-        if "." in filename:
-            base = filename[: filename.rfind(".")]
-        else:
-            base = filename
-
-        output_filename = f"{base}_hexatic_order.png"
-
-        if args.output_dir:
-            # Ensure output directory exists if provided
-            if not os.path.exists(args.output_dir):
-                os.makedirs(args.output_dir)
-            output_path = os.path.join(args.output_dir, output_filename)
-        else:
-            output_path = output_filename
-
-        plt.savefig(output_path, dpi=300)
-        print(f"Graph saved to {output_path}")
-        if not args.no_show:
-            plt.show()
+        frames, hexatic_order = parse_and_calc_hexatic(
+            args.filename, workers=args.workers, skin=args.neighbor_skin
+        )
+        plot_lammps_hexatic(args.filename, frames, hexatic_order, args.output_dir, args.no_show)
+
+
+def plot_lammps_hexatic(filepath, frames, hexatic_order, output_dir=None, no_show=False):
+    """Plot per-frame hexatic order already computed from a LAMMPS trajectory file."""
+    plt.figure(figsize=(10, 6))
+    filename = os.path.basename(filepath)
+
+    num_molecules, epsilon = extract_epsilon_and_molecules(filename)
+
+    label_str = f"N={num_molecules}, ε={epsilon}"
+    plt.plot(frames, hexatic_order, label=label_str, alpha=0.7)
+
+    plt.xlabel("Frame")
+    plt.ylabel(r"Global Hexatic Order $|\Psi_6|$")
+    plt.title(f"Hexatic Order Parameter: N={num_molecules}, ε={epsilon}")
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+
+    if "." in filename:
+        base = filename[: filename.rfind(".")]
+    else:
+        base = filename
+
+    output_filename = f"{base}_hexatic_order.png"
+
+    if output_dir:
+        # Ensure output directory exists if provided
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        output_path = os.path.join(output_dir, output_filename)
+    else:
+        output_path = output_filename
+
+    plt.savefig(output_path, dpi=300)
+    print(f"Graph saved to {output_path}")
+    if not no_show:
+        plt.show()
 
 
 if __name__ == "__main__":
@@ -2,11 +2,331 @@
 Shared utilities for parsing LAMMPS dump files.
 """
 
+import argparse
+import collections
+import contextlib
+import gzip
+import io
+import json
+import lzma
+import mmap
+import os
+import shutil
+import struct
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+# Per-atom attributes that LAMMPS always writes as integers. Every other column in
+# an ``ITEM: ATOMS`` header is read as float64 (element names are the one string case).
+INT_COLUMNS = {"id", "mol", "proc", "procp1", "type", "ix", "iy", "iz"}
+STR_COLUMNS = {"element"}
+
+
+def atom_dtype(columns):
+    """Build a structured NumPy dtype for the given ``ITEM: ATOMS`` column names."""
+    fields = []
+    for name in columns:
+        if name in INT_COLUMNS:
+            fields.append((name, np.int64))
+        elif name in STR_COLUMNS:
+            fields.append((name, "U16"))
+        else:
+            fields.append((name, np.float64))
+    return np.dtype(fields)
+
+
+def parse_atom_header(atom_header):
+    """Return the column names listed after ``ITEM: ATOMS``."""
+    return atom_header.split()[2:]
+
+
+def parse_box_bounds(box_lines):
+    """
+    Parses the three box bound lines into a float array.
+
+    Returns:
+        np.ndarray: shape (3, 2) for orthogonal boxes, (3, 3) when tilt factors are present.
+    """
+    return np.array([line.split() for line in box_lines], dtype=np.float64)
+
+
+def parse_atoms(atom_lines, columns):
+    """
+    Parses an ATOMS block into a structured array keyed by column name in one bulk call.
+
+    Args:
+        atom_lines (list of str or str): Raw atom lines, or the block joined as one string.
+        columns (list of str): Column names from the ``ITEM: ATOMS`` header.
+
+    Returns:
+        np.ndarray: 1-D structured array with one field per column.
+    """
+    dtype = atom_dtype(columns)
+    if isinstance(atom_lines, str):
+        atom_lines = atom_lines.splitlines()
+    if len(atom_lines) == 0:
+        return np.empty(0, dtype=dtype)
+    return np.loadtxt(atom_lines, dtype=dtype, ndmin=1)
+
+
+# ---------------------------------------------------------------------------
+# Compressed dumps
+# ---------------------------------------------------------------------------
+
+# File suffix -> compression; anything else is read as plain text
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".xz": "xz", ".zst": "zstd"}
+
+# Skippable-frame and footer magic numbers of the zstd seekable format
+ZSTD_SKIPPABLE_MAGIC = 0x184D2A5E
+ZSTD_SEEKABLE_MAGIC = 0x8F92EAB1
+
+
+def compression_of(filename):
+    """Returns "gzip", "xz" or "zstd" for compressed dump files, or None for plain text."""
+    return COMPRESSION_SUFFIXES.get(os.path.splitext(str(filename))[1].lower())
+
+
+def _zstd_seek_table(raw_file):
+    """
+    Reads the seek table of a zstd file written in the seekable format (independent
+    frames followed by a skippable frame listing their sizes).
+
+    Returns:
+        np.ndarray or None: (num_frames, 2) compressed and decompressed frame sizes, or
+        None if the file has no seek table.
+    """
+    size = raw_file.seek(0, os.SEEK_END)
+    if size < 17:
+        return None
+    raw_file.seek(size - 9)
+    num_frames, descriptor, magic = struct.unpack("<IBI", raw_file.read(9))
+    if magic != ZSTD_SEEKABLE_MAGIC:
+        return None
+
+    entry_size = 12 if descriptor & 0x80 else 8
+    table_size = num_frames * entry_size
+    if size < table_size + 17:
+        return None
+    raw_file.seek(size - 17 - table_size)
+    skippable_magic, frame_size = struct.unpack("<II", raw_file.read(8))
+    if skippable_magic != ZSTD_SKIPPABLE_MAGIC or frame_size != table_size + 9:
+        return None
+    entries = np.frombuffer(raw_file.read(table_size), dtype="<u4")
+    return entries.reshape(num_frames, entry_size // 4)[:, :2].astype(np.int64)
+
+
+class _ParallelZstdReader(io.RawIOBase):
+    """
+    Streams a seekable zstd file, decompressing its independent frames on a thread pool.
+
+    Compressed frames are read sequentially and handed to the pool with a bounded
+    read-ahead of two frames per thread; decompressed frames are returned in order.
+    zstandard releases the GIL while decompressing, so throughput scales with threads.
+    """
+
+    def __init__(self, filename, frame_sizes, threads):
+        import zstandard
+
+        self._zstandard = zstandard
+        self._frame_sizes = iter(frame_sizes.tolist())
+        self._pending = collections.deque()
+        self._buffer = memoryview(b"")
+        # The file and pool live until close(); the stack only releases them on failure
+        with contextlib.ExitStack() as stack:
+            self._file = stack.enter_context(open(filename, "rb"))
+            self._pool = stack.enter_context(ThreadPoolExecutor(max_workers=threads))
+            for _ in range(2 * threads):
+                self._submit_next()
+            stack.pop_all()
+
+    def _decompress(self, data, decompressed_size):
+        return self._zstandard.ZstdDecompressor().decompress(
+            data, max_output_size=decompressed_size
+        )
+
+    def _submit_next(self):
+        sizes = next(self._frame_sizes, None)
+        if sizes is not None:
+            data = self._file.read(sizes[0])
+            self._pending.append(self._pool.submit(self._decompress, data, sizes[1]))
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._buffer:
+            if not self._pending:
+                return 0
+            self._buffer = memoryview(self._pending.popleft().result())
+            self._submit_next()
+        count = min(len(buffer), len(self._buffer))
+        buffer[:count] = self._buffer[:count]
+        self._buffer = self._buffer[count:]
+        return count
+
+    def close(self):
+        if not self.closed:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._file.close()
+        super().close()
+
+
+def _open_zstd(filename, threads=None):
+    """Opens a zstd dump as a binary stream, in parallel when it has a seek table."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            f"Reading {filename} requires the 'zstandard' package. Run 'pip install zstandard'."
+        ) from e
+
+    threads = threads or os.cpu_count() or 1
+    with open(filename, "rb") as raw_file:
+        seek_table = _zstd_seek_table(raw_file)
+    if seek_table is not None and threads > 1 and len(seek_table) > 1:
+        return io.BufferedReader(_ParallelZstdReader(filename, seek_table, threads))
+
+    # The stream reader owns raw_file (closefd=True) and closes it with the returned stream
+    with contextlib.ExitStack() as stack:
+        raw_file = stack.enter_context(open(filename, "rb"))
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            raw_file, read_across_frames=True, closefd=True
+        )
+        stack.pop_all()
+    return io.BufferedReader(reader)
+
+
+def open_dump(filename, binary=False, threads=None):
+    """
+    Opens a dump file for streaming reads, decompressing .gz, .xz and .zst files on the
+    fly.
+
+    Args:
+        filename (str): Path to the dump file.
+        binary (bool): Return a binary stream instead of UTF-8 text.
+        threads (int, optional): Decompression threads for seekable zstd files
+            (default: all cores).
+
+    The caller owns the returned stream and must close it, typically with ``with``.
+    """
+    # pylint: disable=consider-using-with
+    compression = compression_of(filename)
+    if compression == "gzip":
+        stream = gzip.open(filename, "rb")
+    elif compression == "xz":
+        stream = lzma.open(filename, "rb")
+    elif compression == "zstd":
+        stream = _open_zstd(filename, threads)
+    else:
+        stream = open(filename, "rb")
+    return stream if binary else io.TextIOWrapper(stream, encoding="utf-8")
+
+
+def _iter_frame_blocks(dump_file):
+    """
+    Scans an open dump file and yields the raw pieces of each frame.
+
+    Yields:
+        tuple: (timestep, num_atoms, box_lines, atom_header, atom_lines)
+    """
+    while True:
+        line = dump_file.readline()
+        if not line:
+            break
+
+        if "ITEM: TIMESTEP" in line:
+            # Read timestep
+            try:
+                timestep = int(dump_file.readline().strip())
+            except ValueError:
+                continue
+
+            # Read number of atoms
+            line = dump_file.readline()
+            while line and "ITEM: NUMBER OF ATOMS" not in line:
+                line = dump_file.readline()
+            if not line:
+                break
+            num_atoms = int(dump_file.readline().strip())
+
+            # Read box bounds
+            line = dump_file.readline()
+            while line and "ITEM: BOX BOUNDS" not in line:
+                line = dump_file.readline()
+            if not line:
+                break
+            box_lines = [dump_file.readline() for _ in range(3)]
+
+            # Read atoms
+            line = dump_file.readline()
+            while line and "ITEM: ATOMS" not in line:
+                line = dump_file.readline()
+            if not line:
+                break
+
+            atom_header = line.strip()
+            atom_lines = [dump_file.readline() for _ in range(num_atoms)]
+
+            yield timestep, num_atoms, box_lines, atom_header, atom_lines
+
+
+def iter_parsed_frames(dump_file):
+    """Yields parsed frame dicts (see read_lammps_frames) from an open text dump file."""
+    for timestep, num_atoms, box_lines, atom_header, atom_lines in _iter_frame_blocks(dump_file):
+        columns = parse_atom_header(atom_header)
+        yield {
+            "timestep": timestep,
+            "num_atoms": num_atoms,
+            "box_bounds": parse_box_bounds(box_lines),
+            "atom_header": atom_header,
+            "columns": columns,
+            "atoms": parse_atoms(atom_lines, columns),
+        }
+
+
+def read_lammps_frames(filename, use_cache=True, last=None):
+    """
+    Generator that yields simulation frames with atom data parsed into NumPy arrays.
+
+    When a columnar cache written by convert_to_cache exists next to the dump and is
+    still up to date, frames are read from it instead of parsing the text. With
+    ``last=K`` only the final K frames are yielded, located by seeking back from the
+    end of the file (see read_last_frames). Compressed dumps (.gz, .xz, .zst) are
+    decompressed on the fly.
+
+    Yields:
+        dict: containing:
+            - timestep (int)
+            - num_atoms (int)
+            - box_bounds (np.ndarray of float, shape (3, 2) or (3, 3))
+            - atom_header (str)
+            - columns (list of str)
+            - atoms (structured np.ndarray keyed by column name)
+    """
+    if last is not None:
+        yield from read_last_frames(filename, last, use_cache=use_cache)
+        return
+
+    if use_cache:
+        cache = open_cache(filename)
+        if cache is not None:
+            yield from cache
+            return
+
+    with open_dump(filename) as dump_file:
+        yield from iter_parsed_frames(dump_file)
+
 
 def parse_lammps_dump(filename):
     """
     Generator that yields simulation frames from a LAMMPS dump file.
 
+    Kept for compatibility; new code should use read_lammps_frames, which returns
+    parsed arrays instead of raw text lines.
+
     Yields:
         dict: containing:
             - timestep (int)
@@ -14,49 +334,663 @@ def parse_lammps_dump(filename):
             - box_bounds (list of strings)
             - atoms (list of strings or generator)
     """
-    with open(filename, "r", encoding="utf-8") as dump_file:
-        while True:
-            line = dump_file.readline()
-            if not line:
-                break
+    with open_dump(filename) as dump_file:
+        for timestep, num_atoms, box_lines, atom_header, atom_lines in _iter_frame_blocks(
+            dump_file
+        ):
+            yield {
+                "timestep": timestep,
+                "num_atoms": num_atoms,
+                "box_bounds": box_lines,
+                "atom_header": atom_header,
+                "atoms": atom_lines,
+            }
 
-            if "ITEM: TIMESTEP" in line:
-                # Read timestep
-                try:
-                    timestep = int(dump_file.readline().strip())
-                except ValueError:
-                    continue
 
-                # Read number of atoms
-                line = dump_file.readline()
-                while line and "ITEM: NUMBER OF ATOMS" not in line:
-                    line = dump_file.readline()
-                if not line:
-                    break
-                num_atoms = int(dump_file.readline().strip())
+# ---------------------------------------------------------------------------
+# Tail reader
+# ---------------------------------------------------------------------------
 
-                # Read box bounds
-                line = dump_file.readline()
-                while line and "ITEM: BOX BOUNDS" not in line:
-                    line = dump_file.readline()
-                if not line:
-                    break
-                box_lines = [dump_file.readline() for _ in range(3)]
+TAIL_BLOCK_SIZE = 1 << 20
 
-                # Read atoms
-                line = dump_file.readline()
-                while line and "ITEM: ATOMS" not in line:
-                    line = dump_file.readline()
-                if not line:
+
+def _tail_frame_offsets(filename, num_frames, block_size=TAIL_BLOCK_SIZE):
+    """
+    Returns the byte offsets of the last num_frames ``ITEM: TIMESTEP`` headers (in file
+    order), reading the file backwards from EOF one block at a time so that only the
+    tail of the dump is ever touched.
+    """
+    marker = b"ITEM: TIMESTEP"
+    offsets = []
+    with open(filename, "rb") as dump_file:
+        end = dump_file.seek(0, os.SEEK_END)
+        # Bytes from the start of the previous block, so a header split across two
+        # blocks is still found
+        carry = b""
+        while end > 0 and len(offsets) < num_frames:
+            start = max(0, end - block_size)
+            dump_file.seek(start)
+            block = dump_file.read(end - start) + carry
+            pos = len(block)
+            while len(offsets) < num_frames:
+                pos = block.rfind(marker, 0, pos)
+                if pos == -1:
                     break
+                offsets.append(start + pos)
+            carry = block[: len(marker) - 1]
+            end = start
+    return offsets[::-1]
+
+
+def read_last_frames(filename, num_frames=1, use_cache=True):
+    """
+    Returns the final num_frames frames of a dump without reading the rest of the file.
+
+    The file is scanned backwards from EOF for ``ITEM: TIMESTEP`` headers and only the
+    frames after the earliest one found are parsed, so the cost depends on the size of
+    the tail rather than the length of the run. A trailing frame that is still being
+    written (fewer atom lines than announced) is skipped. Uses the columnar cache when
+    an up-to-date one exists. Compressed dumps cannot be read backwards, so they are
+    streamed, keeping only the last num_frames frames in memory.
+
+    Returns:
+        list of dict: Parsed frames (see read_lammps_frames) in file order.
+    """
+    if num_frames <= 0:
+        return []
+
+    if use_cache:
+        cache = open_cache(filename)
+        if cache is not None:
+            return [cache.frame(position) for position in range(len(cache))[-num_frames:]]
+
+    if compression_of(filename):
+        with open_dump(filename) as dump_file:
+            return list(collections.deque(iter_parsed_frames(dump_file), maxlen=num_frames))
+
+    # One extra header in case the final frame turns out to be incomplete
+    offsets = _tail_frame_offsets(filename, num_frames + 1)
+    if not offsets:
+        return []
+
+    frames = []
+    with open(filename, "rb") as raw_file:
+        raw_file.seek(offsets[0])
+        dump_file = io.TextIOWrapper(raw_file, encoding="utf-8")
+        try:
+            for frame in iter_parsed_frames(dump_file):
+                frames.append(frame)
+        except ValueError:
+            # A partially written last line cannot be parsed; the frame is incomplete
+            pass
+    frames = [frame for frame in frames if len(frame["atoms"]) == frame["num_atoms"]]
+    return frames[-num_frames:]
+
+
+# ---------------------------------------------------------------------------
+# Frame-offset index and random access
+# ---------------------------------------------------------------------------
+
+INDEX_SUFFIX = ".idx.npz"
+
+
+class FrameIndex(NamedTuple):
+    """Byte offset, timestep and atom count of every frame in a dump file."""
+
+    offsets: np.ndarray
+    timesteps: np.ndarray
+    num_atoms: np.ndarray
+
+
+def index_path(filename):
+    """Path of the sidecar index stored next to a dump file."""
+    return f"{filename}{INDEX_SUFFIX}"
+
+
+def _parse_frame_header(lines):
+    """(timestep, num_atoms) from a frame's first four lines; raises ValueError if malformed."""
+    timestep = int(lines[1])
+    if b"ITEM: NUMBER OF ATOMS" not in lines[2]:
+        raise ValueError("missing NUMBER OF ATOMS header")
+    return timestep, int(lines[3])
+
+
+def _frame_index_from_entries(entries):
+    """Builds a FrameIndex from a list of (offset, timestep, num_atoms) tuples."""
+    columns = np.array(entries, dtype=np.int64).reshape(-1, 3).T
+    return FrameIndex(*(np.ascontiguousarray(column) for column in columns))
+
+
+def _scan_stream_offsets(stream, chunk_size=TAIL_BLOCK_SIZE):
+    """
+    Locates every ``ITEM: TIMESTEP`` header in a binary stream read chunk by chunk, for
+    compressed dumps that cannot be memory-mapped. Offsets refer to the decompressed
+    data. Returns a FrameIndex.
+    """
+    marker = b"ITEM: TIMESTEP"
+    entries = []
+    buffer = b""
+    base = 0
+    eof = False
+    while not eof:
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+        # Keep enough of the tail to find a header split across chunks
+        consumed = max(0, len(buffer) - len(marker) + 1)
+        pos = buffer.find(marker)
+        while pos != -1:
+            header = buffer[pos : pos + 512]
+            lines = header.split(b"\n", 4)
+            if len(lines) < 5 and len(header) < 512 and not eof:
+                consumed = pos
+                break
+            try:
+                entries.append((base + pos, *_parse_frame_header(lines)))
+            except (ValueError, IndexError):
+                pos = buffer.find(marker, pos + 1)
+                continue
+            pos = buffer.find(marker, pos + len(marker))
+        buffer = buffer[consumed:]
+        base += consumed
+
+    return _frame_index_from_entries(entries)
+
+
+def _scan_frame_offsets(filename):
+    """
+    Locates every ``ITEM: TIMESTEP`` header with mmap.find, so atom lines are never
+    decoded. Compressed dumps are scanned while streaming. Returns a FrameIndex.
+    """
+    if compression_of(filename):
+        with open_dump(filename, binary=True) as stream:
+            return _scan_stream_offsets(stream)
+
+    entries = []
+    if os.path.getsize(filename) == 0:
+        return _frame_index_from_entries(entries)
+
+    with open(filename, "rb") as dump_file, mmap.mmap(
+        dump_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        pos = mapped.find(b"ITEM: TIMESTEP")
+        while pos != -1:
+            mapped.seek(pos)
+            try:
+                header = [mapped.readline() for _ in range(4)]
+                entries.append((pos, *_parse_frame_header(header)))
+            except ValueError:
+                pos = mapped.find(b"ITEM: TIMESTEP", pos + 1)
+                continue
+            pos = mapped.find(b"ITEM: TIMESTEP", mapped.tell())
+
+    return _frame_index_from_entries(entries)
+
+
+def source_signature(filename):
+    """(size, mtime_ns) of a dump file, used to detect stale sidecar files."""
+    stat = os.stat(filename)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def build_frame_index(filename):
+    """
+    Scans a dump file and writes its sidecar index. If the index cannot be written
+    (e.g. read-only data directory) the in-memory index is still returned.
+    """
+    size, mtime_ns = source_signature(filename)
+    index = _scan_frame_offsets(filename)
+
+    target = index_path(filename)
+    tmp_target = f"{target}.tmp"
+    try:
+        with open(tmp_target, "wb") as index_file:
+            np.savez(
+                index_file,
+                offsets=index.offsets,
+                timesteps=index.timesteps,
+                num_atoms=index.num_atoms,
+                source_size=size,
+                source_mtime_ns=mtime_ns,
+            )
+        os.replace(tmp_target, target)
+    except OSError as e:
+        print(f"Warning: could not write frame index {target}: {e}")
+    return index
+
+
+def load_frame_index(filename, rebuild=False):
+    """
+    Returns the FrameIndex for a dump file, reusing the sidecar index when it exists
+    and still matches the dump's size and mtime, and rebuilding it otherwise.
+    """
+    target = index_path(filename)
+    if not rebuild and os.path.exists(target):
+        try:
+            with np.load(target) as stored:
+                if (int(stored["source_size"]), int(stored["source_mtime_ns"])) == (
+                    source_signature(filename)
+                ):
+                    return FrameIndex(stored["offsets"], stored["timesteps"], stored["num_atoms"])
+        except (OSError, ValueError, KeyError):
+            pass
+    return build_frame_index(filename)
+
+
+def _read_frame_at(dump_file, offset):
+    """Parses the single frame starting at byte offset in an open binary dump file."""
+    dump_file.seek(offset)
+    text = io.TextIOWrapper(dump_file, encoding="utf-8")
+    try:
+        return next(iter_parsed_frames(text))
+    finally:
+        text.detach()
+
+
+def _line_end(mapped, pos):
+    """Returns the position just past the newline that ends the line containing pos."""
+    end = mapped.find(b"\n", pos)
+    return len(mapped) if end == -1 else end + 1
+
+
+class LazyFrame(Mapping):
+    """
+    Zero-copy view of one frame in a memory-mapped dump file.
+
+    Behaves like the dicts yielded by read_lammps_frames, but timestep and atom count
+    come from the frame index, the header is decoded on first access and the ATOMS
+    block is only parsed when ``frame["atoms"]`` or ``frame.select(...)`` is called.
+    Dropping the view releases everything it materialized.
+    """
+
+    _KEYS = ("timestep", "num_atoms", "box_bounds", "atom_header", "columns", "atoms")
+
+    def __init__(self, mapped, offset, end, timestep, num_atoms):
+        self._mapped = mapped
+        self._offset = int(offset)
+        self._end = int(end)
+        self.timestep = int(timestep)
+        self.num_atoms = int(num_atoms)
+        self._header = None
+        self._atoms = None
+
+    def __getitem__(self, key):
+        if key == "timestep":
+            return self.timestep
+        if key == "num_atoms":
+            return self.num_atoms
+        if key == "atoms":
+            if self._atoms is None:
+                self._atoms = self.select(*self._read_header()["columns"])
+            return self._atoms
+        if key in self._KEYS:
+            return self._read_header()[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+    def _read_header(self):
+        if self._header is None:
+            mapped = self._mapped
+            box_pos = mapped.find(b"ITEM: BOX BOUNDS", self._offset, self._end)
+            atoms_pos = mapped.find(b"ITEM: ATOMS", box_pos, self._end)
+            if box_pos == -1 or atoms_pos == -1:
+                raise ValueError(
+                    f"Malformed frame at byte {self._offset} (timestep {self.timestep})"
+                )
+
+            box_start = _line_end(mapped, box_pos)
+            box_lines = mapped[box_start:atoms_pos].decode("utf-8").splitlines()[:3]
+            atoms_start = _line_end(mapped, atoms_pos)
+            atom_header = mapped[atoms_pos:atoms_start].decode("utf-8").strip()
+            self._header = {
+                "box_bounds": parse_box_bounds(box_lines),
+                "atom_header": atom_header,
+                "columns": parse_atom_header(atom_header),
+                "atoms_start": atoms_start,
+            }
+        return self._header
+
+    def select(self, *names):
+        """
+        Parses only the named columns of the ATOMS block.
+
+        Returns:
+            np.ndarray: structured array with one field per requested column.
+        """
+        header = self._read_header()
+        columns = header["columns"]
+        missing = [name for name in names if name not in columns]
+        if missing:
+            raise KeyError(f"Columns {missing} not in ATOMS header {columns}")
+
+        dtype = atom_dtype(names)
+        if self.num_atoms == 0:
+            return np.empty(0, dtype=dtype)
+        lines = self._mapped[header["atoms_start"] : self._end].decode("utf-8").splitlines()
+        return np.loadtxt(
+            lines,
+            dtype=dtype,
+            usecols=[columns.index(name) for name in names],
+            max_rows=self.num_atoms,
+            ndmin=1,
+        )
+
+
+class FrameSequence:
+    """
+    Lazy, sliceable view over the frames of a LammpsDump.
+
+    Integer indexing parses one frame; slicing returns another FrameSequence without
+    reading anything, so ``dump.frames[::50]`` only touches every 50th frame.
+    """
+
+    def __init__(self, dump, positions):
+        self._dump = dump
+        self._positions = positions
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return FrameSequence(self._dump, self._positions[item])
+        return self._dump.read_frame(int(self._positions[item]))
+
+    def __iter__(self):
+        return self._dump.iter_positions(self._positions)
+
+    @property
+    def timesteps(self):
+        """Timesteps of the frames in this view."""
+        return self._dump.index.timesteps[self._positions]
+
+
+class LammpsDump:
+    """
+    Random access to the frames of a LAMMPS dump file through its sidecar index.
+
+    With ``use_mmap=True`` the file is memory-mapped and frames are returned as
+    LazyFrame views, so peak memory stays roughly constant whatever the trajectory
+    length; otherwise each access parses the frame into a dict.
+
+    Compressed dumps cannot be seeked into; stream them with read_lammps_frames or
+    convert them once with convert_to_cache, whose TrajectoryCache is random access.
+
+    Example:
+        dump = LammpsDump("run.lammpstrj")
+        last = dump.frames[-1]
+        every_50th = list(dump.frames[::50])
+        frame = dump.at_timestep(20000)
+    """
+
+    def __init__(self, filename, rebuild_index=False, use_mmap=False):
+        self.filename = str(filename)
+        if compression_of(self.filename):
+            raise ValueError(
+                f"{self.filename} is compressed; use read_lammps_frames to stream it or "
+                "convert_to_cache for random access"
+            )
+        self.index = load_frame_index(self.filename, rebuild=rebuild_index)
+        self.frames = FrameSequence(self, np.arange(len(self.index.offsets)))
+        self._mapped = None
+        if use_mmap and len(self.index.offsets) > 0:
+            # mmap keeps its own duplicate of the descriptor, so the file can close here
+            with open(self.filename, "rb") as dump_file:
+                self._mapped = mmap.mmap(dump_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return len(self.index.offsets)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Releases the memory map (if any). LazyFrames must not be used afterwards."""
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+
+    def _lazy_frame(self, position):
+        offsets = self.index.offsets
+        position = range(len(offsets))[position]
+        end = offsets[position + 1] if position + 1 < len(offsets) else len(self._mapped)
+        return LazyFrame(
+            self._mapped,
+            offsets[position],
+            end,
+            self.index.timesteps[position],
+            self.index.num_atoms[position],
+        )
+
+    def read_frame(self, position):
+        """Parses the frame at the given position (negative positions count from the end)."""
+        if self._mapped is not None:
+            return self._lazy_frame(position)
+        offset = self.index.offsets[position]
+        with open(self.filename, "rb") as dump_file:
+            return _read_frame_at(dump_file, offset)
+
+    def iter_positions(self, positions):
+        """Yields the frames at the given positions, keeping one file handle open."""
+        if self._mapped is not None:
+            for position in positions:
+                yield self._lazy_frame(int(position))
+            return
+        with open(self.filename, "rb") as dump_file:
+            for position in positions:
+                yield _read_frame_at(dump_file, self.index.offsets[position])
+
+    def position_of(self, timestep):
+        """Returns the frame position of a timestep, raising KeyError if it is absent."""
+        matches = np.flatnonzero(self.index.timesteps == timestep)
+        if len(matches) == 0:
+            raise KeyError(f"Timestep {timestep} not found in {self.filename}")
+        return int(matches[0])
+
+    def at_timestep(self, timestep):
+        """Parses the frame written at the given timestep."""
+        return self.read_frame(self.position_of(timestep))
+
+
+# ---------------------------------------------------------------------------
+# Binary columnar cache
+# ---------------------------------------------------------------------------
+
+CACHE_SUFFIX = ".cache"
+CACHE_VERSION = 1
+
+
+def cache_path(filename):
+    """Path of the columnar cache directory stored next to a dump file."""
+    return f"{filename}{CACHE_SUFFIX}"
+
+
+def _create_cache_arrays(directory, frame, column_files, num_rows, num_frames):
+    """
+    Creates the column and box_bounds files of a cache, typed after its first frame, and
+    records each column's file name in column_files. Returns (column memmaps, box_bounds).
+    """
+    column_arrays = {}
+    for i, name in enumerate(frame["columns"]):
+        column_files[name] = f"col_{i}.npy"
+        column_arrays[name] = np.lib.format.open_memmap(
+            os.path.join(directory, column_files[name]),
+            mode="w+",
+            dtype=frame["atoms"].dtype[name],
+            shape=(num_rows,),
+        )
+    box_bounds = np.lib.format.open_memmap(
+        os.path.join(directory, "box_bounds.npy"),
+        mode="w+",
+        dtype=np.float64,
+        shape=(num_frames,) + frame["box_bounds"].shape,
+    )
+    return column_arrays, box_bounds
+
+
+def convert_to_cache(filename):
+    """
+    Converts a dump file into a columnar binary cache next to it, streaming one frame at
+    a time so the trajectory never has to fit in memory.
+
+    Layout of ``<dump>.cache/``:
+        meta.json        source size/mtime, ATOMS header and column -> file mapping
+        timesteps.npy    (F,) int64
+        offsets.npy      (F + 1,) int64 row range of each frame in the column files
+        box_bounds.npy   (F, 3, k) float64
+        col_<i>.npy      (total atoms,) one file per ATOMS column, typed as in atom_dtype
+
+    Returns:
+        str: path of the cache directory.
+    """
+    signature = source_signature(filename)
+    index = load_frame_index(filename)
+    num_frames = len(index.offsets)
+    offsets = np.zeros(num_frames + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(index.num_atoms)
+
+    target = cache_path(filename)
+    tmp_target = f"{target}.tmp"
+    shutil.rmtree(tmp_target, ignore_errors=True)
+    os.makedirs(tmp_target)
+
+    meta = {"version": CACHE_VERSION, "source": list(signature), "atom_header": "", "columns": {}}
+    column_arrays = {}
+    box_bounds = None
+    position = -1
+    for position, frame in enumerate(read_lammps_frames(filename, use_cache=False)):
+        if box_bounds is None:
+            meta["atom_header"] = frame["atom_header"]
+            column_arrays, box_bounds = _create_cache_arrays(
+                tmp_target, frame, meta["columns"], int(offsets[-1]), num_frames
+            )
+        elif frame["atom_header"] != meta["atom_header"]:
+            shutil.rmtree(tmp_target, ignore_errors=True)
+            raise ValueError(
+                f"Timestep {frame['timestep']}: ATOMS columns change mid-trajectory "
+                f"({frame['atom_header']!r} vs {meta['atom_header']!r})"
+            )
+
+        for name, column in column_arrays.items():
+            column[offsets[position] : offsets[position + 1]] = frame["atoms"][name]
+        box_bounds[position] = frame["box_bounds"]
+
+    if position + 1 != num_frames:
+        shutil.rmtree(tmp_target, ignore_errors=True)
+        raise ValueError(
+            f"{filename}: parsed {position + 1} frames but the index lists {num_frames}"
+        )
+
+    for column in column_arrays.values():
+        column.flush()
+    if box_bounds is not None:
+        box_bounds.flush()
+    del column_arrays, box_bounds
+
+    np.save(os.path.join(tmp_target, "timesteps.npy"), index.timesteps)
+    np.save(os.path.join(tmp_target, "offsets.npy"), offsets)
+    with open(os.path.join(tmp_target, "meta.json"), "w", encoding="utf-8") as meta_file:
+        json.dump(meta, meta_file, indent=2)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp_target, target)
+    return target
+
+
+class TrajectoryCache:
+    """
+    Read-only view of a columnar cache. Column files are memory-mapped, so opening a
+    cache is instant and whole-trajectory columns can be used directly, e.g.
+    ``cache.columns["vx"][cache.offsets[i]:cache.offsets[i + 1]]``.
+    """
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as meta_file:
+            self.meta = json.load(meta_file)
+        self.atom_header = self.meta["atom_header"]
+        self.timesteps = np.load(os.path.join(directory, "timesteps.npy"))
+        self.offsets = np.load(os.path.join(directory, "offsets.npy"))
+        self.columns = {
+            name: np.load(os.path.join(directory, fname), mmap_mode="r")
+            for name, fname in self.meta["columns"].items()
+        }
+        self.box_bounds = (
+            np.load(os.path.join(directory, "box_bounds.npy"), mmap_mode="r")
+            if self.columns
+            else np.empty((0, 3, 2))
+        )
+
+    def __len__(self):
+        return len(self.timesteps)
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self.frame(position)
+
+    def frame(self, position):
+        """Returns one frame as a dict with the same keys as read_lammps_frames."""
+        rows = slice(self.offsets[position], self.offsets[position + 1])
+        names = list(self.columns)
+        atoms = np.empty(rows.stop - rows.start, dtype=atom_dtype(names))
+        for name in names:
+            atoms[name] = self.columns[name][rows]
+        return {
+            "timestep": int(self.timesteps[position]),
+            "num_atoms": len(atoms),
+            "box_bounds": np.array(self.box_bounds[position]),
+            "atom_header": self.atom_header,
+            "columns": names,
+            "atoms": atoms,
+        }
+
+
+def open_cache(filename):
+    """Returns a TrajectoryCache for a dump, or None if it has no up-to-date cache."""
+    directory = cache_path(filename)
+    try:
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as meta_file:
+            meta = json.load(meta_file)
+        if meta.get("version") != CACHE_VERSION or tuple(meta["source"]) != source_signature(
+            filename
+        ):
+            return None
+        return TrajectoryCache(directory)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def ensure_cache(filename):
+    """Converts a dump to its columnar cache unless an up-to-date cache already exists."""
+    if open_cache(filename) is None:
+        convert_to_cache(filename)
+
+
+def main():
+    """Converts LAMMPS dump files to columnar caches."""
+    parser = argparse.ArgumentParser(
+        description="Convert LAMMPS dump files to a binary columnar cache for fast analysis."
+    )
+    parser.add_argument("filenames", nargs="+", help="LAMMPS dump files to convert")
+    parser.add_argument(
+        "--force", action="store_true", help="Rebuild caches even if they are up to date"
+    )
+    args = parser.parse_args()
+
+    for filename in args.filenames:
+        if not args.force and open_cache(filename) is not None:
+            print(f"Cache for {filename} is up to date.")
+            continue
+        print(f"Converting {filename}...")
+        print(f"Cache written to {convert_to_cache(filename)}")
 
-                atom_header = line.strip()
-                atom_lines = [dump_file.readline() for _ in range(num_atoms)]
 
-                yield {
-                    "timestep": timestep,
-                    "num_atoms": num_atoms,
-                    "box_bounds": box_lines,
-                    "atom_header": atom_header,
-                    "atoms": atom_lines,
-                }
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Frame-parallel analysis engine for LAMMPS dump files.
+
+Every frame of a dump is independent, so per-frame analyses (hexatic order,
+temperature, velocity statistics) can be fanned out over a process pool. The dump is
+split into contiguous byte ranges at frame boundaries using the frame-offset index,
+each worker parses and analyzes its own range, and the results are reassembled in
+timestep order. Compressed dumps cannot be split by byte range, so they are parsed in
+the main process and batches of frames are handed to the workers instead.
+"""
+
+import collections
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from lammps_parser import (
+    compression_of,
+    iter_parsed_frames,
+    load_frame_index,
+    open_cache,
+    read_lammps_frames,
+)
+
+# Frames per task when a compressed dump is streamed to the workers
+STREAM_BATCH_FRAMES = 8
+
+
+def resolve_workers(workers):
+    """Maps a --workers value to a process count (None or 0 means all cores)."""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def split_frame_ranges(offsets, num_chunks):
+    """
+    Splits a dump into contiguous chunks that start and end on frame boundaries.
+
+    Args:
+        offsets (np.ndarray): Byte offset of each frame (from the frame index).
+        num_chunks (int): Desired number of chunks.
+
+    Returns:
+        list of tuple: (first_position, num_frames, start_byte) for each non-empty chunk.
+    """
+    bounds = np.linspace(0, len(offsets), num=min(num_chunks, len(offsets)) + 1).astype(int)
+    return [
+        (int(first), int(stop - first), int(offsets[first]))
+        for first, stop in zip(bounds[:-1], bounds[1:])
+        if stop > first
+    ]
+
+
+def _analyze_range(filename, first, num_frames, start_byte, func):
+    """
+    Worker: parses num_frames frames from start_byte and applies func to each.
+
+    Returns (results, busy_seconds), the CPU time spent parsing and analyzing.
+    """
+    start_time = time.process_time()
+    results = []
+    cache = open_cache(filename)
+    if cache is not None:
+        for position in range(first, first + num_frames):
+            frame = cache.frame(position)
+            results.append((frame["timestep"], func(frame)))
+        return results, time.process_time() - start_time
+
+    with open(filename, "rb") as raw_file:
+        raw_file.seek(start_byte)
+        dump_file = io.TextIOWrapper(raw_file, encoding="utf-8")
+        for frame in iter_parsed_frames(dump_file):
+            results.append((frame["timestep"], func(frame)))
+            if len(results) == num_frames:
+                break
+    return results, time.process_time() - start_time
+
+
+def _analyze_batch(frames, func):
+    """Worker: applies func to a batch of already parsed frames; returns (results, busy_seconds)."""
+    start_time = time.process_time()
+    results = [(frame["timestep"], func(frame)) for frame in frames]
+    return results, time.process_time() - start_time
+
+
+def _map_stream(pool, filename, func, batch_size, max_pending):
+    """
+    Streams frames from a compressed dump and analyzes them in batches on the pool.
+
+    Returns (results, busy_seconds) summed over the batches.
+    """
+    results = []
+    busy = 0.0
+    pending = collections.deque()
+    batch = []
+
+    def collect(future):
+        nonlocal busy
+        batch_results, batch_busy = future.result()
+        results.extend(batch_results)
+        busy += batch_busy
+
+    for frame in read_lammps_frames(filename, use_cache=False):
+        batch.append(frame)
+        if len(batch) == batch_size:
+            pending.append(pool.submit(_analyze_batch, batch, func))
+            batch = []
+            # Bound the number of parsed frames held in memory
+            if len(pending) >= max_pending:
+                collect(pending.popleft())
+    if batch:
+        pending.append(pool.submit(_analyze_batch, batch, func))
+    for future in pending:
+        collect(future)
+    return results, busy
+
+
+def map_frames(filename, func, workers=None, chunks_per_worker=4, verbose=0):
+    """
+    Applies func to every frame of a dump in parallel.
+
+    Args:
+        filename (str): Path to the LAMMPS dump file.
+        func (callable): Module-level (picklable) function taking a frame dict, as
+            yielded by read_lammps_frames, and returning a picklable result.
+        workers (int, optional): Number of worker processes (None or 0 = all cores).
+        chunks_per_worker (int): Chunks per worker; more chunks balance uneven frames.
+        verbose (int): If 1, print throughput and the speedup over one worker (the
+            workers' summed CPU time divided by the wall time) once finished.
+
+    Returns:
+        list of tuple: (timestep, result) pairs sorted by timestep.
+    """
+    workers = resolve_workers(workers)
+    start_time = time.perf_counter()
+    cache = open_cache(filename)
+
+    results = []
+    busy = 0.0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if cache is None and compression_of(filename):
+            results, busy = _map_stream(pool, filename, func, STREAM_BATCH_FRAMES, 2 * workers)
+        else:
+            # Cached dumps are split by frame position; start bytes are only used without one
+            if cache is None:
+                offsets = load_frame_index(filename).offsets
+            else:
+                offsets = np.zeros(len(cache), dtype=np.int64)
+            futures = [
+                pool.submit(_analyze_range, filename, first, count, start_byte, func)
+                for first, count, start_byte in split_frame_ranges(
+                    offsets, workers * chunks_per_worker
+                )
+            ]
+            for future in futures:
+                range_results, range_busy = future.result()
+                results.extend(range_results)
+                busy += range_busy
+
+    results.sort(key=lambda item: item[0])
+
+    if verbose:
+        elapsed = time.perf_counter() - start_time
+        rate = len(results) / elapsed if elapsed > 0 else float("inf")
+        # The workers' summed CPU time is what one worker would have needed on its own
+        speedup = busy / elapsed if elapsed > 0 else float("nan")
+        print(
+            f"Analyzed {len(results)} frames in {elapsed:.2f}s on {workers} workers "
+            f"({rate:.1f} frames/s, {speedup:.1f}x speedup over one worker, "
+            f"{100 * speedup / workers:.0f}% parallel efficiency)"
+        )
+    return results
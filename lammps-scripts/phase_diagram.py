@@ -5,12 +5,17 @@ hexatic order parameters.
 
 import argparse
 import glob
+import json
 import os
 import re
 
 import matplotlib.pyplot as plt
 import numpy as np
-from hexatic_order_analysis import parse_and_calc_hexatic
+from hexatic_order_analysis import frame_mean_psi6, parse_and_calc_hexatic
+from lammps_parser import source_signature, read_last_frames
+
+# Per-file psi6 results are kept here (inside the data directory) between runs
+RESULTS_CACHE_NAME = "phase_diagram_cache.json"
 
 
 def extract_epsilon_and_molecules(filename):
@@ -61,15 +66,82 @@ def test_single_file(filename):
     print(f"  Total frames: {len(values)}")
 
 
-def collect_phase_data(filenames, verbose):
+def final_frames_psi6(filename, num_frames=1):
+    """
+    Computes mean |psi6| for only the final num_frames frames of a dump.
+    The frames are found by seeking back from the end of the file, so the rest of the
+    dump is never read.
+    Returns a list of (timestep, psi6) pairs in file order.
+    """
+    return [
+        (frame["timestep"], float(frame_mean_psi6(frame)))
+        for frame in read_last_frames(filename, num_frames)
+        if len(frame["atoms"]) > 0
+    ]
+
+
+def load_results_cache(cache_file):
+    """Loads the per-file results cache, returning an empty cache if it is missing or unreadable."""
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_results_cache(cache_file, cache):
+    """Writes the per-file results cache atomically."""
+    tmp_file = f"{cache_file}.tmp"
+    try:
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=1)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"Warning: could not write results cache {cache_file}: {e}")
+
+
+def cached_final_frames_psi6(filename, num_frames, cache):
+    """
+    Returns final_frames_psi6(filename, num_frames), reusing the entry in cache when the
+    file's path, size and mtime are unchanged. The cache dict is updated in place.
+    Returns (results, computed) where computed is True if the file had to be analyzed.
+    """
+    key = os.path.abspath(filename)
+    size, mtime_ns = source_signature(filename)
+    entry = cache.get(key)
+    if (
+        entry is not None
+        and entry.get("size") == size
+        and entry.get("mtime_ns") == mtime_ns
+        and entry.get("num_frames") == num_frames
+    ):
+        return [tuple(pair) for pair in entry["psi6"]], False
+
+    results = final_frames_psi6(filename, num_frames)
+    cache[key] = {
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "num_frames": num_frames,
+        "psi6": [list(pair) for pair in results],
+    }
+    return results, True
+
+
+def collect_phase_data(filenames, verbose, num_frames=1, cache_file=None):
     """
     Collects phase data (epsilon, molecules, psi6) from files.
+    Each file is represented by the mean |psi6| over its final num_frames frames; with a
+    cache_file, results of unchanged files are reused and only new or modified dumps are
+    analyzed (the cache is saved after every file so an interrupted sweep keeps its progress).
     Returns three lists: epsilons, num_molecules, avg_psi6_list.
     """
     epsilons = []
     num_molecules = []
     avg_psi6_list = []
 
+    cache = load_results_cache(cache_file) if cache_file else {}
+    num_computed = 0
+
     for fname in filenames:
         n_mols, eps = extract_epsilon_and_molecules(fname)
         if eps is None or n_mols is None:
@@ -77,33 +149,45 @@ def collect_phase_data(filenames, verbose):
                 print(f"Skipping invalid filename: {fname}")
             continue
 
-        # Use your existing function to get timesteps and psi6 values
-        _, values = parse_and_calc_hexatic(fname, verbose)
+        results, computed = cached_final_frames_psi6(fname, num_frames, cache)
+        if computed:
+            num_computed += 1
+            if cache_file:
+                save_results_cache(cache_file, cache)
 
-        if not values:
+        if not results:
             if verbose:
                 print(f"No data found in: {fname}")
             continue
 
-        # We take the mean of the last frame to represent the "stable" state
-        final_frame_psi6 = np.mean(values[-1])
+        # Average the final frames to represent the "stable" state
+        final_psi6 = np.mean([psi6 for _, psi6 in results])
+        if verbose:
+            status = "computed" if computed else "cached"
+            print(f"{fname}: N={n_mols}, eps={eps}, |psi6|={final_psi6:.4f} ({status})")
 
         epsilons.append(eps)
         num_molecules.append(n_mols)
-        avg_psi6_list.append(final_frame_psi6)
+        avg_psi6_list.append(final_psi6)
+
+    if verbose:
+        print(f"Analyzed {num_computed} file(s), reused {len(epsilons) - num_computed} cached.")
 
     return epsilons, num_molecules, avg_psi6_list
 
 
-def generate_stability_plot(data_dir, pattern, verbose):
+def generate_stability_plot(data_dir, pattern, verbose, num_frames=1, use_cache=True):
     """Generate a phase diagram plot based on hexatic order analysis."""
     file_pattern = os.path.join(data_dir, pattern)
-    filenames = glob.glob(file_pattern)
+    filenames = sorted(glob.glob(file_pattern))
 
     if verbose:
         print(f"Found {len(filenames)} files.")
 
-    epsilons, num_molecules, _avg_psi6 = collect_phase_data(filenames, verbose)
+    cache_file = os.path.join(data_dir, RESULTS_CACHE_NAME) if use_cache else None
+    epsilons, num_molecules, _avg_psi6 = collect_phase_data(
+        filenames, verbose, num_frames=num_frames, cache_file=cache_file
+    )
 
     if not epsilons:
         print("No valid data found to plot.")
@@ -158,6 +242,18 @@ if __name__ == "__main__":
     )
     PARSER.add_argument("--test", help="Test a single lammpstrj file instead of generating plot")
     PARSER.add_argument("--verbose", default=0, help="Set to 1 to print out results")
+    PARSER.add_argument(
+        "--final-frames",
+        type=int,
+        default=1,
+        help="Average |psi6| over this many final frames of each file, read by seeking back "
+        "from the end of the file (default: %(default)s)",
+    )
+    PARSER.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Recompute every file instead of reusing {RESULTS_CACHE_NAME} in the data folder",
+    )
 
     ARGS = PARSER.parse_args()
 
@@ -166,4 +262,10 @@ if __name__ == "__main__":
     else:
         if ARGS.verbose:
             print(ARGS.data_dir)
-        generate_stability_plot(ARGS.data_dir, ARGS.pattern, verbose=ARGS.verbose)
+        generate_stability_plot(
+            ARGS.data_dir,
+            ARGS.pattern,
+            verbose=ARGS.verbose,
+            num_frames=ARGS.final_frames,
+            use_cache=not ARGS.no_cache,
+        )
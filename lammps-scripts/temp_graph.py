@@ -11,7 +11,8 @@ import sys
 import matplotlib.pyplot as plt
 import numpy as np
 
-from lammps_parser import parse_lammps_dump
+from lammps_parser import read_lammps_frames
+from parallel_frames import map_frames
 
 
 def generate_temp_graph_filename(filename, ending, output_dir=None):
@@ -93,18 +94,11 @@ def plot_log_temperature(filename, output_dir=None, no_show=False):
         plt.show()
 
 
-def _process_atom_lines(atom_lines):
+def _process_atoms(atoms):
     """
-    Parses atom lines and returns position and velocity arrays.
+    Returns position and velocity arrays from a structured atom array.
     """
-    data_list = []
-    for line in atom_lines:
-        parts = line.split()
-        # x, y, vx, vy are indices 2, 3, 4, 5
-        data_list.append([float(parts[2]), float(parts[3]), float(parts[4]), float(parts[5])])
-
-    data_arr = np.array(data_list)
-    return data_arr[:, 0], data_arr[:, 1], data_arr[:, 2], data_arr[:, 3]
+    return atoms["x"], atoms["y"], atoms["vx"], atoms["vy"]
 
 
 def _compute_radial_projection(x, y, vx, vy):
@@ -152,13 +146,21 @@ def _compute_frame_temperature(x, y, vx, vy, num_atoms):
 
 def _calculate_temps_for_frame(frame):
     """calculates temperature for a single frame"""
-    x, y, vx, vy = _process_atom_lines(frame["atoms"])
+    x, y, vx, vy = _process_atoms(frame["atoms"])
     return _compute_frame_temperature(x, y, vx, vy, frame["num_atoms"])
 
 
-def plot_temperatures(filename, output_dir=None, no_show=False):
+def frame_temperatures(frame):
+    """Temperatures for a single frame, or None for frames without atoms."""
+    if frame["num_atoms"] == 0:
+        return None
+    return _calculate_temps_for_frame(frame)
+
+
+def plot_temperatures(filename, output_dir=None, no_show=False, workers=1):
     """
     Plots drift-corrected temperature from a LAMMPS dump file.
+    Frames are analyzed in parallel when workers is not 1 (0 = all cores).
     """
     timesteps = []
     total_temps = []
@@ -167,13 +169,21 @@ def plot_temperatures(filename, output_dir=None, no_show=False):
     print(f"Reading file: {filename}...")
 
     try:
-        for frame in parse_lammps_dump(filename):
-            if frame["num_atoms"] == 0:
+        if workers != 1:
+            results = map_frames(filename, frame_temperatures, workers=workers, verbose=1)
+        else:
+            results = (
+                (frame["timestep"], frame_temperatures(frame))
+                for frame in read_lammps_frames(filename)
+            )
+
+        for timestep, temps in results:
+            if temps is None:
                 continue
 
-            total_temp, corrected_temp = _calculate_temps_for_frame(frame)
+            total_temp, corrected_temp = temps
 
-            timesteps.append(frame["timestep"])
+            timesteps.append(timestep)
             total_temps.append(total_temp)
             corrected_temps.append(corrected_temp)
 
@@ -185,7 +195,15 @@ def plot_temperatures(filename, output_dir=None, no_show=False):
         print("No valid temperature data found.")
         return
 
-    # Plotting
+    plot_dump_temperatures(filename, timesteps, total_temps, corrected_temps, output_dir, no_show)
+
+
+def plot_dump_temperatures(
+    filename, timesteps, total_temps, corrected_temps, output_dir=None, no_show=False
+):
+    """
+    Plots raw and drift-corrected temperatures already computed from a LAMMPS dump file.
+    """
     plt.figure(figsize=(10, 6))
 
     # Plot Standard Total Temp
@@ -233,12 +251,18 @@ if __name__ == "__main__":
     PARSER.add_argument("--filename", "-f", default=EX, help="Path to file")
     PARSER.add_argument("--output_dir", default=None, help="Output directory")
     PARSER.add_argument("--no-show", action="store_true", help="Do not display the graph")
+    PARSER.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for frame-parallel analysis (0 = all cores)",
+    )
     ARGS = PARSER.parse_args()
     if ARGS.filename.endswith(".log"):
         plot_log_temperature(ARGS.filename, ARGS.output_dir, ARGS.no_show)
     elif ARGS.filename.endswith(".lammpstrj"):
         print("Note: graphing the .log file will be more accurate")
-        plot_temperatures(ARGS.filename, ARGS.output_dir, ARGS.no_show)
+        plot_temperatures(ARGS.filename, ARGS.output_dir, ARGS.no_show, ARGS.workers)
     else:
         print("Error: File should be either .log or .lammpstrj")
         sys.exit(1)
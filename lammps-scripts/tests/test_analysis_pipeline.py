@@ -0,0 +1,36 @@
+import shutil
+from pathlib import Path
+
+import matplotlib
+import pandas as pd
+import pytest
+
+from analysis_pipeline import run_pipeline
+from lammps_parser import read_lammps_frames
+from velocity_graph import frame_velocity_stats
+
+matplotlib.use("Agg")
+
+BUNDLED_DUMP = (
+    Path(__file__).resolve().parent.parent / "results" / "central_pair_interaction.in.lammpstrj"
+)
+
+
+def test_subset_without_psi6_creates_the_output_directory(tmp_path):
+    dump = Path(shutil.copy(BUNDLED_DUMP, tmp_path / BUNDLED_DUMP.name))
+    output_dir = tmp_path / "plots" / "run"
+
+    table = run_pipeline(dump, ["velocity"], output_dir=output_dir, no_show=True)
+
+    assert list(table.columns) == ["timestep", "velocity_mean", "velocity_std"]
+    expected = [frame_velocity_stats(frame) for frame in read_lammps_frames(dump)]
+    assert table[["velocity_mean", "velocity_std"]].to_numpy().tolist() == [
+        list(stats) for stats in expected
+    ]
+    saved = pd.read_csv(output_dir / "central_pair_interaction.in_analysis.csv")
+    assert saved["timestep"].tolist() == table["timestep"].tolist()
+
+
+def test_unknown_observable_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown observables"):
+        run_pipeline(tmp_path / "missing.lammpstrj", ["psi7"])
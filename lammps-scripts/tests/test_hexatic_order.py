@@ -0,0 +1,58 @@
+import math
+
+import numpy as np
+import pytest
+from sklearn.neighbors import NearestNeighbors
+
+from hexatic_order import hexatic_order
+
+
+def _scalar_hexatic_order(points):
+    """Reference: the original per-particle loop that hexatic_order replaced."""
+    neighbors_model = NearestNeighbors(n_neighbors=7, algorithm="ball_tree").fit(points)
+    _, indices = neighbors_model.kneighbors(points)
+
+    params = []
+    for i in range(len(indices)):
+        hex_sum = 0
+        for j in range(7):
+            delta_x = points[indices[i][j], 0] - points[i, 0]
+            delta_y = points[indices[i][j], 1] - points[i, 1]
+            if delta_x != 0:
+                hex_sum += np.exp(complex(0, 6 * math.atan(delta_y / delta_x)))
+        params.append(abs(hex_sum) / 6)
+    return params
+
+
+def _triangular_lattice(n_rows, n_cols, spacing=1.0):
+    xs, ys = np.meshgrid(np.arange(n_cols, dtype=float), np.arange(n_rows, dtype=float))
+    xs = (xs + 0.5 * (ys % 2)) * spacing
+    ys = ys * spacing * np.sqrt(3) / 2
+    return np.column_stack((xs.ravel(), ys.ravel()))
+
+
+class TestHexaticOrder:
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_matches_scalar_path_on_random_points(self, seed):
+        points = np.random.default_rng(seed).uniform(0, 100, size=(500, 2))
+        np.testing.assert_allclose(
+            hexatic_order(points), _scalar_hexatic_order(points), rtol=1e-10, atol=1e-12
+        )
+
+    def test_matches_scalar_path_with_zero_x_offsets(self):
+        # Columns of points share x coordinates, exercising the skipped-neighbour branch
+        xs, ys = np.meshgrid(np.arange(5.0), np.arange(0, 20, 0.5))
+        points = np.column_stack((xs.ravel(), ys.ravel()))
+        np.testing.assert_allclose(
+            hexatic_order(points), _scalar_hexatic_order(points), rtol=1e-10, atol=1e-12
+        )
+
+    def test_perfect_lattice_interior_is_one(self):
+        points = _triangular_lattice(12, 12)
+        params = hexatic_order(points)
+        interior = (points[:, 0] > 2) & (points[:, 0] < 9) & (points[:, 1] > 2) & (points[:, 1] < 8)
+        np.testing.assert_allclose(params[interior], 1.0, atol=1e-9)
+
+    def test_returns_one_value_per_point(self):
+        points = np.random.default_rng(3).uniform(0, 10, size=(50, 2))
+        assert hexatic_order(points).shape == (50,)
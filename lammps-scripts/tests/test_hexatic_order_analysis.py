@@ -0,0 +1,74 @@
+import freud
+import numpy as np
+
+from hexatic_order_analysis import HexaticNeighborReuse
+
+
+def _fresh_psi6(box_length, positions):
+    box = freud.Box(Lx=box_length, Ly=box_length, is2D=True)
+    hexatic = freud.order.Hexatic(k=6)
+    hexatic.compute(system=(box, positions), neighbors={"num_neighbors": 6})
+    return np.abs(hexatic.particle_order)
+
+
+def _random_walk(num_points, box_length, num_frames, step, seed=0):
+    rng = np.random.default_rng(seed)
+    positions = np.column_stack((rng.uniform(0, box_length, (num_points, 2)), np.zeros(num_points)))
+    frames = []
+    for _ in range(num_frames):
+        positions = positions.copy()
+        positions[:, :2] += rng.normal(0, step, (num_points, 2))
+        frames.append(positions)
+    return frames
+
+
+def test_reuse_matches_fresh_freud_query():
+    box_length = 40.0
+    reuse = HexaticNeighborReuse(skin=0.5)
+    for positions in _random_walk(1500, box_length, num_frames=12, step=0.02):
+        reuse.compute(box_length, box_length, positions)
+        fresh = _fresh_psi6(box_length, positions)
+        # Only float32 rounding in freud separates the two for very close pairs
+        assert np.mean(np.abs(np.abs(reuse.particle_order) - fresh) > 1e-3) < 0.005
+        assert np.isclose(np.mean(np.abs(reuse.particle_order)), np.mean(fresh), atol=1e-4)
+
+
+def test_reuse_rebuilds_only_when_needed():
+    box_length = 40.0
+    frames = _random_walk(1500, box_length, num_frames=5, step=0.001)
+    reuse = HexaticNeighborReuse(skin=0.5)
+    for positions in frames:
+        reuse.compute(box_length, box_length, positions)
+    assert reuse.rebuilds == 1
+
+    far = frames[-1].copy()
+    far[0, :2] += 1.0
+    reuse.compute(box_length, box_length, far)
+    assert reuse.rebuilds == 2
+
+    reuse.compute(box_length, box_length, far[:-1])
+    assert reuse.rebuilds == 3
+
+
+def test_reuse_with_large_skin_matches_fresh_freud_query():
+    # A skin this large pushes most cutoffs past the 18 kNN candidates, so the
+    # radius-query fallback has to supply the rest
+    box_length = 35.0
+    reuse = HexaticNeighborReuse(skin=3.0)
+    for positions in _random_walk(1200, box_length, num_frames=10, step=0.1, seed=1):
+        reuse.compute(box_length, box_length, positions)
+        fresh = _fresh_psi6(box_length, positions)
+        assert np.mean(np.abs(np.abs(reuse.particle_order) - fresh) > 1e-3) < 0.005
+        assert np.isclose(np.mean(np.abs(reuse.particle_order)), np.mean(fresh), atol=1e-4)
+    assert reuse.rebuilds == 1
+
+
+def test_reuse_handles_frames_with_few_particles():
+    box_length = 10.0
+    for num_points in (3, 6, 7):
+        reuse = HexaticNeighborReuse(skin=0.5)
+        for positions in _random_walk(num_points, box_length, num_frames=3, step=0.05):
+            reuse.compute(box_length, box_length, positions)
+            np.testing.assert_allclose(
+                np.abs(reuse.particle_order), _fresh_psi6(box_length, positions), atol=1e-5
+            )
@@ -0,0 +1,384 @@
+import gzip
+import lzma
+import os
+import shutil
+import struct
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import lammps_parser
+from lammps_parser import (
+    ZSTD_SEEKABLE_MAGIC,
+    ZSTD_SKIPPABLE_MAGIC,
+    TrajectoryCache,
+    LammpsDump,
+    LazyFrame,
+    _tail_frame_offsets,
+    cache_path,
+    convert_to_cache,
+    index_path,
+    load_frame_index,
+    open_cache,
+    open_dump,
+    parse_lammps_dump,
+    read_lammps_frames,
+    read_last_frames,
+)
+
+BUNDLED_DUMP = (
+    Path(__file__).resolve().parent.parent / "results" / "central_pair_interaction.in.lammpstrj"
+)
+BUNDLED_COLUMNS = ["id", "type", "x", "y", "vx", "vy", "fx", "fy", "v_dist"]
+
+
+def _write_dump(path, num_frames=6, num_atoms=20, seed=0):
+    rng = np.random.default_rng(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for frame in range(num_frames):
+            f.write(f"ITEM: TIMESTEP\n{frame * 100}\nITEM: NUMBER OF ATOMS\n{num_atoms}\n")
+            f.write("ITEM: BOX BOUNDS pp pp pp\n0 10\n0 10\n-0.5 0.5\n")
+            f.write("ITEM: ATOMS id type x y vx vy\n")
+            for atom_id, row in enumerate(rng.uniform(0, 10, (num_atoms, 4)), start=1):
+                f.write(f"{atom_id} 1 " + " ".join(f"{value:.6f}" for value in row) + "\n")
+
+
+@pytest.mark.parametrize("block_size", [5, 64, 1000, 1 << 20])
+def test_tail_offsets_match_forward_scan(tmp_path, block_size):
+    dump = tmp_path / "run.lammpstrj"
+    _write_dump(dump)
+    data = dump.read_bytes()
+    forward = [i for i in range(len(data)) if data.startswith(b"ITEM: TIMESTEP", i)]
+
+    assert _tail_frame_offsets(dump, 3, block_size) == forward[-3:]
+    assert _tail_frame_offsets(dump, 100, block_size) == forward
+
+
+@pytest.mark.parametrize("num_frames", [1, 4, 6, 10])
+def test_last_frames_match_forward_read(tmp_path, num_frames):
+    dump = tmp_path / "run.lammpstrj"
+    _write_dump(dump)
+    expected = list(read_lammps_frames(dump))[-num_frames:]
+
+    frames = read_last_frames(dump, num_frames)
+    assert [f["timestep"] for f in frames] == [f["timestep"] for f in expected]
+    for frame, reference in zip(frames, expected):
+        assert np.array_equal(frame["atoms"], reference["atoms"])
+    assert [f["timestep"] for f in read_lammps_frames(dump, last=num_frames)] == [
+        f["timestep"] for f in expected
+    ]
+
+
+def test_incomplete_final_frame_is_skipped(tmp_path):
+    dump = tmp_path / "run.lammpstrj"
+    _write_dump(dump)
+    data = dump.read_bytes()
+    dump.write_bytes(data[:-30])
+
+    assert [f["timestep"] for f in read_last_frames(dump, 2)] == [300, 400]
+
+
+def _write_seekable_zstd(path, data, frame_size):
+    zstandard = pytest.importorskip("zstandard")
+    compressor = zstandard.ZstdCompressor()
+    frames, entries = [], []
+    for start in range(0, len(data), frame_size):
+        chunk = data[start : start + frame_size]
+        frames.append(compressor.compress(chunk))
+        entries.append(struct.pack("<II", len(frames[-1]), len(chunk)))
+    table = b"".join(entries) + struct.pack("<IBI", len(entries), 0, ZSTD_SEEKABLE_MAGIC)
+    path.write_bytes(
+        b"".join(frames) + struct.pack("<II", ZSTD_SKIPPABLE_MAGIC, len(table)) + table
+    )
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".xz", ".zst", ".seekable.zst"])
+def test_compressed_dumps_match_plain_text(tmp_path, suffix):
+    plain = tmp_path / "run.lammpstrj"
+    _write_dump(plain)
+    data = plain.read_bytes()
+    compressed = tmp_path / f"run.lammpstrj{suffix}"
+    if suffix == ".gz":
+        compressed.write_bytes(gzip.compress(data))
+    elif suffix == ".xz":
+        compressed.write_bytes(lzma.compress(data))
+    elif suffix == ".zst":
+        zstandard = pytest.importorskip("zstandard")
+        compressed.write_bytes(zstandard.ZstdCompressor().compress(data))
+    else:
+        _write_seekable_zstd(compressed, data, frame_size=500)
+
+    with open_dump(compressed, binary=True, threads=3) as stream:
+        assert stream.read() == data
+
+    expected = list(read_lammps_frames(plain))
+    frames = list(read_lammps_frames(compressed))
+    assert [f["timestep"] for f in frames] == [f["timestep"] for f in expected]
+    for frame, reference in zip(frames, expected):
+        assert np.array_equal(frame["atoms"], reference["atoms"])
+
+    assert [f["timestep"] for f in read_last_frames(compressed, 2)] == [400, 500]
+    index = load_frame_index(compressed)
+    assert np.array_equal(index.offsets, load_frame_index(plain).offsets)
+
+
+def test_bundled_dump_parses_into_structured_arrays():
+    frames = list(read_lammps_frames(BUNDLED_DUMP, use_cache=False))
+
+    assert len(frames) == 251
+    assert [f["timestep"] for f in frames] == list(range(0, 25001, 100))
+    for frame in frames:
+        assert frame["num_atoms"] == len(frame["atoms"]) == 100
+        assert frame["columns"] == BUNDLED_COLUMNS
+        np.testing.assert_array_equal(frame["box_bounds"], [[0, 200], [0, 200], [-0.5, 0.5]])
+        assert sorted(frame["atoms"]["id"]) == list(range(1, 101))
+
+    atoms = frames[0]["atoms"]
+    assert frames[0]["atom_header"] == "ITEM: ATOMS " + " ".join(BUNDLED_COLUMNS)
+    assert atoms.dtype["id"] == np.int64 and atoms.dtype["type"] == np.int64
+    assert atoms.dtype["x"] == np.float64 and atoms.dtype["v_dist"] == np.float64
+    assert atoms[0].tolist() == (
+        24,
+        1,
+        9.30586,
+        3.51568,
+        906.941,
+        964.843,
+        -8071.42,
+        -9720.68,
+        132.418,
+    )
+    assert frames[-1]["atoms"][-1].tolist() == (
+        95,
+        1,
+        98.6871,
+        105.661,
+        0.471862,
+        -1.08687,
+        240.272,
+        -160.015,
+        5.81082,
+    )
+
+
+def test_parse_lammps_dump_yields_raw_lines_of_the_same_frames():
+    frames = list(parse_lammps_dump(BUNDLED_DUMP))
+
+    assert [f["timestep"] for f in frames] == list(range(0, 25001, 100))
+    first = frames[0]
+    assert first["num_atoms"] == len(first["atoms"]) == 100
+    assert [line.split() for line in first["box_bounds"]] == [
+        ["0.0000000000000000e+00", "2.0000000000000000e+02"],
+        ["0.0000000000000000e+00", "2.0000000000000000e+02"],
+        ["-5.0000000000000000e-01", "5.0000000000000000e-01"],
+    ]
+    assert first["atom_header"] == "ITEM: ATOMS " + " ".join(BUNDLED_COLUMNS)
+    assert first["atoms"][0].split() == [
+        "24",
+        "1",
+        "9.30586",
+        "3.51568",
+        "906.941",
+        "964.843",
+        "-8071.42",
+        "-9720.68",
+        "132.418",
+    ]
+
+
+def _assert_same_frame(frame, reference):
+    assert frame["timestep"] == reference["timestep"]
+    assert frame["num_atoms"] == reference["num_atoms"]
+    assert frame["columns"] == reference["columns"]
+    np.testing.assert_array_equal(frame["box_bounds"], reference["box_bounds"])
+    assert np.array_equal(frame["atoms"], reference["atoms"])
+
+
+@pytest.fixture
+def bundled_copy(tmp_path):
+    """The bundled dump copied to tmp_path, so sidecar files are not written into the repo."""
+    return Path(shutil.copy(BUNDLED_DUMP, tmp_path / BUNDLED_DUMP.name))
+
+
+def test_frame_index_is_built_and_stored(bundled_copy):
+    data = bundled_copy.read_bytes()
+    forward = [i for i in range(len(data)) if data.startswith(b"ITEM: TIMESTEP", i)]
+
+    index = load_frame_index(bundled_copy)
+    assert index.offsets.tolist() == forward
+    assert index.timesteps.tolist() == list(range(0, 25001, 100))
+    assert index.num_atoms.tolist() == [100] * 251
+    assert os.path.exists(index_path(bundled_copy))
+
+
+def test_frame_index_is_reused_while_the_dump_is_unchanged(bundled_copy, monkeypatch):
+    index = load_frame_index(bundled_copy)
+
+    def no_scan(filename):
+        raise AssertionError("the stored index should have been reused")
+
+    monkeypatch.setattr(lammps_parser, "_scan_frame_offsets", no_scan)
+    reused = load_frame_index(bundled_copy)
+    for stored, built in zip(reused, index):
+        np.testing.assert_array_equal(stored, built)
+
+
+def test_frame_index_is_rebuilt_when_the_dump_changes(tmp_path, monkeypatch):
+    dump = tmp_path / "run.lammpstrj"
+    _write_dump(dump, num_frames=4)
+    assert len(load_frame_index(dump).offsets) == 4
+
+    _write_dump(dump, num_frames=6)
+    assert load_frame_index(dump).timesteps.tolist() == [0, 100, 200, 300, 400, 500]
+
+    # Same size, newer mtime (e.g. rewritten in place) also invalidates the index
+    scans = []
+    scan = lammps_parser._scan_frame_offsets
+
+    def counting_scan(filename):
+        scans.append(filename)
+        return scan(filename)
+
+    monkeypatch.setattr(lammps_parser, "_scan_frame_offsets", counting_scan)
+    stat = os.stat(dump)
+    os.utime(dump, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert len(load_frame_index(dump).offsets) == 6
+    assert len(scans) == 1
+    load_frame_index(dump, rebuild=True)
+    assert len(scans) == 2
+
+
+def test_random_access_matches_eager_parser(bundled_copy):
+    expected = list(read_lammps_frames(bundled_copy, use_cache=False))
+    dump = LammpsDump(bundled_copy)
+
+    assert len(dump) == len(expected)
+    _assert_same_frame(dump.frames[0], expected[0])
+    _assert_same_frame(dump.frames[-1], expected[-1])
+    every_50th = dump.frames[::50]
+    assert every_50th.timesteps.tolist() == [f["timestep"] for f in expected[::50]]
+    for frame, reference in zip(every_50th, expected[::50]):
+        _assert_same_frame(frame, reference)
+    _assert_same_frame(dump.at_timestep(12300), expected[123])
+    with pytest.raises(KeyError):
+        dump.at_timestep(12345)
+
+
+def test_mmap_frames_match_eager_parser(bundled_copy):
+    expected = list(read_lammps_frames(bundled_copy, use_cache=False))
+    with LammpsDump(bundled_copy, use_mmap=True) as dump:
+        frames = list(dump.frames)
+        assert all(isinstance(frame, LazyFrame) for frame in frames)
+        for frame, reference in zip(frames, expected):
+            assert dict(frame).keys() == reference.keys()
+            _assert_same_frame(frame, reference)
+        _assert_same_frame(dump.frames[-1], expected[-1])
+        _assert_same_frame(dump.at_timestep(100), expected[1])
+
+
+def test_lazy_frame_select_matches_full_parse(bundled_copy):
+    reference = next(read_lammps_frames(bundled_copy, use_cache=False))
+    with LammpsDump(bundled_copy, use_mmap=True) as dump:
+        frame = dump.frames[0]
+        assert (frame["timestep"], frame["num_atoms"]) == (0, 100)
+
+        positions = frame.select("x", "y")
+        assert positions.dtype.names == ("x", "y")
+        np.testing.assert_array_equal(positions["x"], reference["atoms"]["x"])
+        np.testing.assert_array_equal(positions["y"], reference["atoms"]["y"])
+        with pytest.raises(KeyError):
+            frame.select("z")
+
+
+def test_lazy_frame_parses_only_what_is_requested(tmp_path):
+    # Unparseable vy values and a missing BOX BOUNDS block only fail when they are read
+    dump = tmp_path / "run.lammpstrj"
+    _write_dump(dump, num_frames=2)
+    text = dump.read_text(encoding="utf-8")
+    first, second = text.split("ITEM: TIMESTEP")[1:]
+    first = "\n".join(
+        line if line.startswith("ITEM") or line.count(" ") != 5 else line.rsplit(" ", 1)[0] + " bad"
+        for line in first.split("\n")
+    )
+    second = second.replace("ITEM: BOX BOUNDS pp pp pp\n0 10\n0 10\n-0.5 0.5\n", "")
+    dump.write_text(f"ITEM: TIMESTEP{first}ITEM: TIMESTEP{second}", encoding="utf-8")
+
+    with LammpsDump(dump, use_mmap=True) as dump_view:
+        frame = dump_view.frames[0]
+        assert frame["columns"] == ["id", "type", "x", "y", "vx", "vy"]
+        assert frame.select("x", "y").shape == (20,)
+        with pytest.raises(ValueError):
+            frame.select("vy")
+        with pytest.raises(ValueError):
+            frame["atoms"]
+
+        frame = dump_view.frames[1]
+        assert (frame["timestep"], frame["num_atoms"]) == (100, 20)
+        with pytest.raises(ValueError, match="Malformed frame"):
+            frame["box_bounds"]
+
+
+def test_last_frames_of_bundled_dump_match_full_parse(bundled_copy):
+    expected = list(read_lammps_frames(bundled_copy, use_cache=False))
+    for num_frames in (1, 7, 251, 300):
+        frames = read_last_frames(bundled_copy, num_frames, use_cache=False)
+        assert len(frames) == min(num_frames, 251)
+        for frame, reference in zip(frames, expected[-num_frames:]):
+            _assert_same_frame(frame, reference)
+
+
+def test_cached_frames_match_full_parse(bundled_copy):
+    expected = list(read_lammps_frames(bundled_copy, use_cache=False))
+    assert open_cache(bundled_copy) is None
+
+    assert convert_to_cache(bundled_copy) == cache_path(bundled_copy)
+    cache = open_cache(bundled_copy)
+    assert isinstance(cache, TrajectoryCache)
+    assert len(cache) == len(expected)
+    for frame, reference in zip(cache, expected):
+        _assert_same_frame(frame, reference)
+        assert frame["atoms"].dtype == reference["atoms"].dtype
+    np.testing.assert_array_equal(
+        cache.columns["vx"][cache.offsets[3] : cache.offsets[4]], expected[3]["atoms"]["vx"]
+    )
+
+
+def test_readers_use_an_up_to_date_cache(bundled_copy, monkeypatch):
+    expected = list(read_lammps_frames(bundled_copy, use_cache=False))
+    convert_to_cache(bundled_copy)
+
+    def no_text(*args, **kwargs):
+        raise AssertionError("frames should come from the cache")
+
+    monkeypatch.setattr(lammps_parser, "open_dump", no_text)
+    monkeypatch.setattr(lammps_parser, "_tail_frame_offsets", no_text)
+    for frame, reference in zip(read_lammps_frames(bundled_copy), expected):
+        _assert_same_frame(frame, reference)
+    for frame, reference in zip(read_last_frames(bundled_copy, 5), expected[-5:]):
+        _assert_same_frame(frame, reference)
+
+
+def test_stale_cache_is_ignored(tmp_path):
+    dump = tmp_path / "run.lammpstrj"
+    _write_dump(dump, num_frames=4)
+    convert_to_cache(dump)
+    _write_dump(dump, num_frames=6, seed=1)
+
+    assert open_cache(dump) is None
+    expected = list(read_lammps_frames(dump, use_cache=False))
+    assert [f["timestep"] for f in read_lammps_frames(dump)] == [f["timestep"] for f in expected]
+    for frame, reference in zip(read_last_frames(dump, 2), expected[-2:]):
+        _assert_same_frame(frame, reference)
+
+
+def test_cache_rejects_columns_changing_mid_trajectory(tmp_path):
+    dump = tmp_path / "run.lammpstrj"
+    _write_dump(dump, num_frames=2)
+    text = dump.read_text(encoding="utf-8")
+    last = text.rindex("ITEM: ATOMS id type x y vx vy")
+    dump.write_text(text[:last] + text[last:].replace("vx vy", "fx fy", 1), encoding="utf-8")
+
+    with pytest.raises(ValueError, match="ATOMS columns change"):
+        convert_to_cache(dump)
+    assert not os.path.exists(cache_path(dump))
@@ -0,0 +1,69 @@
+import gzip
+import lzma
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from lammps_parser import convert_to_cache, read_lammps_frames
+from parallel_frames import map_frames, split_frame_ranges
+
+BUNDLED_DUMP = (
+    Path(__file__).resolve().parent.parent / "results" / "central_pair_interaction.in.lammpstrj"
+)
+
+
+def _frame_summary(frame):
+    """Module-level (picklable) per-frame analysis for the worker processes."""
+    atoms = frame["atoms"]
+    return frame["num_atoms"], float(np.sum(atoms["x"])), int(atoms["id"][0])
+
+
+@pytest.mark.parametrize("num_frames", [1, 5, 251])
+@pytest.mark.parametrize("num_chunks", [1, 3, 8, 1000])
+def test_ranges_cover_every_frame_once(num_frames, num_chunks):
+    offsets = np.cumsum(np.random.default_rng(num_frames).integers(50, 500, num_frames))
+    ranges = split_frame_ranges(offsets, num_chunks)
+
+    positions = np.concatenate([np.arange(first, first + count) for first, count, _ in ranges])
+    np.testing.assert_array_equal(positions, np.arange(num_frames))
+    assert len(ranges) == min(num_chunks, num_frames)
+    assert all(count > 0 for _, count, _ in ranges)
+    assert [start_byte for _, _, start_byte in ranges] == [offsets[first] for first, _, _ in ranges]
+
+
+def test_no_ranges_for_an_empty_dump():
+    assert split_frame_ranges(np.empty(0, dtype=np.int64), 4) == []
+
+
+@pytest.mark.parametrize("source", ["plain", "cache", ".gz", ".xz"])
+def test_parallel_results_match_serial_run(tmp_path, source):
+    dump = tmp_path / BUNDLED_DUMP.name
+    if source == ".gz":
+        dump = dump.with_name(dump.name + ".gz")
+        dump.write_bytes(gzip.compress(BUNDLED_DUMP.read_bytes()))
+    elif source == ".xz":
+        dump = dump.with_name(dump.name + ".xz")
+        dump.write_bytes(lzma.compress(BUNDLED_DUMP.read_bytes()))
+    else:
+        shutil.copy(BUNDLED_DUMP, dump)
+        if source == "cache":
+            convert_to_cache(dump)
+
+    serial = [
+        (frame["timestep"], _frame_summary(frame))
+        for frame in read_lammps_frames(BUNDLED_DUMP, use_cache=False)
+    ]
+    assert map_frames(dump, _frame_summary, workers=3) == serial
+    assert map_frames(dump, _frame_summary, workers=1, chunks_per_worker=1) == serial
+
+
+def test_verbose_run_reports_speedup_over_one_worker(tmp_path, capsys):
+    dump = Path(shutil.copy(BUNDLED_DUMP, tmp_path / BUNDLED_DUMP.name))
+    map_frames(dump, _frame_summary, workers=2, verbose=1)
+
+    report = capsys.readouterr().out
+    assert "Analyzed 251 frames" in report
+    assert "x speedup over one worker" in report
+    assert "% parallel efficiency" in report
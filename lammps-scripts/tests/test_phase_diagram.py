@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+
+import phase_diagram
+from phase_diagram import RESULTS_CACHE_NAME, collect_phase_data
+
+
+def _write_dump(path, num_frames=4, num_atoms=50, seed=0):
+    rng = np.random.default_rng(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for frame in range(num_frames):
+            f.write(f"ITEM: TIMESTEP\n{frame * 100}\nITEM: NUMBER OF ATOMS\n{num_atoms}\n")
+            f.write("ITEM: BOX BOUNDS pp pp pp\n0 10\n0 10\n-0.5 0.5\n")
+            f.write("ITEM: ATOMS id type x y z\n")
+            for atom_id, (x, y) in enumerate(rng.uniform(0, 10, (num_atoms, 2)), start=1):
+                f.write(f"{atom_id} 1 {x:.6f} {y:.6f} 0\n")
+
+
+def _count_analyses(monkeypatch):
+    calls = []
+    original = phase_diagram.final_frames_psi6
+
+    def counting(filename, num_frames=1):
+        calls.append(os.path.basename(filename))
+        return original(filename, num_frames)
+
+    monkeypatch.setattr(phase_diagram, "final_frames_psi6", counting)
+    return calls
+
+
+def test_final_frame_matches_full_analysis(tmp_path):
+    dump = tmp_path / "run.in_50_1.0.lammpstrj"
+    _write_dump(dump)
+
+    _, values = phase_diagram.parse_and_calc_hexatic(str(dump), verbose=0)
+    _, _, psi6 = collect_phase_data([str(dump)], verbose=0)
+    assert np.isclose(psi6[0], values[-1])
+
+    _, _, psi6 = collect_phase_data([str(dump)], verbose=0, num_frames=2)
+    assert np.isclose(psi6[0], np.mean(values[-2:]))
+
+
+def test_only_new_or_changed_files_are_recomputed(tmp_path, monkeypatch):
+    first = tmp_path / "run.in_50_1.0.lammpstrj"
+    second = tmp_path / "run.in_50_2.0.lammpstrj"
+    _write_dump(first, seed=1)
+    _write_dump(second, seed=2)
+    cache_file = str(tmp_path / RESULTS_CACHE_NAME)
+    calls = _count_analyses(monkeypatch)
+
+    expected = collect_phase_data([str(first), str(second)], 0, cache_file=cache_file)
+    assert len(calls) == 2
+
+    assert collect_phase_data([str(first), str(second)], 0, cache_file=cache_file) == expected
+    assert len(calls) == 2
+
+    _write_dump(second, num_frames=5, seed=3)
+    collect_phase_data([str(first), str(second)], 0, cache_file=cache_file)
+    assert calls[2:] == [second.name]
@@ -10,61 +10,64 @@ import os
 import matplotlib.pyplot as plt
 import numpy as np
 
-from lammps_parser import parse_lammps_dump
+from lammps_parser import read_lammps_frames
+from parallel_frames import map_frames
 
 
-def _process_velocity_data(filename):
+def _process_velocity_data(filename, workers=1):
     """
     Reads the LAMMPS trajectory file and computes velocity statistics per frame.
+    Frames are analyzed in parallel when workers is not 1 (0 = all cores).
     Returns lists of timesteps, means, and standard deviations.
     """
     timesteps = []
     avg_velocities = []
     std_velocities = []
 
-    for frame in parse_lammps_dump(filename):
-        timesteps.append(frame["timestep"])
-        atom_lines = frame["atoms"]
-
-        # Parse atom header to find column indices
-        atom_header = frame["atom_header"]
-        # Format is usually "ITEM: ATOMS id type x y vx vy"
-        header_parts = atom_header.split()[2:]
-        try:
-            vx_idx = header_parts.index("vx")
-            vy_idx = header_parts.index("vy")
-        except ValueError:
-            # If columns are missing, skip this frame or assume defaults?
-            # Original code would skip if columns missing.
-            avg_velocities.append(0)
-            std_velocities.append(0)
-            continue
-
-        raw_data = []
-        for line in atom_lines:
-            parts = line.split()
-            if len(parts) > max(vx_idx, vy_idx):
-                vx = float(parts[vx_idx])
-                vy = float(parts[vy_idx])
-                raw_data.append(np.sqrt(vx**2 + vy**2))
-
-        if raw_data:
-            avg_velocities.append(np.mean(raw_data))
-            std_velocities.append(np.std(raw_data))
-        else:
-            avg_velocities.append(0)
-            std_velocities.append(0)
+    if workers != 1:
+        results = map_frames(filename, frame_velocity_stats, workers=workers, verbose=1)
+    else:
+        results = (
+            (frame["timestep"], frame_velocity_stats(frame))
+            for frame in read_lammps_frames(filename)
+        )
+
+    for timestep, (avg_velocity, std_velocity) in results:
+        timesteps.append(timestep)
+        avg_velocities.append(avg_velocity)
+        std_velocities.append(std_velocity)
 
     return timesteps, avg_velocities, std_velocities
 
 
-def plot_velocity_over_time(filename, output_dir, no_show=False):
+def frame_velocity_stats(frame):
+    """
+    Computes the mean and standard deviation of the velocity magnitude for one frame.
+    Frames without vx/vy columns (or without atoms) report zeros.
+    """
+    atoms = frame["atoms"]
+    # Format is usually "ITEM: ATOMS id type x y vx vy"
+    if "vx" not in frame["columns"] or "vy" not in frame["columns"] or len(atoms) == 0:
+        return 0, 0
+
+    speeds = np.hypot(atoms["vx"], atoms["vy"])
+    return np.mean(speeds), np.std(speeds)
+
+
+def plot_velocity_over_time(filename, output_dir, no_show=False, workers=1):
     """
     Orchestrates the reading of data and plotting of the velocity graph.
     """
-    timesteps, avg_velocities, std_velocities = _process_velocity_data(filename)
+    timesteps, avg_velocities, std_velocities = _process_velocity_data(filename, workers)
+    plot_velocity_stats(filename, timesteps, avg_velocities, std_velocities, output_dir, no_show)
+
 
-    # Plotting
+def plot_velocity_stats(
+    filename, timesteps, avg_velocities, std_velocities, output_dir=None, no_show=False
+):
+    """
+    Plots per-frame velocity statistics already computed from a LAMMPS trajectory file.
+    """
     plt.figure(figsize=(10, 6))
     plt.errorbar(
         timesteps,
@@ -113,6 +116,12 @@ if __name__ == "__main__":
     )
     PARSER.add_argument("--output_dir", default=None, help="output directory to save graph file to")
     PARSER.add_argument("--no-show", action="store_true", help="Do not display the graph")
+    PARSER.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for frame-parallel analysis (0 = all cores)",
+    )
     ARGS = PARSER.parse_args()
 
-    plot_velocity_over_time(ARGS.filename, ARGS.output_dir, ARGS.no_show)
+    plot_velocity_over_time(ARGS.filename, ARGS.output_dir, ARGS.no_show, ARGS.workers)
@@ -0,0 +1,160 @@
+"""Batched LodeSTAR inference and out-of-memory-adaptive batching for track.py.
+
+detect_lodestar_batch stacks a batch of frames into one (B, 1, H, W) tensor: frames are
+grey-averaged and min-max normalised in one vectorised pass, run through model.detect in
+a single call, and converted back into one sv.Detections per frame, with the greedy
+centre-distance NMS from nms.py applied to all frames together.
+
+AdaptiveBatchDetector wraps any batched detection function (RF-DETR, YOLO, LodeSTAR or a
+TiledDetector) and halves the batch size when a batch runs out of device memory.
+"""
+
+import sys
+
+import numpy as np
+
+from nms import suppress_close_batch
+
+
+def _lodestar_input(frames):
+    """Stacks frames into a (B, H, W) float32 array, each min-max normalised to [0, 1].
+
+    Colour frames are averaged to grayscale first.
+    """
+    stack = np.asarray(frames, dtype=np.float32)
+    if stack.ndim == 4:
+        stack = np.mean(stack, axis=3)
+
+    flat = stack.reshape(len(stack), -1)
+    f_min = flat.min(axis=1)
+    f_ptp = flat.max(axis=1) - f_min
+    f_ptp[f_ptp == 0] = 1.0
+    return (stack - f_min[:, None, None]) / f_ptp[:, None, None]
+
+
+def _lodestar_boxes(detections_raw, box_size=40):
+    """(N, 4) xyxy boxes and (N,) confidences from LodeSTAR's (N, outputs) (y, x[, r, ...]) rows.
+
+    The third output, when present, is both the box radius (by absolute value) and the
+    confidence; otherwise boxes are box_size wide with confidence 1.
+    """
+    if detections_raw is None or len(detections_raw) == 0:
+        return np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.float32)
+
+    raw = np.asarray(detections_raw, dtype=np.float32)
+    y, x = raw[:, 0], raw[:, 1]
+    if raw.shape[1] >= 3:
+        r, confidence = np.abs(raw[:, 2]), raw[:, 2]
+    else:
+        r = np.full(len(raw), box_size / 2, dtype=np.float32)
+        confidence = np.ones(len(raw), dtype=np.float32)
+    xyxy = np.column_stack([x - r, y - r, x + r, y + r]).astype(np.float32)
+    return xyxy, confidence
+
+
+def _lodestar_detections_batch(detections_raw, nms_distance=None, box_size=40):
+    """Converts LodeSTAR's per-frame detection arrays into one sv.Detections per frame.
+
+    With nms_distance, detections closer than that to a more confident one are dropped;
+    all frames go through the NMS together.
+    """
+    import supervision as sv
+
+    boxes = [_lodestar_boxes(raw, box_size) for raw in detections_raw]
+    if nms_distance and nms_distance > 0:
+        keeps = suppress_close_batch(
+            [(xyxy[:, :2] + xyxy[:, 2:]) / 2 for xyxy, _ in boxes],
+            nms_distance,
+            [confidence for _, confidence in boxes],
+        )
+        boxes = [(xyxy[keep], confidence[keep]) for (xyxy, confidence), keep in zip(boxes, keeps)]
+
+    return [
+        (
+            sv.Detections(xyxy=xyxy, confidence=confidence, class_id=np.zeros(len(xyxy), dtype=int))
+            if len(xyxy)
+            else sv.Detections.empty()
+        )
+        for xyxy, confidence in boxes
+    ]
+
+
+def _lodestar_detections(detections_raw, nms_distance=None, box_size=40):
+    """Converts one frame's LodeSTAR detections into sv.Detections."""
+    (detections,) = _lodestar_detections_batch([detections_raw], nms_distance, box_size)
+    return detections
+
+
+def detect_lodestar_batch(
+    model, frames, threshold, device, alpha=0.5, nms_distance=None, box_size=40
+):
+    """Runs LodeSTAR on a list of equally sized frames in one call.
+
+    Returns one sv.Detections per frame, identical to calling detect_lodestar on each.
+    """
+    import torch
+
+    tensor = torch.from_numpy(_lodestar_input(frames)).unsqueeze(1).to(device)
+    # Match model dtype (e.g. float16 when fp16=True)
+    tensor = tensor.to(next(model.parameters()).dtype)
+
+    with torch.inference_mode():
+        detections_raw = model.detect(tensor, alpha=alpha, beta=0.5, cutoff=threshold, mode="ratio")
+
+    if not isinstance(detections_raw, list):
+        detections_raw = [detections_raw]
+    return _lodestar_detections_batch(detections_raw, nms_distance, box_size)
+
+
+def detect_lodestar(model, frame, threshold, device, alpha=0.5, nms_distance=None, box_size=40):
+    """Runs LodeSTAR on a single frame (see detect_lodestar_batch)."""
+    (detections,) = detect_lodestar_batch(
+        model, [frame], threshold, device, alpha, nms_distance, box_size
+    )
+    return detections
+
+
+def _is_out_of_memory(error):
+    """True for a torch out-of-memory error (CUDA or MPS), without importing torch."""
+    if type(error).__name__ == "OutOfMemoryError":
+        return True
+    return isinstance(error, RuntimeError) and "out of memory" in str(error).lower()
+
+
+def _empty_device_cache():
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+class AdaptiveBatchDetector:
+    """Runs a batched detection function, halving the batch size on out-of-memory errors.
+
+    detect_batch takes a list of frames and returns one sv.Detections per frame. Frames
+    passed to the detector are split into batches of at most batch_size; when a batch runs
+    out of memory it is retried in halves, and the smaller size is kept for later batches.
+    An out-of-memory error for a single frame is re-raised.
+    """
+
+    def __init__(self, detect_batch, batch_size=1):
+        self.detect_batch = detect_batch
+        self.batch_size = max(1, batch_size)
+
+    def __call__(self, frames):
+        results = []
+        start = 0
+        while start < len(frames):
+            batch = frames[start : start + self.batch_size]
+            try:
+                results.extend(self.detect_batch(batch))
+            except Exception as e:
+                if not _is_out_of_memory(e) or self.batch_size == 1:
+                    raise
+                _empty_device_cache()
+                self.batch_size = max(1, len(batch) // 2)
+                print(
+                    f"\nOut of memory with {len(batch)} frames; batch size is now {self.batch_size}"
+                )
+                continue
+            start += len(batch)
+        return results
@@ -0,0 +1,194 @@
+"""Pipelined frame processing: decode → inference → output.
+
+The three stages run concurrently, so the detection model is not idle while the next
+frame is decoded or while the previous frame's detections are post-processed:
+
+- decode: a thread pool reads and normalises frames through FrameSource random access,
+  at most ``queue_size`` frames ahead of inference. Sources that only decode in order
+  (videos) use a single read-ahead thread instead.
+- inference: runs in the calling thread on batches of consecutive frames, because models
+  are not assumed to be thread-safe. PyTorch and OpenCV release the GIL, so it overlaps
+  the other stages.
+- output: one thread consumes each frame's result in frame order, fed through a bounded
+  queue.
+
+StageTimes records the time spent in each stage and how long inference waited on the
+other two, so the bottleneck stage can be identified.
+
+Example:
+    times = run_pipeline(frames, predict_batch, store_detections, batch_size=8)
+    print(times.summary())
+"""
+
+import collections
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from frame_source import iter_read_ahead
+
+STAGES = ("decode", "inference", "output")
+
+_DONE = object()
+
+
+class StageTimes:
+    """Seconds spent in each pipeline stage, summed over all frames (and decode threads)."""
+
+    def __init__(self, decode_workers=1):
+        self.decode_workers = decode_workers
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.frames = 0
+        self.wall = 0.0
+        # Inference time spent waiting for a decoded frame / for room in the output queue
+        self.waiting_for_decode = 0.0
+        self.waiting_for_output = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.seconds[stage] += seconds
+
+    def bottleneck(self):
+        """Stage with the highest busy time per worker, i.e. the one limiting throughput."""
+        busy = dict(self.seconds)
+        busy["decode"] /= self.decode_workers
+        return max(busy, key=busy.get)
+
+    def summary(self):
+        """Multi-line per-stage timing report."""
+        lines = [f"Stage timing ({self.frames} frames in {self.wall:.1f} s):"]
+        for stage, seconds in self.seconds.items():
+            per_frame = 1000 * seconds / self.frames if self.frames else 0.0
+            workers = f" ({self.decode_workers} threads)" if stage == "decode" else ""
+            lines.append(f"  {stage:<10} {seconds:8.2f} s  {per_frame:8.1f} ms/frame{workers}")
+        lines.append(
+            f"  inference waited {self.waiting_for_decode:.2f} s for frames and "
+            f"{self.waiting_for_output:.2f} s for output"
+        )
+        if self.frames:
+            lines.append(f"  bottleneck: {self.bottleneck()}")
+        return "\n".join(lines)
+
+
+def _timed(frames, times):
+    """Decodes frames sequentially, adding the time of each frame to the decode stage."""
+    frames_iter = frames.sequential_frames()
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                frame = next(frames_iter)
+            except StopIteration:
+                return
+            times.add("decode", time.perf_counter() - start)
+            yield frame
+    finally:
+        frames_iter.close()
+
+
+def _decoded(frames, decode_workers, queue_size, times):
+    """Yields all frames in order, decoded ahead of the consumer."""
+    if decode_workers <= 1 or not frames.parallel_reads:
+        yield from iter_read_ahead(lambda: _timed(frames, times), queue_size)
+        return
+
+    def decode(index):
+        start = time.perf_counter()
+        frame = frames[index]
+        times.add("decode", time.perf_counter() - start)
+        return frame
+
+    num_frames = len(frames)
+    pending = collections.deque()
+    next_index = 0
+    with ThreadPoolExecutor(decode_workers, thread_name_prefix="decode") as pool:
+        try:
+            while pending or next_index < num_frames:
+                while next_index < num_frames and len(pending) < queue_size:
+                    pending.append(pool.submit(decode, next_index))
+                    next_index += 1
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def run_pipeline(
+    frames, infer, consume, batch_size=1, decode_workers=2, queue_size=8, progress=None
+):
+    """Runs infer on every frame of a FrameSource and passes the results to consume.
+
+    Args:
+        frames: FrameSource to process.
+        infer: Called as infer(batch) in the calling thread with a list of up to batch_size
+            consecutive frames; returns a list with one result per frame.
+        consume: Called as consume(index, result) in the output thread, in frame order.
+        batch_size: Frames per infer call.
+        decode_workers: Threads decoding frames (sources without parallel reads use one).
+        queue_size: Maximum frames decoded ahead of inference (at least batch_size), and
+            maximum results waiting for the output stage.
+        progress: Optional callable invoked as progress(n) after inference of n frames
+            (e.g. tqdm.update).
+
+    Returns:
+        StageTimes
+
+    Exceptions raised by any stage stop the pipeline and are re-raised here.
+    """
+    queue_size = max(queue_size, batch_size, 1)
+    parallel = decode_workers > 1 and frames.parallel_reads
+    times = StageTimes(decode_workers if parallel else 1)
+    results = queue.Queue(maxsize=queue_size)
+    errors = []
+
+    def output():
+        while True:
+            item = results.get()
+            if item is _DONE:
+                return
+            if errors:
+                continue
+            start = time.perf_counter()
+            try:
+                consume(*item)
+            except Exception as e:
+                errors.append(e)
+            times.add("output", time.perf_counter() - start)
+
+    output_thread = threading.Thread(target=output, name="detection-output", daemon=True)
+    output_thread.start()
+    wall_start = time.perf_counter()
+    decoded = _decoded(frames, decode_workers, queue_size, times)
+    try:
+        while not errors:
+            start = time.perf_counter()
+            batch = list(itertools.islice(decoded, batch_size))
+            if not batch:
+                break
+            infer_start = time.perf_counter()
+            times.waiting_for_decode += infer_start - start
+            batch_results = infer(batch)
+            if len(batch_results) != len(batch):
+                raise ValueError(
+                    f"infer returned {len(batch_results)} results for {len(batch)} frames"
+                )
+            put_start = time.perf_counter()
+            times.add("inference", put_start - infer_start)
+            for result in batch_results:
+                results.put((times.frames, result))
+                times.frames += 1
+            times.waiting_for_output += time.perf_counter() - put_start
+            if progress is not None:
+                progress(len(batch))
+    finally:
+        decoded.close()
+        results.put(_DONE)
+        output_thread.join()
+        times.wall = time.perf_counter() - wall_start
+
+    if errors:
+        raise errors[0]
+    return times
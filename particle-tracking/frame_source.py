@@ -0,0 +1,458 @@
+"""Lazy frame sources for videos, multi-page TIFF stacks and image directories.
+
+A frame source behaves like a read-only sequence of uint8 RGB frames (H, W, 3): it has a
+length, supports random access (``source[0]``, ``source[-1]``) and can be iterated any
+number of times. Frames are decoded on demand instead of being loaded up front, so
+stacks larger than RAM can be processed. While iterating, a background thread decodes up
+to ``read_ahead`` frames ahead of the consumer, overlapping file I/O with detection.
+
+Example:
+    with open_frame_source("stack.ome.tif") as frames:
+        for frame in frames:
+            ...
+"""
+
+import functools
+import glob
+import queue
+import re
+import threading
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Frames decoded ahead of the consumer while iterating (0 = decode in the calling thread)
+DEFAULT_READ_AHEAD = 8
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff"}
+TIFF_SUFFIXES = {".tif", ".tiff"}
+
+_DONE = object()
+
+
+def _natural_sort_key(path):
+    """Sort key for filenames with embedded numbers (frame_2.png < frame_10.png)."""
+    return [int(c) if c.isdigit() else c.lower() for c in re.split(r"(\d+)", path.name)]
+
+
+def _to_rgb_uint8(frame):
+    """Convert a single frame (any dtype, grayscale or color) to uint8 RGB (H, W, 3).
+
+    Microscopy TIFFs are typically 16-bit grayscale. PIL silently converts them to
+    all-white when calling .convert("RGB"). This function normalises the pixel range
+    to [0, 255] before promoting to RGB so the content is actually visible.
+    """
+    # CHW → HWC (e.g. tifffile sometimes returns C×H×W for colour TIFFs)
+    if frame.ndim == 3 and frame.shape[0] in (1, 3, 4) and frame.shape[0] < frame.shape[1]:
+        frame = frame.transpose(1, 2, 0)
+    # Drop alpha / extra channels
+    if frame.ndim == 3 and frame.shape[2] == 4:
+        frame = frame[:, :, :3]
+    if frame.ndim == 3 and frame.shape[2] == 1:
+        frame = frame[:, :, 0]
+
+    # Normalise non-uint8 dtypes to [0, 255]
+    if frame.dtype != np.uint8:
+        f = frame.astype(np.float32)
+        f_min, f_max = f.min(), f.max()
+        if f_max > f_min:
+            f = (f - f_min) / (f_max - f_min) * 255.0
+        frame = f.clip(0, 255).astype(np.uint8)
+
+    # Grayscale → RGB
+    if frame.ndim == 2:
+        frame = np.stack([frame, frame, frame], axis=-1)
+
+    return frame
+
+
+def _read_image(path):
+    """Reads one image file as a uint8 RGB frame."""
+    if path.suffix.lower() in TIFF_SUFFIXES:
+        import tifffile
+
+        # PIL silently converts 16-bit (I;16) TIFFs to all-white on .convert("RGB")
+        return _to_rgb_uint8(tifffile.imread(str(path)))
+    with Image.open(path) as image:
+        return np.array(image.convert("RGB"))
+
+
+def _put(buffer, item, stop):
+    """Puts item on a bounded queue, giving up once the consumer has stopped."""
+    while not stop.is_set():
+        try:
+            buffer.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def iter_read_ahead(make_frames, read_ahead):
+    """Iterates the generator make_frames() in a background thread.
+
+    At most read_ahead items are buffered; the generator is closed when the consumer stops
+    early, and exceptions raised by it are re-raised in the consumer.
+    """
+    buffer = queue.Queue(maxsize=read_ahead)
+    stop = threading.Event()
+
+    def produce():
+        frames = make_frames()
+        try:
+            for frame in frames:
+                if not _put(buffer, (frame, None), stop):
+                    return
+            _put(buffer, (_DONE, None), stop)
+        except Exception as e:
+            _put(buffer, (None, e), stop)
+        finally:
+            frames.close()
+
+    thread = threading.Thread(target=produce, name="frame-read-ahead", daemon=True)
+    thread.start()
+    try:
+        while True:
+            frame, error = buffer.get()
+            if error is not None:
+                raise error
+            if frame is _DONE:
+                return
+            yield frame
+    finally:
+        stop.set()
+        thread.join()
+
+
+class FrameSource:
+    """Sequence of uint8 RGB frames that are decoded on demand.
+
+    Subclasses implement __len__ and _read(index, region) for random access, and may
+    override _frames(region) with a faster sequential reader. ``region`` is an optional
+    (x, y, width, height) crop: sources that can read part of a frame touch only those
+    pixels, the others crop the decoded frame.
+    """
+
+    # True if frames can be read concurrently from several threads with source[index]
+    parallel_reads = False
+
+    def __init__(self, read_ahead=DEFAULT_READ_AHEAD):
+        self.read_ahead = read_ahead
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def _read(self, index, region=None):
+        raise NotImplementedError
+
+    def _frames(self, region=None):
+        for index in range(len(self)):
+            yield self._read(index, region)
+
+    def _iterate(self, region):
+        make_frames = functools.partial(self._frames, region)
+        if self.read_ahead > 0:
+            return iter_read_ahead(make_frames, self.read_ahead)
+        return make_frames()
+
+    def __getitem__(self, index):
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError(f"Frame {index} out of range for {n} frames")
+        return self._read(index)
+
+    def __iter__(self):
+        return self._iterate(None)
+
+    def read(self, index, region=None):
+        """Decodes frame index (0 <= index < len), or a region of it, in the calling thread."""
+        return self._read(index, region)
+
+    def sequential_frames(self, region=None):
+        """Generator over all frames (or a region of each), decoded without read-ahead."""
+        return self._frames(region)
+
+    def crop(self, x, y, width, height):
+        """Returns a view of this source whose frames are cropped to the given region."""
+        return CroppedFrameSource(self, (x, y, width, height))
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CroppedFrameSource(FrameSource):
+    """A region of interest of every frame of another FrameSource (see FrameSource.crop)."""
+
+    def __init__(self, source, region):
+        super().__init__(source.read_ahead)
+        self.source = source
+        self.region = region
+        self.parallel_reads = source.parallel_reads
+
+    def __len__(self):
+        return len(self.source)
+
+    def _read(self, index, region=None):
+        return self.source.read(index, self._within(region))
+
+    def _frames(self, region=None):
+        return self.source.sequential_frames(self._within(region))
+
+    def _within(self, region):
+        """Translates a region of the cropped frames into a region of the source frames."""
+        if region is None:
+            return self.region
+        x, y, width, height = region
+        return (self.region[0] + x, self.region[1] + y, width, height)
+
+
+def _crop(frame, region):
+    """Crops an (H, W, ...) frame to an (x, y, width, height) region, if one is given."""
+    if region is None:
+        return frame
+    x, y, width, height = region
+    return frame[y : y + height, x : x + width]
+
+
+class ImageFilesFrameSource(FrameSource):
+    """One frame per image file, in the given order."""
+
+    parallel_reads = True
+
+    def __init__(self, files, read_ahead=DEFAULT_READ_AHEAD):
+        super().__init__(read_ahead)
+        self.files = [Path(f) for f in files]
+
+    def __len__(self):
+        return len(self.files)
+
+    def _read(self, index, region=None):
+        return _crop(_read_image(self.files[index]), region)
+
+
+def memmap_tiff_series(tif, path):
+    """Maps the first series of an open TiffFile straight from the file at path.
+
+    Returns an np.memmap with the series' shape and file byte order, or None if the
+    series is compressed or not stored contiguously.
+    """
+    series = tif.series[0]
+    if series.dataoffset is None:
+        return None
+    return np.memmap(
+        path,
+        dtype=series.dtype.newbyteorder(tif.byteorder),
+        mode="r",
+        offset=series.dataoffset,
+        shape=series.shape,
+    )
+
+
+class TiffFrameSource(FrameSource):
+    """Frames of a (multi-page, possibly OME) TIFF stack.
+
+    The first axis of the stack's first series is the frame axis, after squeezing size-1
+    axes as tifffile.imread does. Pixels are read in the cheapest way the file allows:
+
+    - contiguous, uncompressed stacks are memory-mapped, so a frame (or a crop of it) is
+      sliced straight from the file without decoding whole pages;
+    - tiled or compressed stacks are opened as a zarr array (if ``zarr`` is installed),
+      which decodes only the tiles/strips that overlap the requested region;
+    - otherwise each frame is assembled from the TIFF pages that hold it.
+
+    Cropped frames are normalised to uint8 over the crop only, since the pixels outside
+    it are never read.
+    """
+
+    parallel_reads = True
+
+    def __init__(self, path, read_ahead=DEFAULT_READ_AHEAD):
+        import tifffile
+
+        super().__init__(read_ahead)
+        self.path = Path(path)
+        self._tif = tifffile.TiffFile(str(self.path))
+        # Serialise reads of the shared file handle, so frames can be decoded concurrently
+        self._tif.filehandle.set_lock(True)
+        self._data_lock = threading.Lock()
+        series = self._tif.series[0]
+        shape, axes = series.shape, series.axes
+
+        # A plain image (YX) or a single RGB image (YXS) is one frame
+        self._single_frame = len(shape) == 2 or (len(shape) == 3 and axes.endswith("S"))
+        if self._single_frame:
+            self._num_frames, self._frame_shape = 1, shape
+        else:
+            self._num_frames, self._frame_shape = shape[0], shape[1:]
+        # Position of the Y axis within a frame (X follows it, then samples for RGB)
+        self._y_axis = len(self._frame_shape) - (3 if axes.endswith("S") else 2)
+
+        self._memmap = memmap_tiff_series(self._tif, self.path)
+        self._zarr = None if self._memmap is not None else self._open_zarr(self._tif)
+
+        page_size = int(np.prod(series.keyframe.shape))
+        pages_per_frame, rest = divmod(int(np.prod(self._frame_shape)), page_size)
+        if rest == 0 and len(series.pages) == self._num_frames * pages_per_frame:
+            self._pages_per_frame = pages_per_frame
+        else:
+            self._pages_per_frame = None
+        self._data = None
+
+    @staticmethod
+    def _open_zarr(tif):
+        """Opens a stack as a zarr array decoded chunk by chunk (None without zarr)."""
+        try:
+            import zarr
+        except ImportError:
+            return None
+        return zarr.open(tif.series[0].aszarr(level=0), mode="r")
+
+    def __len__(self):
+        return self._num_frames
+
+    def _pixel_key(self, region):
+        """Index into one frame selecting region (all pixels if region is None)."""
+        if region is None:
+            return ()
+        x, y, width, height = region
+        return (slice(None),) * self._y_axis + (slice(y, y + height), slice(x, x + width))
+
+    def _read_raw(self, tif, zarr_array, index, region):
+        """Reads one frame (or a region of it) without dtype or colour conversion."""
+        pixel_key = self._pixel_key(region)
+        stack_key = pixel_key if self._single_frame else (index,) + pixel_key
+        if self._memmap is not None:
+            # Copies only the selected pixels out of the mapping
+            return np.array(self._memmap[stack_key])
+        if zarr_array is not None:
+            return zarr_array[stack_key]
+        if self._pages_per_frame is None:
+            with self._data_lock:
+                if self._data is None:
+                    self._data = (
+                        tif.series[0]
+                        .asarray()
+                        .reshape((self._num_frames,) + tuple(self._frame_shape))
+                    )
+            return self._data[(index,) + pixel_key]
+        pages = tif.series[0].pages
+        first = index * self._pages_per_frame
+        planes = [pages[first + k].asarray() for k in range(self._pages_per_frame)]
+        return np.stack(planes).reshape(self._frame_shape)[pixel_key]
+
+    def _read(self, index, region=None):
+        return _to_rgb_uint8(self._read_raw(self._tif, self._zarr, index, region))
+
+    def _frames(self, region=None):
+        import tifffile
+
+        # A separate file handle, so the read-ahead thread and random access never share one
+        with tifffile.TiffFile(str(self.path)) as tif:
+            zarr_array = self._open_zarr(tif) if self._zarr is not None else None
+            for index in range(self._num_frames):
+                yield _to_rgb_uint8(self._read_raw(tif, zarr_array, index, region))
+
+    def close(self):
+        self._memmap = None
+        self._zarr = None
+        self._tif.close()
+
+
+class VideoFrameSource(FrameSource):
+    """Frames of a video file decoded with OpenCV.
+
+    Iteration decodes sequentially; random access seeks, which is exact for most
+    intra-coded and MP4 videos but slower than iterating.
+    """
+
+    def __init__(self, path, read_ahead=DEFAULT_READ_AHEAD):
+        super().__init__(read_ahead)
+        self.path = Path(path)
+        cap = self._open()
+        try:
+            self._num_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            if self._num_frames <= 0:
+                # Container without a frame count: count by demuxing without decoding
+                self._num_frames = 0
+                while cap.grab():
+                    self._num_frames += 1
+        finally:
+            cap.release()
+
+    def _open(self):
+        cap = cv2.VideoCapture(str(self.path))
+        if not cap.isOpened():
+            raise OSError(f"Could not open video file {self.path}")
+        return cap
+
+    def __len__(self):
+        return self._num_frames
+
+    def _read(self, index, region=None):
+        cap = self._open()
+        try:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            ret, frame = cap.read()
+        finally:
+            cap.release()
+        if not ret:
+            raise IndexError(f"Could not decode frame {index} of {self.path}")
+        return cv2.cvtColor(_crop(frame, region), cv2.COLOR_BGR2RGB)
+
+    def _frames(self, region=None):
+        cap = self._open()
+        try:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield cv2.cvtColor(_crop(frame, region), cv2.COLOR_BGR2RGB)
+        finally:
+            cap.release()
+
+
+def _glob_image_files(pattern):
+    """Image files matching a glob pattern (or all images in a directory), naturally sorted."""
+    files = [Path(f) for f in glob.glob(str(pattern))]
+    return sorted(
+        [f for f in files if f.is_file() and f.suffix.lower() in IMAGE_SUFFIXES],
+        key=_natural_sort_key,
+    )
+
+
+def open_frame_source(input_path, read_ahead=DEFAULT_READ_AHEAD):
+    """Opens a video file, image directory, glob pattern, multi-page TIFF or single image.
+
+    Args:
+        input_path: Video, TIFF stack, image file, directory of images, or a glob
+            pattern such as ``frames/*.png``.
+        read_ahead: Frames decoded ahead of the consumer while iterating (0 = none).
+
+    Returns:
+        FrameSource
+
+    Raises:
+        OSError: if a video file cannot be opened.
+    """
+    input_path = Path(input_path)
+    suffix = input_path.suffix.lower()
+
+    if input_path.is_dir():
+        return ImageFilesFrameSource(_glob_image_files(input_path / "*.*"), read_ahead)
+    if not input_path.exists() and glob.has_magic(str(input_path)):
+        return ImageFilesFrameSource(_glob_image_files(input_path), read_ahead)
+    if suffix in TIFF_SUFFIXES:
+        return TiffFrameSource(input_path, read_ahead)
+    if suffix in IMAGE_SUFFIXES:
+        return ImageFilesFrameSource([input_path], read_ahead)
+    return VideoFrameSource(input_path, read_ahead)
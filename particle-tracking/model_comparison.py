@@ -48,9 +48,9 @@ def parse_model_spec(spec: str) -> ModelSpec:
 
 
 def _load_track_helpers() -> _TrackHelpers:
-    """Lazily import heavy helpers from track.py to avoid loading at module level."""
+    """Lazily import heavy helpers from track.py and batch_detection.py."""
+    from batch_detection import detect_lodestar
     from track import (
-        detect_lodestar,
         get_lodestar_model,
         get_rfdetr_model,
         get_yolo_model,
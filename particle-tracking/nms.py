@@ -0,0 +1,120 @@
+"""Greedy centre-distance non-maximum suppression backed by a KD-tree.
+
+Points are visited in priority order (highest score first, or input order) and each kept
+point suppresses every not yet visited point closer than min_distance. Comparing every
+kept point against all others costs O(N²); here the close pairs are found once with a
+KD-tree, so the greedy pass only visits points that have a neighbour within range.
+
+Several frames can be suppressed in one call (suppress_close_batch): their points share
+one tree, offset along a third axis so points of different frames never pair up.
+
+Used by LodeSTAR detection in batch_detection.py, by tile merging in tiling.py, and by the
+LodeSTAR labelling scripts in ../data-setup.
+"""
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+def _coordinates(points):
+    """(N, 2) float64 coordinates from the first two columns of an (N, 2+) array."""
+    points = np.asarray(points, dtype=np.float64)
+    if points.size == 0:
+        return np.empty((0, 2))
+    return points.reshape(len(points), -1)[:, :2]
+
+
+def close_pairs(points, max_distance, groups=None):
+    """(M, 2) index pairs (i < j) of points closer than max_distance to each other.
+
+    Args:
+        points: (N, 2+) array; the first two columns are the coordinates.
+        max_distance: Pairs at exactly this distance are not included.
+        groups: Optional (N,) integer labels (e.g. frame numbers); only points with the
+            same label are paired.
+    """
+    coords = _coordinates(points)
+    if len(coords) < 2 or not max_distance > 0:
+        return np.empty((0, 2), dtype=np.intp)
+
+    tree_points = coords
+    if groups is not None:
+        groups = np.asarray(groups)
+        # Points of different groups end up at least 2 * max_distance apart
+        tree_points = np.column_stack([coords, groups * (2.0 * max_distance)])
+    pairs = cKDTree(tree_points).query_pairs(max_distance, output_type="ndarray")
+
+    # query_pairs includes pairs at exactly max_distance; match a strict comparison
+    i, j = pairs[:, 0], pairs[:, 1]
+    distance = np.sqrt(((coords[i] - coords[j]) ** 2).sum(axis=1))
+    close = distance < max_distance
+    if groups is not None:
+        close &= groups[i] == groups[j]
+    return pairs[close]
+
+
+def greedy_suppress(num_points, pairs, order):
+    """Boolean keep mask from greedily suppressing the neighbours of each kept point.
+
+    Args:
+        num_points: Number of points.
+        pairs: (M, 2) index pairs of points that suppress each other.
+        order: Indices of all points, highest priority first.
+    """
+    keep = np.ones(num_points, dtype=bool)
+    if len(pairs) == 0:
+        return keep
+
+    # Neighbour lists in CSR form
+    both = np.concatenate([pairs, pairs[:, ::-1]])
+    both = both[np.argsort(both[:, 0], kind="stable")]
+    starts = np.searchsorted(both[:, 0], np.arange(num_points + 1))
+    neighbours = both[:, 1]
+
+    has_neighbours = starts[1:] > starts[:-1]
+    for index in order[has_neighbours[order]]:
+        if keep[index]:
+            keep[neighbours[starts[index] : starts[index + 1]]] = False
+    return keep
+
+
+def _priority(num_points, scores):
+    if scores is None:
+        return np.arange(num_points)
+    return np.argsort(-np.asarray(scores), kind="stable")
+
+
+def suppress_close(points, min_distance, scores=None):
+    """Indices of the points kept by greedy distance NMS, in priority order.
+
+    Args:
+        points: (N, 2+) array; the first two columns are the coordinates.
+        min_distance: Points closer than this to a kept point are dropped. 0 or None
+            keeps every point.
+        scores: Optional (N,) scores; higher scores take priority. Without scores,
+            earlier points take priority.
+    """
+    num_points = len(_coordinates(points))
+    order = _priority(num_points, scores)
+    if not min_distance or min_distance <= 0:
+        return order
+    keep = greedy_suppress(num_points, close_pairs(points, min_distance), order)
+    return order[keep[order]]
+
+
+def suppress_close_batch(point_sets, min_distance, score_sets=None):
+    """suppress_close for several frames at once; returns one index array per frame."""
+    coords = [_coordinates(points) for points in point_sets]
+    sizes = [len(c) for c in coords]
+    if score_sets is None:
+        score_sets = [None] * len(coords)
+    orders = [_priority(size, scores) for size, scores in zip(sizes, score_sets)]
+    if not min_distance or min_distance <= 0 or not coords:
+        return orders
+
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    groups = np.repeat(np.arange(len(coords)), sizes)
+    pairs = close_pairs(np.concatenate(coords), min_distance, groups)
+    order = np.concatenate([o + offset for o, offset in zip(orders, offsets)]).astype(np.intp)
+    keep = greedy_suppress(offsets[-1], pairs, order)
+    return [o[keep[o + offset]] for o, offset in zip(orders, offsets)]
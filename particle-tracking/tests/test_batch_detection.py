@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from batch_detection import AdaptiveBatchDetector, _lodestar_detections, _lodestar_input
+
+
+def _reference_input(frame):
+    """The original single-frame normalisation from detect_lodestar."""
+    frame_f = frame.astype(np.float32)
+    if frame.ndim == 3:
+        frame_f = np.mean(frame_f, axis=2)
+    f_min, f_ptp = frame_f.min(), np.ptp(frame_f)
+    return (frame_f - f_min) / f_ptp if f_ptp != 0 else frame_f - f_min
+
+
+def _reference_detections(detections_raw, nms_distance, box_size=40):
+    """The original per-detection loop and NMS from detect_lodestar, as plain arrays."""
+    xyxy, confidences = [], []
+    for det in detections_raw:
+        y, x = det[0], det[1]
+        r = abs(det[2]) if len(det) >= 3 else box_size / 2
+        xyxy.append([x - r, y - r, x + r, y + r])
+        confidences.append(float(det[2]) if len(det) >= 3 else 1.0)
+    xyxy = np.array(xyxy, dtype=np.float32)
+    confidence = np.array(confidences, dtype=np.float32)
+
+    if nms_distance and nms_distance > 0 and len(xyxy) > 1:
+        centers = (xyxy[:, :2] + xyxy[:, 2:]) / 2
+        order = np.argsort(-confidence)
+        processed = np.zeros(len(xyxy), dtype=bool)
+        keep = []
+        for idx in order:
+            if processed[idx]:
+                continue
+            keep.append(idx)
+            dists = np.sqrt(((centers - centers[idx]) ** 2).sum(axis=1))
+            processed[dists < nms_distance] = True
+        xyxy, confidence = xyxy[keep], confidence[keep]
+    return xyxy, confidence
+
+
+class TestLodestarPostprocessing:
+    def test_batched_input_matches_single_frames(self):
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 255, (32, 40, 3), dtype=np.uint8) for _ in range(3)]
+        frames.append(np.full((32, 40, 3), 7, dtype=np.uint8))  # flat frame: ptp == 0
+
+        stacked = _lodestar_input(frames)
+        assert stacked.shape == (4, 32, 40)
+        for frame, normalised in zip(frames, stacked):
+            assert np.array_equal(normalised, _reference_input(frame))
+
+    @pytest.mark.parametrize("num_outputs", [2, 3])
+    @pytest.mark.parametrize("nms_distance", [None, 6.0])
+    def test_detections_match_per_detection_loop(self, num_outputs, nms_distance):
+        rng = np.random.default_rng(1)
+        raw = np.column_stack(
+            [rng.uniform(0, 100, (200, 2)), rng.uniform(-4, 4, (200, num_outputs - 2))]
+        ).astype(np.float32)
+
+        detections = _lodestar_detections(raw, nms_distance)
+        xyxy, confidence = _reference_detections(raw, nms_distance)
+        assert np.array_equal(detections.xyxy, xyxy)
+        assert np.array_equal(detections.confidence, confidence)
+        assert np.array_equal(detections.class_id, np.zeros(len(xyxy), dtype=int))
+
+    def test_no_detections(self):
+        assert len(_lodestar_detections(np.zeros((0, 3), dtype=np.float32))) == 0
+
+
+class OutOfMemoryError(RuntimeError):
+    """Stands in for torch.OutOfMemoryError, which is matched by name."""
+
+
+class TestAdaptiveBatchDetector:
+    def _detector(self, max_frames, batch_size):
+        calls = []
+
+        def detect_batch(frames):
+            calls.append(len(frames))
+            if len(frames) > max_frames:
+                raise OutOfMemoryError("CUDA out of memory")
+            return [f * 10 for f in frames]
+
+        return AdaptiveBatchDetector(detect_batch, batch_size), calls
+
+    def test_splits_frames_into_batches(self):
+        detector, calls = self._detector(max_frames=8, batch_size=3)
+        assert detector(list(range(8))) == [f * 10 for f in range(8)]
+        assert calls == [3, 3, 2]
+
+    def test_halves_batch_size_on_out_of_memory(self):
+        detector, calls = self._detector(max_frames=2, batch_size=8)
+        assert detector(list(range(8))) == [f * 10 for f in range(8)]
+        assert calls == [8, 4, 2, 2, 2, 2]
+        assert detector.batch_size == 2
+
+        # The reduced size is kept for later batches
+        calls.clear()
+        detector(list(range(4)))
+        assert calls == [2, 2]
+
+    def test_single_frame_out_of_memory_is_raised(self):
+        detector, _ = self._detector(max_frames=0, batch_size=4)
+        with pytest.raises(OutOfMemoryError):
+            detector([1, 2, 3, 4])
+
+    def test_other_errors_are_not_retried(self):
+        def detect_batch(frames):
+            raise ValueError("bad input")
+
+        with pytest.raises(ValueError):
+            AdaptiveBatchDetector(detect_batch, 4)([1, 2, 3, 4])
@@ -0,0 +1,80 @@
+import time
+
+import numpy as np
+import pytest
+
+from detection_pipeline import run_pipeline
+from frame_source import FrameSource
+
+
+class _SlowSource(FrameSource):
+    def __init__(self, n, delay=0.0, parallel=True, fail_at=None):
+        super().__init__(read_ahead=4)
+        self.n = n
+        self.delay = delay
+        self.parallel_reads = parallel
+        self.fail_at = fail_at
+
+    def __len__(self):
+        return self.n
+
+    def _read(self, index, region=None):
+        time.sleep(self.delay)
+        if index == self.fail_at:
+            raise ValueError("corrupt frame")
+        return np.full((2, 2, 3), index, dtype=np.uint8)
+
+
+class TestRunPipeline:
+    @pytest.mark.parametrize("parallel", [True, False])
+    def test_results_are_consumed_in_frame_order(self, parallel):
+        rng = np.random.default_rng(0)
+        source = _SlowSource(30, parallel=parallel)
+        seen = []
+
+        def consume(index, value):
+            time.sleep(rng.uniform(0, 0.002))
+            seen.append((index, value))
+
+        times = run_pipeline(
+            source, lambda batch: [int(f[0, 0, 0]) for f in batch], consume, decode_workers=3
+        )
+        assert seen == [(i, i) for i in range(30)]
+        assert times.frames == 30
+
+    def test_stages_overlap(self):
+        source = _SlowSource(20, delay=0.02)
+
+        def infer(batch):
+            time.sleep(0.02 * len(batch))
+            return batch
+
+        times = run_pipeline(source, infer, lambda i, r: time.sleep(0.02), decode_workers=2)
+        # Run one after another the three stages would take 3 * 20 * 0.02 = 1.2 s
+        assert times.wall < 0.8
+        assert times.seconds["decode"] >= 0.4
+        assert "bottleneck" in times.summary()
+
+    def test_frames_are_grouped_into_batches(self):
+        sizes, seen = [], []
+
+        def infer(batch):
+            sizes.append(len(batch))
+            return [int(f[0, 0, 0]) for f in batch]
+
+        times = run_pipeline(_SlowSource(10), infer, lambda i, r: seen.append((i, r)), batch_size=4)
+        assert sizes == [4, 4, 2]
+        assert seen == [(i, i) for i in range(10)]
+        assert times.frames == 10
+
+    def test_decode_errors_propagate(self):
+        with pytest.raises(ValueError, match="corrupt frame"):
+            run_pipeline(_SlowSource(10, fail_at=5), lambda batch: batch, lambda i, r: None)
+
+    def test_output_errors_propagate(self):
+        def consume(index, result):
+            if index == 3:
+                raise RuntimeError("disk full")
+
+        with pytest.raises(RuntimeError, match="disk full"):
+            run_pipeline(_SlowSource(10), lambda batch: batch, consume)
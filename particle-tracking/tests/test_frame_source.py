@@ -0,0 +1,174 @@
+import threading
+
+import cv2
+import numpy as np
+import pytest
+import tifffile
+from PIL import Image
+
+from frame_source import (
+    FrameSource,
+    ImageFilesFrameSource,
+    TiffFrameSource,
+    VideoFrameSource,
+    _to_rgb_uint8,
+    open_frame_source,
+)
+
+
+class _CountingSource(FrameSource):
+    def __init__(self, n, read_ahead, fail_at=None):
+        super().__init__(read_ahead)
+        self.n = n
+        self.fail_at = fail_at
+        self.decoded = 0
+
+    def __len__(self):
+        return self.n
+
+    def _read(self, index, region=None):
+        if index == self.fail_at:
+            raise ValueError("corrupt frame")
+        self.decoded += 1
+        return np.full((2, 2, 3), index, dtype=np.uint8)
+
+
+class TestReadAhead:
+    @pytest.mark.parametrize("read_ahead", [0, 1, 4])
+    def test_yields_all_frames_in_order(self, read_ahead):
+        frames = [int(f[0, 0, 0]) for f in _CountingSource(20, read_ahead)]
+        assert frames == list(range(20))
+
+    def test_buffer_is_bounded(self):
+        source = _CountingSource(50, read_ahead=3)
+        it = iter(source)
+        next(it)
+        threading.Event().wait(0.3)
+        # One frame consumed, at most read_ahead queued and one waiting to be queued
+        assert source.decoded <= 1 + 3 + 1
+        it.close()
+
+    def test_stopping_early_ends_reader_thread(self):
+        source = _CountingSource(1000, read_ahead=2)
+        for i, _ in enumerate(source):
+            if i == 5:
+                break
+        assert source.decoded < 20
+        assert not any(t.name == "frame-read-ahead" for t in threading.enumerate())
+
+    def test_decode_errors_propagate(self):
+        with pytest.raises(ValueError, match="corrupt frame"):
+            list(_CountingSource(10, read_ahead=2, fail_at=4))
+
+
+class TestTiffFrameSource:
+    def test_matches_whole_stack_read(self, tmp_path):
+        stack = np.random.default_rng(0).integers(0, 4000, (6, 24, 32), dtype=np.uint16)
+        path = tmp_path / "stack.tif"
+        tifffile.imwrite(path, stack)
+
+        with open_frame_source(path) as frames:
+            assert isinstance(frames, TiffFrameSource)
+            assert len(frames) == 6
+            for raw, frame in zip(stack, frames):
+                assert np.array_equal(frame, _to_rgb_uint8(raw))
+            assert np.array_equal(frames[-1], _to_rgb_uint8(stack[-1]))
+
+    def test_ome_frames_span_several_pages(self, tmp_path):
+        stack = np.random.default_rng(1).integers(0, 255, (4, 3, 16, 20), dtype=np.uint8)
+        path = tmp_path / "stack.ome.tif"
+        tifffile.imwrite(path, stack, ome=True, metadata={"axes": "TCYX"})
+
+        with open_frame_source(path, read_ahead=0) as frames:
+            assert len(frames) == 4
+            assert frames._pages_per_frame == 3
+            assert np.array_equal(frames[2], _to_rgb_uint8(stack[2]))
+
+    def test_single_rgb_image_is_one_frame(self, tmp_path):
+        image = np.random.default_rng(2).integers(0, 255, (20, 30, 3), dtype=np.uint8)
+        path = tmp_path / "image.tif"
+        tifffile.imwrite(path, image, photometric="rgb")
+
+        with open_frame_source(path) as frames:
+            assert len(frames) == 1
+            assert np.array_equal(frames[0], image)
+
+    def test_contiguous_stack_is_memory_mapped(self, tmp_path):
+        stack = np.random.default_rng(3).integers(0, 4000, (5, 2, 40, 48), dtype=np.uint16)
+        path = tmp_path / "stack.ome.tif"
+        tifffile.imwrite(path, stack, ome=True, metadata={"axes": "TCYX"}, byteorder=">")
+
+        with open_frame_source(path) as frames:
+            assert isinstance(frames._memmap, np.memmap)
+            assert np.array_equal(frames[1], _to_rgb_uint8(stack[1]))
+            cropped = list(frames.crop(8, 4, 20, 16))
+            assert np.array_equal(cropped[3], _to_rgb_uint8(stack[3, :, 4:20, 8:28]))
+
+    @pytest.mark.parametrize("use_zarr", [True, False])
+    def test_compressed_tiled_stack_crop(self, tmp_path, monkeypatch, use_zarr):
+        if use_zarr:
+            pytest.importorskip("zarr")
+        else:
+            monkeypatch.setattr(TiffFrameSource, "_open_zarr", staticmethod(lambda tif: None))
+        stack = np.random.default_rng(4).integers(0, 4000, (4, 64, 80), dtype=np.uint16)
+        path = tmp_path / "stack.tif"
+        tifffile.imwrite(path, stack, photometric="minisblack", compression="zlib", tile=(32, 32))
+
+        with open_frame_source(path) as frames:
+            assert frames._memmap is None
+            assert (frames._zarr is not None) == use_zarr
+            cropped = frames.crop(10, 30, 40, 20)
+            assert np.array_equal(cropped[2], _to_rgb_uint8(stack[2, 30:50, 10:50]))
+            for raw, frame in zip(stack, cropped):
+                assert np.array_equal(frame, _to_rgb_uint8(raw[30:50, 10:50]))
+
+    def test_nested_crop(self, tmp_path):
+        stack = np.random.default_rng(5).integers(0, 255, (3, 30, 30), dtype=np.uint8)
+        path = tmp_path / "stack.tif"
+        tifffile.imwrite(path, stack, photometric="minisblack")
+
+        with open_frame_source(path) as frames:
+            nested = frames.crop(5, 5, 20, 20).crop(2, 3, 10, 8)
+            assert np.array_equal(nested[0], _to_rgb_uint8(stack[0, 8:16, 7:17]))
+
+
+class TestImageFilesFrameSource:
+    def _write_images(self, directory, count):
+        for i in range(count):
+            Image.fromarray(np.full((8, 8, 3), i, dtype=np.uint8)).save(directory / f"f_{i}.png")
+
+    def test_directory_is_naturally_sorted(self, tmp_path):
+        self._write_images(tmp_path, 12)
+        (tmp_path / "notes.txt").write_text("not an image")
+
+        frames = open_frame_source(tmp_path)
+        assert isinstance(frames, ImageFilesFrameSource)
+        assert [int(f[0, 0, 0]) for f in frames] == list(range(12))
+
+    def test_glob_pattern(self, tmp_path):
+        self._write_images(tmp_path, 12)
+        frames = open_frame_source(tmp_path / "f_1*.png")
+        assert [int(f[0, 0, 0]) for f in frames] == [1, 10, 11]
+
+
+class TestVideoFrameSource:
+    def test_sequential_and_random_access(self, tmp_path):
+        path = tmp_path / "clip.avi"
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (32, 24))
+        for i in range(7):
+            writer.write(np.full((24, 32, 3), 30 * i, dtype=np.uint8))
+        writer.release()
+
+        frames = open_frame_source(path)
+        assert isinstance(frames, VideoFrameSource)
+        assert len(frames) == 7
+        decoded = list(frames)
+        assert len(decoded) == 7
+        assert decoded[0].shape == (24, 32, 3)
+        assert np.allclose(frames[5].mean(), decoded[5].mean(), atol=1)
+
+    def test_unreadable_video_raises(self, tmp_path):
+        path = tmp_path / "broken.mp4"
+        path.write_bytes(b"not a video")
+        with pytest.raises(OSError, match="Could not open video"):
+            open_frame_source(path)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from nms import close_pairs, suppress_close, suppress_close_batch
+
+
+def _reference(points, min_distance, scores=None):
+    """Greedy NMS comparing every kept point against all others."""
+    points = np.asarray(points, dtype=np.float64)[:, :2]
+    order = np.arange(len(points)) if scores is None else np.argsort(-scores, kind="stable")
+    processed = np.zeros(len(points), dtype=bool)
+    keep = []
+    for idx in order:
+        if processed[idx]:
+            continue
+        keep.append(idx)
+        processed[np.sqrt(((points - points[idx]) ** 2).sum(axis=1)) < min_distance] = True
+    return np.array(keep, dtype=np.intp)
+
+
+class TestSuppressClose:
+    @pytest.mark.parametrize("with_scores", [False, True])
+    @pytest.mark.parametrize("min_distance", [0.5, 3.0, 12.0])
+    def test_matches_all_pairs_reference(self, with_scores, min_distance):
+        rng = np.random.default_rng(0)
+        points = rng.uniform(0, 100, (500, 3))
+        scores = rng.uniform(size=500) if with_scores else None
+
+        keep = suppress_close(points, min_distance, scores)
+        assert np.array_equal(keep, _reference(points, min_distance, scores))
+
+    def test_points_at_exactly_min_distance_are_kept(self):
+        points = np.array([[0.0, 0.0], [3.0, 4.0], [6.0, 8.0]])
+        assert suppress_close(points, 5.0).tolist() == [0, 1, 2]
+        assert suppress_close(points, 5.0001).tolist() == [0, 2]
+
+    def test_disabled_or_empty(self):
+        points = np.zeros((4, 2))
+        assert suppress_close(points, 0).tolist() == [0, 1, 2, 3]
+        assert suppress_close(points, None, scores=np.arange(4)).tolist() == [3, 2, 1, 0]
+        assert len(suppress_close(np.empty((0, 3)), 5.0)) == 0
+        assert len(suppress_close(np.empty(0), 5.0)) == 0
+
+
+class TestSuppressCloseBatch:
+    def test_matches_per_frame(self):
+        rng = np.random.default_rng(1)
+        # Identical coordinates in every frame: frames must not suppress each other
+        points = rng.uniform(0, 50, (200, 2))
+        point_sets = [points, points[:120], np.empty((0, 2)), points[50:]]
+        score_sets = [rng.uniform(size=len(p)) for p in point_sets]
+
+        keeps = suppress_close_batch(point_sets, 4.0, score_sets)
+        assert len(keeps) == len(point_sets)
+        for points_i, scores_i, keep in zip(point_sets, score_sets, keeps):
+            assert np.array_equal(keep, suppress_close(points_i, 4.0, scores_i))
+
+    def test_groups_are_never_paired(self):
+        points = np.zeros((4, 2))
+        pairs = close_pairs(points, 1.0, groups=np.array([0, 1, 1, 2]))
+        assert pairs.tolist() == [[1, 2]]
@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+import supervision as sv
+from scipy import ndimage
+
+from tiling import TiledDetector, merge_tile_duplicates, tile_grid
+
+
+def _blob_detector(images):
+    """Boxes around bright squares; squares cut by the image edge get lower confidence."""
+    results = []
+    for image in images:
+        labels, _ = ndimage.label(image[:, :, 0] > 0)
+        boxes = [
+            (s[1].start, s[0].start, s[1].stop, s[0].stop) for s in ndimage.find_objects(labels)
+        ]
+        xyxy = np.array(boxes, dtype=np.float32).reshape(-1, 4)
+        area = np.prod(xyxy[:, 2:] - xyxy[:, :2], axis=1)
+        results.append(
+            sv.Detections(
+                xyxy=xyxy,
+                confidence=(area / 100).astype(np.float32),
+                class_id=np.zeros(len(xyxy), dtype=int),
+            )
+        )
+    return results
+
+
+def _frame_with_squares(height, width, spacing=23, size=10):
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    corners = [
+        (x, y) for y in range(3, height - size, spacing) for x in range(5, width - size, spacing)
+    ]
+    for x, y in corners:
+        frame[y : y + size, x : x + size] = 255
+    return frame, np.array([(x, y, x + size, y + size) for x, y in corners], dtype=np.float32)
+
+
+class TestTileGrid:
+    @pytest.mark.parametrize("height,width", [(100, 100), (256, 300), (1000, 777)])
+    def test_tiles_cover_frame_with_overlap(self, height, width):
+        tiles = tile_grid(height, width, tile_size=128, overlap=24)
+        covered = np.zeros((height, width), dtype=int)
+        for x, y, w, h in tiles:
+            assert w <= 128 and h <= 128
+            assert x + w <= width and y + h <= height
+            covered[y : y + h, x : x + w] += 1
+        assert covered.min() >= 1
+
+        xs = sorted({x for x, _, _, _ in tiles})
+        tile_w = tiles[0][2]
+        assert all(b - a <= tile_w - 24 for a, b in zip(xs, xs[1:]))
+
+    def test_overlap_must_be_smaller_than_tile(self):
+        with pytest.raises(ValueError):
+            tile_grid(100, 100, tile_size=32, overlap=32)
+
+
+class TestTiledDetector:
+    @pytest.mark.parametrize("merge_distance", [None, 6.0])
+    def test_every_particle_detected_once(self, merge_distance):
+        frame, expected = _frame_with_squares(300, 420)
+        calls = []
+
+        def detect_batch(images):
+            calls.append(len(images))
+            return _blob_detector(images)
+
+        detector = TiledDetector(
+            detect_batch, tile_size=128, overlap=32, merge_distance=merge_distance
+        )
+        detections = detector([frame, frame])
+        num_tiles = len(detector.tiles(300, 420))
+
+        assert calls == [2 * num_tiles]
+        for frame_detections in detections:
+            found = frame_detections.xyxy[np.lexsort(frame_detections.xyxy[:, :2].T)]
+            assert np.array_equal(found, expected[np.lexsort(expected[:, :2].T)])
+
+    def test_empty_frame(self):
+        frame = np.zeros((200, 200, 3), dtype=np.uint8)
+        (detections,) = TiledDetector(_blob_detector, tile_size=64, overlap=16)([frame])
+        assert len(detections) == 0
+
+    def test_detections_inside_one_tile_are_not_merged(self):
+        tiles = tile_grid(200, 200, tile_size=120, overlap=40)
+        # Two overlapping boxes from the same tile, away from other tiles
+        xyxy = np.array([[5, 5, 20, 20], [8, 8, 22, 22]], dtype=np.float32)
+        keep = merge_tile_duplicates(xyxy, np.array([0.9, 0.8]), np.array([0, 0]), tiles, 0.5)
+        assert keep.all()
+
+    def test_merge_matches_dense_overlap_reference(self):
+        tiles = tile_grid(400, 400, tile_size=150, overlap=50)
+        rng = np.random.default_rng(0)
+        corners = rng.uniform(0, 388, size=(600, 2))
+        sizes = rng.uniform(4, 12, size=(600, 2))
+        xyxy = np.column_stack([corners, corners + sizes]).astype(np.float32)
+        confidence = rng.uniform(size=600)
+        # Each box comes from a random tile that fully contains it, as detector output would
+        bounds = np.array([(x, y, x + w, y + h) for x, y, w, h in tiles])
+        inside = (xyxy[:, None, :2] >= bounds[None, :, :2]).all(axis=2) & (
+            xyxy[:, None, 2:] <= bounds[None, :, 2:]
+        ).all(axis=2)
+        tile_index = np.array([rng.choice(np.flatnonzero(row)) for row in inside])
+        keep = merge_tile_duplicates(xyxy, confidence, tile_index, tiles, 0.3)
+
+        # Reference: dense overlap matrix over every box, greedy suppression in score order
+        boxes = xyxy.astype(np.float64)
+        top_left = np.maximum(boxes[:, None, :2], boxes[None, :, :2])
+        bottom_right = np.minimum(boxes[:, None, 2:], boxes[None, :, 2:])
+        intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+        area = np.prod(boxes[:, 2:] - boxes[:, :2], axis=1)
+        overlap = intersection / np.minimum(area[:, None], area[None, :])
+        duplicate = (overlap > 0.3) & (tile_index[:, None] != tile_index[None, :])
+        expected = np.ones(600, dtype=bool)
+        for index in np.argsort(-confidence, kind="stable"):
+            if expected[index]:
+                suppressed = duplicate[index].copy()
+                suppressed[index] = False
+                expected[suppressed] = False
+        np.testing.assert_array_equal(keep, expected)
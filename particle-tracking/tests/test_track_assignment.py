@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import trackpy as tp
+
+from benchmark_trackers import count_id_switches, simulate_detections
+from track_assignment import AssignmentLinker, link_frames
+
+tp.quiet()
+
+
+class TestAssignmentLinker:
+    def test_links_separated_particles_across_gaps(self):
+        linker = AssignmentLinker(search_range=5.0, memory=2)
+        start = np.array([[10.0, 10.0], [50.0, 10.0], [10.0, 50.0]])
+        first = linker.update(start, 0)
+        # Particle 1 is missed for two frames, then reappears
+        assert np.array_equal(linker.update(start[[0, 2]] + 1, 1), first[[0, 2]])
+        assert np.array_equal(linker.update(start[[0, 2]] + 2, 2), first[[0, 2]])
+        assert np.array_equal(linker.update(start + 3, 3), first)
+
+    def test_tracks_end_after_memory(self):
+        linker = AssignmentLinker(search_range=5.0, memory=1)
+        (first,) = linker.update([[10.0, 10.0]], 0)
+        linker.update(np.empty((0, 2)), 1)
+        linker.update(np.empty((0, 2)), 2)
+        (later,) = linker.update([[10.0, 10.0]], 3)
+        assert later != first
+
+    def test_prediction_keeps_crossing_particles_apart(self):
+        # Two particles pass each other; nearest-neighbour linking swaps them
+        plain = AssignmentLinker(search_range=5.0)
+        predicting = AssignmentLinker(search_range=5.0, predict=True)
+        for frame in range(10):
+            positions = [[2.0 * frame, 0.0], [19.0 - 2.0 * frame, 0.5]]
+            ids_plain = plain.update(positions, frame)
+            ids_predict = predicting.update(positions, frame)
+        assert ids_predict.tolist() == [0, 1]
+        assert ids_plain.tolist() == [1, 0]
+
+    def test_same_tracks_as_trackpy_on_sparse_data(self):
+        frames = simulate_detections(300, 20, density=0.0005, miss_rate=0.05, seed=2)
+        ours = link_frames(frames, search_range=5.0, memory=2)
+        theirs = tp.link_df(pd.concat(frames, ignore_index=True), 5.0, memory=2)
+
+        merged = ours.merge(theirs, on=["frame", "true_id"])
+        assert len(merged) == len(ours)
+        # Same partition of detections into tracks, up to renumbering
+        assert merged.groupby("track_id")["particle"].nunique().max() == 1
+        assert merged.groupby("particle")["track_id"].nunique().max() == 1
+
+
+class TestCountIdSwitches:
+    def test_breaks_and_wrong_links(self):
+        tracks = pd.DataFrame(
+            {
+                "frame": [0, 1, 2, 0, 1, 2],
+                "true_id": [0, 0, 0, 1, 1, 1],
+                # Particle 0's track breaks at frame 2 and continues on particle 1
+                "track_id": [5, 5, 6, 6, 6, 5],
+            }
+        )
+        switches, links = count_id_switches(tracks)
+        assert links == 4
+        assert switches == 4
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from track_io import TRACK_FORMATS, TrackWriter, read_tracks, track_format, write_tracks
+
+
+def _tracks(num_frames=12, per_frame=7, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for frame in range(num_frames):
+        frames.append(
+            pd.DataFrame(
+                {
+                    "frame": frame,
+                    "track_id": np.arange(per_frame),
+                    "x": rng.uniform(0, 100, per_frame),
+                    "y": rng.uniform(0, 100, per_frame),
+                    "conf": rng.uniform(0, 1, per_frame).astype(np.float32),
+                }
+            )
+        )
+    return frames
+
+
+def _require(fmt):
+    if fmt in ("parquet", "feather"):
+        pytest.importorskip("pyarrow")
+    elif fmt == "hdf5":
+        pytest.importorskip("tables")
+
+
+@pytest.mark.parametrize("fmt", list(TRACK_FORMATS))
+class TestTrackFormats:
+    def test_round_trip(self, tmp_path, fmt):
+        _require(fmt)
+        path = tmp_path / f"tracks{TRACK_FORMATS[fmt]}"
+        frames = _tracks()
+
+        assert write_tracks(frames, path, chunk_rows=20) == 84
+        expected = pd.concat(frames, ignore_index=True).astype({"conf": np.float64})
+        pd.testing.assert_frame_equal(read_tracks(path), expected)
+
+    def test_frame_range_and_columns(self, tmp_path, fmt):
+        _require(fmt)
+        path = tmp_path / f"tracks{TRACK_FORMATS[fmt]}"
+        frames = _tracks()
+        write_tracks(frames, path, chunk_rows=20)
+
+        loaded = read_tracks(path, frame_range=(3, 6), columns=["track_id", "x"])
+        expected = pd.concat(frames[3:6], ignore_index=True)[["track_id", "x"]]
+        pd.testing.assert_frame_equal(loaded, expected)
+
+
+class TestTrackWriter:
+    def test_frames_are_never_split_across_flushes(self, tmp_path):
+        path = tmp_path / "tracks.csv"
+        frames = _tracks(num_frames=6, per_frame=4)
+        flushed = []
+        writer = TrackWriter(path, chunk_rows=10)
+        for frame in frames:
+            writer.append(frame)
+            flushed.append(writer.rows_written)
+        writer.close()
+
+        # Flushes end on frame boundaries, and the latest frame is held back until closing
+        assert all(rows % 4 == 0 and rows < 4 * (i + 1) for i, rows in enumerate(flushed))
+        assert len(set(flushed) - {0}) > 1
+        assert writer.rows_written == 24
+        expected = pd.concat(frames, ignore_index=True).astype({"conf": np.float64})
+        pd.testing.assert_frame_equal(read_tracks(path), expected)
+
+    def test_unknown_suffix_raises(self):
+        with pytest.raises(ValueError):
+            track_format("tracks.txt")
@@ -0,0 +1,109 @@
+import gzip
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from track import LAMMPS_TRACK_COLUMNS, iter_lammps_tracks, load_lammpstrj
+from track_io import write_tracks
+
+
+def _write_dump(path, num_frames=5, num_atoms=30, seed=0):
+    rng = np.random.default_rng(seed)
+    lines = []
+    for frame in range(num_frames):
+        lines += [f"ITEM: TIMESTEP\n{frame * 10}\nITEM: NUMBER OF ATOMS\n{num_atoms}\n"]
+        lines += ["ITEM: BOX BOUNDS pp pp pp\n0 20\n0 20\n-0.5 0.5\n"]
+        lines += ["ITEM: ATOMS id type x y vx vy\n"]
+        for atom_id in rng.permutation(num_atoms) + 1:
+            x, y, vx, vy = rng.uniform(0, 20, 4)
+            lines.append(f"{atom_id} 1 {x:.6f} {y:.6f} {vx:.6f} {vy:.6f}\n")
+    text = "".join(lines)
+    if str(path).endswith(".gz"):
+        path.write_bytes(gzip.compress(text.encode()))
+    else:
+        path.write_text(text)
+
+
+def _reference_tracks(path):
+    """The original per-atom loop from track.main."""
+    rows = []
+    with load_lammpstrj(path) as frames:
+        for frame_idx, df_frame in enumerate(frames):
+            for _, atom in df_frame.iterrows():
+                rows.append(
+                    {
+                        "frame": frame_idx,
+                        "timestep": int(atom["timestep"]),
+                        "track_id": int(atom["id"]),
+                        "x": atom["x"],
+                        "y": atom["y"],
+                    }
+                )
+    return pd.DataFrame(rows)
+
+
+class TestLammpsTracks:
+    @pytest.mark.parametrize("name", ["run.lammpstrj", "run.lammpstrj.gz"])
+    def test_matches_per_atom_loop(self, tmp_path, name):
+        dump = tmp_path / name
+        _write_dump(dump)
+        csv_path = tmp_path / "tracks.csv"
+
+        with load_lammpstrj(dump) as frames:
+            num_rows = write_tracks(iter_lammps_tracks(frames), csv_path)
+
+        reference_path = tmp_path / "reference.csv"
+        _reference_tracks(dump).to_csv(reference_path, index=False)
+        assert num_rows == 150
+        assert csv_path.read_text() == reference_path.read_text()
+
+    def test_chunked_output_is_identical(self, tmp_path):
+        dump = tmp_path / "run.lammpstrj"
+        _write_dump(dump)
+
+        with load_lammpstrj(dump) as frames:
+            write_tracks(iter_lammps_tracks(frames), tmp_path / "whole.csv")
+        with load_lammpstrj(dump) as frames:
+            write_tracks(iter_lammps_tracks(frames), tmp_path / "chunked.csv", chunk_rows=40)
+
+        assert (tmp_path / "whole.csv").read_text() == (tmp_path / "chunked.csv").read_text()
+
+    def test_empty_input_writes_header(self, tmp_path):
+        csv_path = tmp_path / "tracks.csv"
+        assert write_tracks(iter([]), csv_path, columns=LAMMPS_TRACK_COLUMNS) == 0
+        assert csv_path.read_text().strip() == "frame,timestep,track_id,x,y"
+
+    def test_compressed_indexing_streams_forward(self, tmp_path, monkeypatch):
+        dump = tmp_path / "run.lammpstrj.gz"
+        _write_dump(dump, num_frames=6)
+        with load_lammpstrj(dump) as frames:
+            expected = list(frames)
+
+        # load_lammpstrj put lammps-scripts on sys.path; count its reads from here on
+        import lammps_parser as parser
+
+        with load_lammpstrj(dump) as frames:
+            calls = {"read": 0, "index": 0}
+            read_lammps_frames = parser.read_lammps_frames
+            load_frame_index = parser.load_frame_index
+
+            def counting_read(*args, **kwargs):
+                calls["read"] += 1
+                return read_lammps_frames(*args, **kwargs)
+
+            def counting_index(*args, **kwargs):
+                calls["index"] += 1
+                return load_frame_index(*args, **kwargs)
+
+            monkeypatch.setattr(parser, "read_lammps_frames", counting_read)
+            monkeypatch.setattr(parser, "load_frame_index", counting_index)
+
+            for i in (0, 1, 3, -1):
+                pd.testing.assert_frame_equal(frames[i], expected[i])
+            assert calls == {"read": 1, "index": 1}
+
+            pd.testing.assert_frame_equal(frames[2], expected[2])
+            assert calls == {"read": 2, "index": 1}
+            with pytest.raises(IndexError):
+                frames[6]
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+import trackpy as tp
+
+from track_linking import StreamingLinker
+
+tp.quiet()
+
+
+def _detections(num_frames=40, num_particles=60, seed=0, empty_frames=()):
+    """Diffusing particles, some missed each frame, plus spurious single-frame detections."""
+    rng = np.random.default_rng(seed)
+    positions = rng.uniform(0, 300, (num_particles, 2))
+    frames = []
+    for frame in range(num_frames):
+        positions = positions + rng.normal(0, 1.5, positions.shape)
+        if frame in empty_frames:
+            continue
+        seen = positions[rng.uniform(size=num_particles) > 0.1]
+        xy = np.concatenate([seen, rng.uniform(0, 300, (3, 2))])
+        frames.append(
+            pd.DataFrame(
+                {"frame": frame, "x": xy[:, 0], "y": xy[:, 1], "conf": rng.uniform(size=len(xy))}
+            )
+        )
+    return frames
+
+
+def _offline(frames, search_range, memory, stub_filter):
+    df = tp.link_df(pd.concat(frames, ignore_index=True), search_range, memory=memory)
+    if stub_filter > 0:
+        df = tp.filter_stubs(df, stub_filter)
+    return df.rename(columns={"particle": "track_id"}).reset_index(drop=True)
+
+
+def _sorted(df):
+    return df.sort_values(["frame", "x", "y"], ignore_index=True)
+
+
+class TestStreamingLinker:
+    @pytest.mark.parametrize("memory,stub_filter", [(0, 0), (3, 5), (2, 1)])
+    def test_matches_link_df_and_filter_stubs(self, memory, stub_filter):
+        frames = _detections(empty_frames=(10, 11, 25))
+        linker = StreamingLinker(6.0, memory=memory, stub_filter=stub_filter)
+        chunks = [linker.add(frame_df) for frame_df in frames] + [linker.close()]
+        streamed = pd.concat(chunks, ignore_index=True)
+
+        assert streamed["frame"].is_monotonic_increasing
+        expected = _sorted(_offline(frames, 6.0, memory, stub_filter))
+        pd.testing.assert_frame_equal(_sorted(streamed)[expected.columns], expected)
+
+    def test_only_undecided_frames_are_held(self):
+        memory, stub_filter = 3, 5
+        linker = StreamingLinker(6.0, memory=memory, stub_filter=stub_filter)
+        held = []
+        for frame_df in _detections(num_frames=100):
+            linker.add(frame_df)
+            held.append(linker.pending_frames)
+        assert max(held) <= stub_filter * (memory + 1)
+        assert held[-1] < 100
+
+    def test_frames_must_increase(self):
+        frames = _detections(num_frames=3)
+        linker = StreamingLinker(6.0)
+        linker.add(frames[1])
+        with pytest.raises(ValueError):
+            linker.add(frames[0])
+
+    def test_no_detections(self):
+        linker = StreamingLinker(6.0, memory=3, stub_filter=5)
+        assert linker.add(pd.DataFrame(columns=["frame", "x", "y"])).empty
+        assert linker.close().empty
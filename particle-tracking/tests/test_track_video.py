@@ -0,0 +1,192 @@
+import shutil
+import threading
+import time
+
+import cv2
+import numpy as np
+import pandas as pd
+import pytest
+import supervision as sv
+
+from track_video import FrameAnnotator, open_video_writer, track_boxes, write_video
+
+
+def _reference_boxes(df_tracked, frame_idx):
+    """The original per-frame filter and iterrows loop from track.main."""
+    frame_df = df_tracked[df_tracked["frame"] == frame_idx]
+    xyxy, tracker_ids = [], []
+    for _, row in frame_df.iterrows():
+        x, y, w, h = row["x"], row["y"], row["w"], row["h"]
+        xyxy.append([x - w / 2, y - h / 2, x + w / 2, y + h / 2])
+        tracker_ids.append(int(row["track_id"]))
+    return np.array(xyxy, dtype=np.float32).reshape(-1, 4), np.array(tracker_ids, dtype=int)
+
+
+def _moving_tracks(num_frames=20, num_tracks=6, seed=0):
+    rng = np.random.default_rng(seed)
+    start = rng.uniform(20, 80, (num_tracks, 2))
+    velocity = rng.uniform(-2, 2, (num_tracks, 2))
+    rows = [
+        {"frame": f, "track_id": t, "x": x, "y": y, "w": 8.0, "h": 8.0}
+        for f in range(num_frames)
+        for t, (x, y) in enumerate(start + velocity * f)
+        if (f + t) % 7  # each track is missed now and then
+    ]
+    return pd.DataFrame(rows)
+
+
+def _reference_annotation(frames, boxes, trace_length):
+    """The original sequential loop with supervision's stateful TraceAnnotator."""
+    box_annotator, label_annotator = sv.BoxAnnotator(), sv.LabelAnnotator()
+    trace_annotator = sv.TraceAnnotator(trace_length=trace_length)
+    for i, frame in enumerate(frames):
+        detections = boxes.detections(i)
+        annotated = frame.copy()
+        if detections.tracker_id is not None and len(detections.tracker_id) > 0:
+            labels = [f"#{tid}" for tid in detections.tracker_id]
+            annotated = trace_annotator.annotate(scene=annotated, detections=detections)
+            annotated = box_annotator.annotate(scene=annotated, detections=detections)
+            annotated = label_annotator.annotate(
+                scene=annotated, detections=detections, labels=labels
+            )
+        yield cv2.cvtColor(annotated, cv2.COLOR_RGB2BGR)
+
+
+class _ListWriter:
+    def __init__(self):
+        self.frames = []
+
+    def write(self, frame):
+        self.frames.append(frame)
+
+
+class _SequentialFrames(list):
+    parallel_reads = False
+
+
+class TestTrackBoxes:
+    def test_matches_per_frame_filter(self):
+        rng = np.random.default_rng(0)
+        n = 500
+        df = pd.DataFrame(
+            {
+                # Unsorted frames, with frames 3 and 7 missing
+                "frame": rng.choice([0, 1, 2, 4, 5, 6, 8, 9], n),
+                "track_id": rng.integers(0, 50, n),
+                "x": rng.uniform(0, 100, n),
+                "y": rng.uniform(0, 100, n),
+                "w": rng.uniform(2, 6, n),
+                "h": rng.uniform(2, 6, n),
+            }
+        )
+        boxes = track_boxes(df, num_frames=11)
+        for i in range(11):
+            detections = boxes.detections(i)
+            xyxy, tracker_ids = _reference_boxes(df, i)
+            assert np.array_equal(detections.xyxy.reshape(-1, 4), xyxy)
+            if len(xyxy):
+                assert np.array_equal(detections.tracker_id, tracker_ids)
+            else:
+                assert detections.tracker_id is None
+
+    def test_no_tracks(self):
+        boxes = track_boxes(pd.DataFrame(), num_frames=3)
+        assert all(len(boxes.detections(i)) == 0 for i in range(3))
+
+    def test_traces_cover_the_last_frames_of_current_tracks(self):
+        df = _moving_tracks()
+        boxes = track_boxes(df, num_frames=20)
+        traces = boxes.traces(10, trace_length=4)
+        current = sorted(df.loc[df["frame"] == 10, "track_id"])
+        assert len(traces) == len(current)
+        for track_id, trace in zip(current, traces):
+            rows = df[(df["track_id"] == track_id) & df["frame"].between(7, 10)]
+            assert np.allclose(trace, rows[["x", "y"]].to_numpy(), atol=1e-4)
+
+
+class TestWriteVideo:
+    @pytest.mark.parametrize("sequential", [False, True])
+    def test_matches_sequential_supervision_annotation(self, sequential):
+        df = _moving_tracks()
+        boxes = track_boxes(df, num_frames=20)
+        rng = np.random.default_rng(1)
+        frames = [rng.integers(0, 60, (100, 120, 3), dtype=np.uint8) for _ in range(20)]
+        if sequential:
+            frames = _SequentialFrames(frames)
+
+        writer = _ListWriter()
+        write_video(frames, FrameAnnotator(boxes, trace_length=5), writer, workers=3)
+        expected = list(_reference_annotation(frames, boxes, trace_length=5))
+        assert len(writer.frames) == len(expected)
+        for written, reference in zip(writer.frames, expected):
+            assert np.array_equal(written, reference)
+
+    def test_frames_are_written_in_order_with_bounded_queue(self):
+        in_flight, peak = [0], [0]
+        lock = threading.Lock()
+
+        def annotate(index, frame):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.005 * (index % 3))
+            with lock:
+                in_flight[0] -= 1
+            return index
+
+        writer = _ListWriter()
+        progress = []
+        write_video(
+            list(range(30)), annotate, writer, workers=4, queue_size=3, progress=progress.append
+        )
+        assert writer.frames == list(range(30))
+        assert len(progress) == 30
+        assert peak[0] <= 3
+
+    def test_annotation_errors_propagate(self):
+        def annotate(index, frame):
+            if index == 5:
+                raise ValueError("bad frame")
+            return frame
+
+        with pytest.raises(ValueError, match="bad frame"):
+            write_video(list(range(10)), annotate, _ListWriter(), workers=2)
+
+
+class TestOpenVideoWriter:
+    @pytest.mark.parametrize(
+        "encoder",
+        [
+            "opencv",
+            pytest.param(
+                "ffmpeg",
+                marks=pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs ffmpeg"),
+            ),
+        ],
+    )
+    def test_writes_readable_video(self, tmp_path, encoder):
+        path = tmp_path / "out.mp4"
+        with open_video_writer(path, fps=10, size=(64, 48), encoder=encoder) as writer:
+            for i in range(5):
+                writer.write(np.full((48, 64, 3), 40 * i, dtype=np.uint8))
+        cap = cv2.VideoCapture(str(path))
+        assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 5
+        cap.release()
+
+    def test_unknown_encoder(self, tmp_path):
+        with pytest.raises(ValueError):
+            open_video_writer(tmp_path / "out.mp4", fps=10, size=(64, 48), encoder="gif")
+
+    def test_ffmpeg_is_killed_when_writing_fails(self, tmp_path, monkeypatch):
+        # Stand-in ffmpeg that consumes frames until its input closes
+        fake_ffmpeg = tmp_path / "ffmpeg"
+        fake_ffmpeg.write_text("#!/bin/sh\ncat > /dev/null\n")
+        fake_ffmpeg.chmod(0o755)
+        monkeypatch.setenv("PATH", str(tmp_path))
+
+        writer = open_video_writer(tmp_path / "out.mp4", fps=10, size=(64, 48), encoder="ffmpeg")
+        with pytest.raises(ValueError, match="bad frame"):
+            with writer:
+                writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+                raise ValueError("bad frame")
+        assert writer._process.returncode < 0
@@ -0,0 +1,104 @@
+import cv2
+import matplotlib
+import numpy as np
+import pandas as pd
+import pytest
+
+import trajectory_image
+from trajectory_image import rasterize_trajectories, render_trajectory_image, trajectory_segments
+
+
+def _tracks(num_tracks=40, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for track_id in range(num_tracks):
+        length = rng.integers(1, 15)  # includes single-detection tracks
+        frames = np.sort(rng.choice(50, length, replace=False))
+        xy = rng.uniform(0, 100, (length, 2))
+        rows.append(
+            pd.DataFrame(
+                {"frame": frames, "track_id": track_id * 7 % 41, "x": xy[:, 0], "y": xy[:, 1]}
+            )
+        )
+    # Shuffle rows: segments must follow frame order, not row order
+    return pd.concat(rows).sample(frac=1, random_state=1).reset_index(drop=True)
+
+
+def _reference_segments(df_tracked):
+    """The original per-track groupby loop."""
+    all_segments, all_progress = [], []
+    for _, grp in df_tracked.groupby("track_id"):
+        grp = grp.sort_values("frame")
+        points = grp[["x", "y"]].to_numpy()
+        if len(points) < 2:
+            continue
+        segments = np.stack([points[:-1], points[1:]], axis=1)
+        all_segments.append(segments)
+        all_progress.append(np.linspace(0, 1, len(segments)))
+    return np.concatenate(all_segments), np.concatenate(all_progress)
+
+
+class TestTrajectorySegments:
+    def test_matches_per_track_loop(self):
+        df = _tracks()
+        segments, progress = trajectory_segments(df)
+        expected_segments, expected_progress = _reference_segments(df)
+        assert np.array_equal(segments, expected_segments)
+        assert np.allclose(progress, expected_progress)
+
+    def test_no_segments(self):
+        df = pd.DataFrame({"frame": [0, 0], "track_id": [1, 2], "x": [1.0, 2.0], "y": [1.0, 2.0]})
+        segments, progress = trajectory_segments(df)
+        assert segments.shape == (0, 2, 2)
+        assert progress.shape == (0,)
+
+
+class TestRasterizeTrajectories:
+    def test_colours_run_from_start_to_end_of_colormap(self):
+        cmap = matplotlib.colormaps["plasma"]
+        background = np.zeros((20, 200, 3), dtype=np.uint8)
+        xs = np.arange(10, 191, 20, dtype=float)
+        df = pd.DataFrame({"frame": np.arange(len(xs)), "track_id": 0, "x": xs, "y": 10.0})
+        image = rasterize_trajectories(*trajectory_segments(df), background, cmap)
+
+        def hue(bgr):
+            # Anti-aliasing dims the line, so compare colours up to brightness
+            bgr = np.asarray(bgr, dtype=float)
+            return bgr / bgr.max()
+
+        assert np.allclose(hue(image[10, 12]), hue(cmap(0.0)[2::-1]), atol=0.05)
+        assert np.allclose(hue(image[10, 188]), hue(cmap(1.0)[2::-1]), atol=0.05)
+        # Pixels away from the line keep the background
+        assert not image[:5].any() and not image[15:].any()
+
+    def test_grayscale_background(self):
+        background = np.full((30, 30), 1000, dtype=np.uint16)
+        background[0, 0] = 0
+        image = rasterize_trajectories(
+            *trajectory_segments(_tracks(num_tracks=3)), background, matplotlib.colormaps["viridis"]
+        )
+        assert image.shape == (30, 30, 3) and image.dtype == np.uint8
+        assert (image[0, 0] == 0).all()
+
+
+class TestRenderTrajectoryImage:
+    @pytest.mark.parametrize("renderer", ["matplotlib", "opencv"])
+    def test_writes_image(self, tmp_path, renderer):
+        path = tmp_path / "trajectories.png"
+        background = np.full((100, 120, 3), 50, dtype=np.uint8)
+        used = render_trajectory_image(_tracks(), background, path, renderer=renderer)
+        assert used == renderer
+        assert cv2.imread(str(path)) is not None
+
+    def test_auto_rasterizes_many_segments(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(trajectory_image, "RASTER_SEGMENT_THRESHOLD", 10)
+        background = np.zeros((100, 100, 3), dtype=np.uint8)
+        path = tmp_path / "trajectories.png"
+        assert render_trajectory_image(_tracks(), background, path) == "opencv"
+        assert cv2.imread(str(path)).shape == (100, 100, 3)
+
+    def test_unknown_renderer(self, tmp_path):
+        with pytest.raises(ValueError):
+            render_trajectory_image(
+                _tracks(), np.zeros((10, 10, 3)), tmp_path / "t.png", renderer="svg"
+            )
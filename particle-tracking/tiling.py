@@ -0,0 +1,173 @@
+"""Tiled (sliding-window) detection over overlapping tiles of each frame.
+
+Detectors with a fixed number of queries (RF-DETR returns at most 300 boxes per image)
+saturate on dense full-size frames. TiledDetector splits every frame into overlapping
+tiles, runs the tiles of a whole batch of frames through the detector in one call,
+shifts the boxes back to frame coordinates and merges the duplicates found where tiles
+overlap.
+
+Only detections whose boxes reach into another tile can be duplicates, so the merge
+(a greedy, confidence-ordered NMS) runs on those alone. Boxes are compared by
+intersection over the smaller box rather than IoU: a particle cut by a tile edge gives a
+truncated box that lies almost entirely inside the full box from the neighbouring tile.
+Alternatively, duplicates can be merged by centre distance.
+"""
+
+import numpy as np
+
+from nms import close_pairs, greedy_suppress
+
+DEFAULT_TILE_OVERLAP = 64
+DEFAULT_MERGE_THRESHOLD = 0.5
+
+
+def tile_grid(height, width, tile_size, overlap=DEFAULT_TILE_OVERLAP):
+    """Returns (x, y, w, h) tiles of at most tile_size px covering a height x width frame.
+
+    Neighbouring tiles overlap by at least overlap px; tiles are spread evenly so the
+    last row and column end exactly at the frame edge.
+    """
+    if overlap >= tile_size:
+        raise ValueError(f"Tile overlap ({overlap}) must be smaller than the tile size")
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        count = int(np.ceil((length - tile_size) / (tile_size - overlap))) + 1
+        return np.linspace(0, length - tile_size, count).round().astype(int).tolist()
+
+    tile_w, tile_h = min(tile_size, width), min(tile_size, height)
+    return [(x, y, tile_w, tile_h) for y in starts(height) for x in starts(width)]
+
+
+def _overlapping_pairs(xyxy, threshold):
+    """(M, 2) index pairs (i < j) whose intersection over the smaller box exceeds threshold.
+
+    Intersecting boxes have centres closer than the largest box diagonal, so only the
+    pairs a KD-tree finds within that distance are compared.
+    """
+    size = xyxy[:, 2:] - xyxy[:, :2]
+    pairs = close_pairs((xyxy[:, :2] + xyxy[:, 2:]) / 2, float(np.hypot(*size.max(axis=0))))
+    i, j = pairs[:, 0], pairs[:, 1]
+    top_left = np.maximum(xyxy[i, :2], xyxy[j, :2])
+    bottom_right = np.minimum(xyxy[i, 2:], xyxy[j, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=1)
+    area = np.prod(size, axis=1)
+    smaller = np.minimum(area[i], area[j])
+    return pairs[intersection / np.maximum(smaller, 1e-9) > threshold]
+
+
+def merge_tile_duplicates(xyxy, confidence, tile_index, tiles, threshold, merge_distance=None):
+    """Boolean mask of the detections to keep after merging duplicates across tiles.
+
+    Args:
+        xyxy: (N, 4) boxes in frame coordinates.
+        confidence: (N,) detection scores; the most confident of a duplicate group is kept.
+        tile_index: (N,) index into tiles of the tile each detection came from.
+        tiles: (x, y, w, h) tiles from tile_grid.
+        threshold: Intersection over the smaller box above which two boxes are duplicates.
+        merge_distance: If set, boxes whose centres are closer than this many px are
+            duplicates instead.
+    """
+    keep = np.ones(len(xyxy), dtype=bool)
+    if len(tiles) < 2 or len(xyxy) < 2:
+        return keep
+
+    # Candidates: boxes that intersect a tile other than their own
+    bounds = np.array([(x, y, x + w, y + h) for x, y, w, h in tiles], dtype=np.float64)
+    intersects = (
+        (xyxy[:, None, 0] < bounds[None, :, 2])
+        & (xyxy[:, None, 2] > bounds[None, :, 0])
+        & (xyxy[:, None, 1] < bounds[None, :, 3])
+        & (xyxy[:, None, 3] > bounds[None, :, 1])
+    )
+    intersects[np.arange(len(xyxy)), tile_index] = False
+    candidates = np.flatnonzero(intersects.any(axis=1))
+    if len(candidates) < 2:
+        return keep
+
+    boxes = xyxy[candidates].astype(np.float64)
+    candidate_tiles = tile_index[candidates]
+    if merge_distance is not None:
+        pairs = close_pairs((boxes[:, :2] + boxes[:, 2:]) / 2, merge_distance)
+    else:
+        pairs = _overlapping_pairs(boxes, threshold)
+    # Detections from the same tile were already separated by the detector
+    pairs = pairs[candidate_tiles[pairs[:, 0]] != candidate_tiles[pairs[:, 1]]]
+
+    order = np.argsort(-confidence[candidates], kind="stable")
+    suppressed = ~greedy_suppress(len(candidates), pairs, order)
+    keep[candidates[suppressed]] = False
+    return keep
+
+
+class TiledDetector:
+    """Runs a batch detection function on overlapping tiles of each frame.
+
+    detect_batch takes a list of images and returns one sv.Detections per image (e.g. an
+    AdaptiveBatchDetector). Calling the TiledDetector with a list of frames sends all
+    their tiles to detect_batch at once and returns one merged sv.Detections per frame.
+    """
+
+    def __init__(
+        self,
+        detect_batch,
+        tile_size,
+        overlap=DEFAULT_TILE_OVERLAP,
+        merge_threshold=DEFAULT_MERGE_THRESHOLD,
+        merge_distance=None,
+    ):
+        self.detect_batch = detect_batch
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.merge_threshold = merge_threshold
+        self.merge_distance = merge_distance
+        self._tiles = {}
+
+    def tiles(self, height, width):
+        """Tiles for a frame of the given size (cached per size)."""
+        if (height, width) not in self._tiles:
+            self._tiles[height, width] = tile_grid(height, width, self.tile_size, self.overlap)
+        return self._tiles[height, width]
+
+    def __call__(self, frames):
+        import supervision as sv
+
+        tiles_per_frame = [self.tiles(*frame.shape[:2]) for frame in frames]
+        crops = [
+            frame[y : y + h, x : x + w]
+            for frame, tiles in zip(frames, tiles_per_frame)
+            for x, y, w, h in tiles
+        ]
+        tile_detections = iter(self.detect_batch(crops))
+
+        results = []
+        for tiles in tiles_per_frame:
+            parts, tile_index = [], []
+            for index, (x, y, _, _) in enumerate(tiles):
+                detections = next(tile_detections)
+                if len(detections) == 0:
+                    continue
+                detections.xyxy = detections.xyxy + np.array([x, y, x, y], dtype=np.float32)
+                parts.append(detections)
+                tile_index.append(np.full(len(detections), index))
+            if not parts:
+                results.append(sv.Detections.empty())
+                continue
+
+            merged = sv.Detections.merge(parts)
+            confidence = (
+                merged.confidence
+                if merged.confidence is not None
+                else np.ones(len(merged), dtype=np.float32)
+            )
+            keep = merge_tile_duplicates(
+                merged.xyxy,
+                confidence,
+                np.concatenate(tile_index),
+                tiles,
+                self.merge_threshold,
+                self.merge_distance,
+            )
+            results.append(merged[keep])
+        return results
@@ -1,12 +1,28 @@
 import argparse
-import re
+import itertools
 import sys
-import cv2
 import numpy as np
 import pandas as pd
 from pathlib import Path
 from tqdm import tqdm
-from PIL import Image, ImageSequence
+
+from batch_detection import AdaptiveBatchDetector, detect_lodestar_batch
+from detection_pipeline import run_pipeline
+from frame_source import DEFAULT_READ_AHEAD, open_frame_source
+from tiling import DEFAULT_MERGE_THRESHOLD, DEFAULT_TILE_OVERLAP, TiledDetector, tile_grid
+from track_io import TRACK_FORMATS, TrackWriter, read_tracks
+from track_assignment import link_frames
+from track_linking import StreamingLinker
+from track_video import (
+    DEFAULT_FFMPEG_CRF,
+    DEFAULT_FFMPEG_PRESET,
+    VIDEO_ENCODERS,
+    FrameAnnotator,
+    open_video_writer,
+    track_boxes,
+    write_video,
+)
+from trajectory_image import TRAJECTORY_RENDERERS, render_trajectory_image
 
 SCRIPT_DIR = Path(__file__).parent
 
@@ -162,266 +178,184 @@ def get_lodestar_model(checkpoint, device, fp16=False):
 # ---------------------------------------------------------------------------
 
 
-def detect_lodestar(model, frame, threshold, device, alpha=0.5, nms_distance=None, box_size=40):
-    import torch
-    import supervision as sv
-
-    frame_f = frame.astype(np.float32)
-    if frame.ndim == 3:
-        frame_f = np.mean(frame_f, axis=2)
-
-    f_min, f_ptp = frame_f.min(), np.ptp(frame_f)
-    frame_norm = (frame_f - f_min) / f_ptp if f_ptp != 0 else frame_f - f_min
-
-    tensor = torch.from_numpy(frame_norm).unsqueeze(0).unsqueeze(0).to(device)
-    # Match model dtype (e.g. float16 when fp16=True)
-    tensor = tensor.to(next(model.parameters()).dtype)
-
-    with torch.inference_mode():
-        detections_raw = model.detect(tensor, alpha=alpha, beta=0.5, cutoff=threshold, mode="ratio")
-
-    if isinstance(detections_raw, list):
-        detections_raw = detections_raw[0]
-
-    if detections_raw is None or len(detections_raw) == 0:
-        return sv.Detections.empty()
-
-    xyxy, confidences = [], []
-    for det in detections_raw:
-        y, x = det[0], det[1]
-        r = abs(det[2]) if len(det) >= 3 else box_size / 2
-        xyxy.append([x - r, y - r, x + r, y + r])
-        confidences.append(float(det[2]) if len(det) >= 3 else 1.0)
-
-    result = sv.Detections(
-        xyxy=np.array(xyxy, dtype=np.float32),
-        confidence=np.array(confidences, dtype=np.float32),
-        class_id=np.zeros(len(xyxy), dtype=int),
+def _detections_frame(frame_idx, detections):
+    """One frame's detections as a DataFrame of box centres and sizes (frame, x, y, w, h, conf)."""
+    xyxy = detections.xyxy.astype(np.float64).reshape(-1, 4)
+    confidence = detections.confidence if detections.confidence is not None else np.ones(len(xyxy))
+    return pd.DataFrame(
+        {
+            "frame": np.full(len(xyxy), frame_idx, dtype=np.int64),
+            "x": (xyxy[:, 0] + xyxy[:, 2]) / 2,
+            "y": (xyxy[:, 1] + xyxy[:, 3]) / 2,
+            "w": xyxy[:, 2] - xyxy[:, 0],
+            "h": xyxy[:, 3] - xyxy[:, 1],
+            "conf": np.asarray(confidence, dtype=np.float64),
+        }
     )
 
-    if nms_distance and nms_distance > 0 and len(result) > 1:
-        centers = (result.xyxy[:, :2] + result.xyxy[:, 2:]) / 2
-        order = np.argsort(-result.confidence)
-        processed = np.zeros(len(result), dtype=bool)
-        keep = []
-        for idx in order:
-            if processed[idx]:
-                continue
-            keep.append(idx)
-            dists = np.sqrt(((centers - centers[idx]) ** 2).sum(axis=1))
-            processed[dists < nms_distance] = True
-        keep = np.array(keep)
-        result = sv.Detections(
-            xyxy=result.xyxy[keep],
-            confidence=result.confidence[keep],
-            class_id=result.class_id[keep],
-        )
-
-    return result
-
 
 # ---------------------------------------------------------------------------
 # Frame loading
 # ---------------------------------------------------------------------------
 
 
-def _natural_sort_key(path):
-    """Sort key for filenames with embedded numbers (frame_2.png < frame_10.png)."""
-    return [int(c) if c.isdigit() else c.lower() for c in re.split(r"(\d+)", path.name)]
-
-
-def _to_rgb_uint8(frame):
-    """Convert a single frame (any dtype, grayscale or color) to uint8 RGB (H, W, 3).
+def _import_lammps_parser():
+    """Import the shared LAMMPS dump reader from ../lammps-scripts."""
+    lammps_scripts_dir = str(SCRIPT_DIR / ".." / "lammps-scripts")
+    if lammps_scripts_dir not in sys.path:
+        sys.path.insert(0, lammps_scripts_dir)
+    import lammps_parser
 
-    Microscopy TIFFs are typically 16-bit grayscale. PIL silently converts them to
-    all-white when calling .convert("RGB"). This function normalises the pixel range
-    to [0, 255] before promoting to RGB so the content is actually visible.
-    """
-    # CHW → HWC (e.g. tifffile sometimes returns C×H×W for colour TIFFs)
-    if frame.ndim == 3 and frame.shape[0] in (1, 3, 4) and frame.shape[0] < frame.shape[1]:
-        frame = frame.transpose(1, 2, 0)
-    # Drop alpha / extra channels
-    if frame.ndim == 3 and frame.shape[2] == 4:
-        frame = frame[:, :, :3]
-    if frame.ndim == 3 and frame.shape[2] == 1:
-        frame = frame[:, :, 0]
-
-    # Normalise non-uint8 dtypes to [0, 255]
-    if frame.dtype != np.uint8:
-        f = frame.astype(np.float32)
-        f_min, f_max = f.min(), f.max()
-        if f_max > f_min:
-            f = (f - f_min) / (f_max - f_min) * 255.0
-        frame = f.clip(0, 255).astype(np.uint8)
-
-    # Grayscale → RGB
-    if frame.ndim == 2:
-        frame = np.stack([frame, frame, frame], axis=-1)
-
-    return frame
+    return lammps_parser
 
 
-def load_lammpstrj(path):
-    """Parse a LAMMPS trajectory file into a list of per-timestep DataFrames.
+def _lammps_frame_to_df(frame):
+    """Convert one parsed LAMMPS frame into a DataFrame with id, x, y and timestep columns.
 
-    Each DataFrame has at minimum columns: id, x, y (real or unwrapped coordinates).
     Scaled coordinates (xs, ys) are converted to real coordinates using box bounds.
     """
-    frames = []
-    with open(path) as f:
-        while True:
-            line = f.readline()
-            if not line:
-                break
-            if "ITEM: TIMESTEP" not in line:
-                continue
-
-            timestep = int(f.readline().strip())
-            f.readline()  # ITEM: NUMBER OF ATOMS
-            n_atoms = int(f.readline().strip())
+    df = pd.DataFrame(frame["atoms"])
+
+    # Resolve x coordinate: prefer unwrapped (xu) > real (x) > scaled (xs)
+    if "xu" in df.columns and "yu" in df.columns:
+        df = df.rename(columns={"xu": "x", "yu": "y"})
+    elif "xs" in df.columns and "ys" in df.columns:
+        (x_lo, x_hi), (y_lo, y_hi) = frame["box_bounds"][0, :2], frame["box_bounds"][1, :2]
+        df["x"] = df["xs"] * (x_hi - x_lo) + x_lo
+        df["y"] = df["ys"] * (y_hi - y_lo) + y_lo
+
+    if "x" not in df.columns or "y" not in df.columns:
+        raise ValueError(
+            f"Timestep {frame['timestep']}: no recognised x/y columns. "
+            f"Found: {list(df.columns)}"
+        )
 
-            f.readline()  # ITEM: BOX BOUNDS ...
-            x_lo, x_hi = map(float, f.readline().split())
-            y_lo, y_hi = map(float, f.readline().split())
-            f.readline()  # z bounds (ignored for 2-D)
+    df["timestep"] = frame["timestep"]
+    return df
 
-            atoms_header = f.readline().strip()  # ITEM: ATOMS id type x y ...
-            columns = atoms_header.replace("ITEM: ATOMS", "").split()
 
-            rows = []
-            for _ in range(n_atoms):
-                values = f.readline().split()
-                rows.append(dict(zip(columns, values)))
+def _is_lammpstrj(path):
+    """True for .lammpstrj files, optionally compressed (.lammpstrj.gz/.xz/.zst)."""
+    suffixes = [suffix.lower() for suffix in Path(path).suffixes]
+    if suffixes[-1:] == [".lammpstrj"]:
+        return True
+    return suffixes[-2:-1] == [".lammpstrj"] and suffixes[-1] in {".gz", ".xz", ".zst"}
 
-            df = pd.DataFrame(rows)
-            # Cast numeric columns
-            for col in df.columns:
-                try:
-                    df[col] = pd.to_numeric(df[col])
-                except ValueError:
-                    pass
 
-            # Resolve x coordinate: prefer unwrapped (xu) > real (x) > scaled (xs)
-            if "xu" in df.columns and "yu" in df.columns:
-                df = df.rename(columns={"xu": "x", "yu": "y"})
-            elif "xs" in df.columns and "ys" in df.columns:
-                df["x"] = df["xs"] * (x_hi - x_lo) + x_lo
-                df["y"] = df["ys"] * (y_hi - y_lo) + y_lo
+class LammpstrjFrames:
+    """Lazy sequence of per-timestep DataFrames backed by a memory-mapped LAMMPS dump.
 
-            if "x" not in df.columns or "y" not in df.columns:
-                raise ValueError(
-                    f"Timestep {timestep}: no recognised x/y columns. " f"Found: {list(df.columns)}"
-                )
+    Frames are only parsed when indexed or iterated, so memory use does not grow with
+    trajectory length. Call close() (or use as a context manager) to release the map.
+    Compressed dumps (.gz/.xz/.zst) cannot be memory-mapped and are streamed instead:
+    indexing keeps one open stream, so increasing indices are read in a single pass,
+    while going back to an earlier frame decompresses the file again from the start.
+    """
 
-            df["timestep"] = timestep
-            frames.append(df)
+    def __init__(self, path):
+        self._parser = _import_lammps_parser()
+        self._path = str(path)
+        self._length = None
+        self._stream = None
+        self._stream_position = 0
+        if self._parser.compression_of(self._path):
+            self._dump = None
+        else:
+            self._dump = self._parser.LammpsDump(self._path, use_mmap=True)
+
+    def __len__(self):
+        if self._dump is not None:
+            return len(self._dump)
+        if self._length is None:
+            self._length = len(self._parser.load_frame_index(self._path).offsets)
+        return self._length
+
+    def __getitem__(self, i):
+        if self._dump is not None:
+            return _lammps_frame_to_df(self._dump.frames[i])
+
+        i = range(len(self))[i]
+        if self._stream is None or i < self._stream_position:
+            self._close_stream()
+            self._stream = self._parser.read_lammps_frames(self._path)
+        frame = next(itertools.islice(self._stream, i - self._stream_position, None))
+        self._stream_position = i + 1
+        return _lammps_frame_to_df(frame)
+
+    def __iter__(self):
+        frames = (
+            self._parser.read_lammps_frames(self._path) if self._dump is None else self._dump.frames
+        )
+        for frame in frames:
+            yield _lammps_frame_to_df(frame)
 
-    return frames
+    def __enter__(self):
+        return self
 
+    def __exit__(self, *exc):
+        self.close()
 
-def load_frames(input_path):
-    """Load frames from a video file, image directory, or multi-page TIFF."""
-    import tifffile
+    def _close_stream(self):
+        if self._stream is not None:
+            self._stream.close()
+        self._stream = None
+        self._stream_position = 0
 
-    input_path = Path(input_path)
-    frames = []
+    def close(self):
+        self._close_stream()
+        if self._dump is not None:
+            self._dump.close()
 
-    if input_path.is_dir():
-        valid_exts = {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff"}
-        files = sorted(
-            [f for f in input_path.glob("*.*") if f.suffix.lower() in valid_exts],
-            key=_natural_sort_key,
-        )
-        for f in files:
-            if f.suffix.lower() in {".tif", ".tiff"}:
-                frames.append(_to_rgb_uint8(tifffile.imread(str(f))))
-            else:
-                frames.append(np.array(Image.open(f).convert("RGB")))
-    elif input_path.suffix.lower() in {".tif", ".tiff"}:
-        # Use tifffile so that 16-bit microscopy stacks are read correctly.
-        # PIL silently converts I;16 mode to all-white on .convert("RGB").
-        data = tifffile.imread(str(input_path))
-        # data shape is typically (n_frames, H, W) for a grayscale stack,
-        # but may have extra axes for time/z/channel in OME-TIFF.
-        # Squeeze any leading size-1 axes (e.g. Z=1, C=1) while keeping ≥3-D.
-        while data.ndim > 3 and data.shape[0] == 1:
-            data = data[0]
-        if data.ndim == 2:
-            # Single-frame TIFF
-            frames.append(_to_rgb_uint8(data))
-        else:
-            # First axis is the frame/time axis
-            for raw in data:
-                frames.append(_to_rgb_uint8(raw))
-    elif input_path.suffix.lower() in {".png", ".jpg", ".jpeg", ".bmp"}:
-        frames.append(np.array(Image.open(input_path).convert("RGB")))
-    else:
-        cap = cv2.VideoCapture(str(input_path))
-        if not cap.isOpened():
-            print(f"Error: Could not open video file {input_path}")
-            return []
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        cap.release()
 
-    return frames
+LAMMPS_TRACK_COLUMNS = ["frame", "timestep", "track_id", "x", "y"]
 
 
-# ---------------------------------------------------------------------------
-# Trajectory image
-# ---------------------------------------------------------------------------
+def iter_lammps_tracks(lammps_frames):
+    """Yield one tracks DataFrame (frame, timestep, track_id, x, y) per LAMMPS frame.
 
+    Columns are taken from each frame as whole arrays, so no per-atom Python work is done.
+    """
+    for frame_idx, df_frame in enumerate(lammps_frames):
+        yield pd.DataFrame(
+            {
+                "frame": np.full(len(df_frame), frame_idx, dtype=np.int64),
+                "timestep": df_frame["timestep"].to_numpy(dtype=np.int64),
+                "track_id": df_frame["id"].to_numpy(dtype=np.int64),
+                "x": df_frame["x"].to_numpy(dtype=np.float64),
+                "y": df_frame["y"].to_numpy(dtype=np.float64),
+            },
+            columns=LAMMPS_TRACK_COLUMNS,
+        )
 
-def _save_trajectory_image(df_tracked, background_frame, output_path, colormap="plasma"):
-    """Render all complete trajectories onto the first frame with a start→end colour gradient.
 
-    Each trajectory is drawn as a polyline whose colour shifts from the start of the
-    colourmap (start of track) to the end of the colourmap (end of track), making it
-    easy to see where particles came from and where they went.
-    """
-    import matplotlib.pyplot as plt
-    import matplotlib.cm as cm
-    from matplotlib.collections import LineCollection
+def _open_track_writer(path, columns=None):
+    """Open a TrackWriter for the output file, exiting if its format's library is missing."""
+    try:
+        return TrackWriter(path, columns=columns)
+    except ImportError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
-    fig, ax = plt.subplots(
-        figsize=(background_frame.shape[1] / 100, background_frame.shape[0] / 100), dpi=100
-    )
-    ax.imshow(background_frame)
-    ax.set_axis_off()
 
-    cmap = cm.get_cmap(colormap)
+def load_lammpstrj(path):
+    """Open a LAMMPS trajectory file as a lazy sequence of per-timestep DataFrames.
 
-    for tid, grp in df_tracked.groupby("track_id"):
-        grp = grp.sort_values("frame")
-        xs = grp["x"].to_numpy()
-        ys = grp["y"].to_numpy()
-        if len(xs) < 2:
-            continue
+    Each DataFrame has at minimum columns: id, x, y (real or unwrapped coordinates).
+    Scaled coordinates (xs, ys) are converted to real coordinates using box bounds.
+    """
+    return LammpstrjFrames(path)
 
-        # Build segments and per-segment progress values (0 = start, 1 = end)
-        points = np.stack([xs, ys], axis=1)
-        segments = np.stack([points[:-1], points[1:]], axis=1)
-        progress = np.linspace(0, 1, len(segments))
 
-        lc = LineCollection(segments, cmap=cmap, linewidth=1.0, alpha=0.8)
-        lc.set_array(progress)
-        lc.set_clim(0, 1)
-        ax.add_collection(lc)
+def load_frames(input_path, read_ahead=DEFAULT_READ_AHEAD):
+    """Open a video file, image directory or glob, or multi-page TIFF as a lazy FrameSource.
 
-    plt.colorbar(
-        cm.ScalarMappable(cmap=cmap),
-        ax=ax,
-        orientation="vertical",
-        fraction=0.02,
-        pad=0.01,
-        label="Track progress  (start → end)",
-    )
-    plt.tight_layout(pad=0)
-    fig.savefig(str(output_path), dpi=150, bbox_inches="tight")
-    plt.close(fig)
+    Returns an empty list (after printing an error) if a video file cannot be opened.
+    """
+    try:
+        return open_frame_source(input_path, read_ahead=read_ahead)
+    except OSError as e:
+        print(f"Error: {e}")
+        return []
 
 
 # ---------------------------------------------------------------------------
@@ -445,14 +379,50 @@ def main():
     parser.add_argument("--variant", choices=list(RFDETR_VARIANTS), help="RF-DETR model size")
     parser.add_argument("--device", help="Inference device (e.g. 0 or cpu)")
     parser.add_argument("--threshold", type=float, help="Detection confidence threshold")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Frames per inference call (halved automatically on out-of-memory errors)",
+    )
+    parser.add_argument(
+        "--tile-size",
+        type=int,
+        help="Detect on overlapping tiles of this many px covering the frame (0 = off)",
+    )
+    parser.add_argument("--tile-overlap", type=int, help="Overlap between neighbouring tiles (px)")
     # I/O
-    parser.add_argument("--input", help="Path to video, image folder, or TIFF stack")
+    parser.add_argument(
+        "--input", help="Path to video, image folder or glob (e.g. 'frames/*.png'), or TIFF stack"
+    )
+    parser.add_argument(
+        "--read-ahead",
+        type=int,
+        help="Frames decoded in the background ahead of detection (0 = no read-ahead; "
+        f"default: {DEFAULT_READ_AHEAD})",
+    )
+    parser.add_argument(
+        "--decode-workers",
+        type=int,
+        help="Threads decoding frames while the model runs (videos always use one; default: 2)",
+    )
     parser.add_argument("--output-dir", help="Directory to save results")
+    parser.add_argument(
+        "--output-format",
+        choices=list(TRACK_FORMATS),
+        help="Track table format (parquet/feather need pyarrow, hdf5 needs tables)",
+    )
     # Tracking
-    parser.add_argument("--tracker", choices=["trackpy", "bytetrack"])
-    parser.add_argument("--search-range", type=float, help="Trackpy: max pixel distance per frame")
-    parser.add_argument("--memory", type=int, help="Trackpy: frames a particle may be missing")
-    parser.add_argument("--stub-filter", type=int, help="Trackpy: min track length to keep")
+    parser.add_argument("--tracker", choices=["trackpy", "bytetrack", "lap"])
+    parser.add_argument(
+        "--search-range", type=float, help="Trackpy/lap: max pixel distance per frame"
+    )
+    parser.add_argument("--memory", type=int, help="Trackpy/lap: frames a particle may be missing")
+    parser.add_argument("--stub-filter", type=int, help="Trackpy/lap: min track length to keep")
+    parser.add_argument(
+        "--streaming-link",
+        action="store_true",
+        help="Trackpy: link each frame as it is detected and write finished tracks right away",
+    )
     parser.add_argument(
         "--adaptive-stop",
         type=float,
@@ -461,6 +431,11 @@ def main():
     parser.add_argument(
         "--adaptive-step", type=float, help="Trackpy: search_range shrink factor per adaptive step"
     )
+    parser.add_argument(
+        "--predict-velocity",
+        action="store_true",
+        help="Lap: predict positions from each track's last velocity (drifting particles)",
+    )
     parser.add_argument(
         "--lost-track-buffer", type=int, help="ByteTrack: frames to keep a lost track alive"
     )
@@ -492,6 +467,22 @@ def main():
     parser.add_argument(
         "--trace-length", type=int, help="Frames of trajectory history shown in output video"
     )
+    parser.add_argument(
+        "--video-encoder",
+        choices=VIDEO_ENCODERS,
+        help="opencv (mp4v) or ffmpeg (libx264 through an ffmpeg subprocess)",
+    )
+    parser.add_argument("--ffmpeg-preset", help="x264 preset for --video-encoder ffmpeg")
+    parser.add_argument(
+        "--annotate-workers",
+        type=int,
+        help="Threads annotating video frames (written in order as they finish; default: 2)",
+    )
+    parser.add_argument(
+        "--video-queue-size",
+        type=int,
+        help="Annotated video frames in flight before the encoder catches up (default: 8)",
+    )
     parser.add_argument(
         "--save-trajectory-image",
         action="store_true",
@@ -502,6 +493,13 @@ def main():
         default=None,
         help="Matplotlib colormap for trajectory image (default: plasma)",
     )
+    parser.add_argument(
+        "--trajectory-renderer",
+        choices=TRAJECTORY_RENDERERS,
+        default=None,
+        help="Trajectory image renderer: matplotlib (with colourbar), opencv (fast raster at "
+        "frame resolution) or auto (opencv for very many segments; default)",
+    )
     parser.add_argument(
         "--hexatic-order",
         action="store_true",
@@ -520,11 +518,32 @@ def main():
     num_classes = cfg_get(cfg, "model", "num_classes")
     device = _normalize_device(args.device or cfg_get(cfg, "model", "device", default="0")) or "cpu"
     threshold = args.threshold or cfg_get(cfg, "detection", "threshold", default=0.25)
+    batch_size = args.batch_size or cfg_get(cfg, "detection", "batch_size", default=1)
+    tile_size = (
+        args.tile_size
+        if args.tile_size is not None
+        else cfg_get(cfg, "detection", "tile_size", default=0)
+    )
+    tile_overlap = (
+        args.tile_overlap
+        if args.tile_overlap is not None
+        else cfg_get(cfg, "detection", "tile_overlap", default=DEFAULT_TILE_OVERLAP)
+    )
+    tile_merge_threshold = cfg_get(
+        cfg, "detection", "tile_merge_threshold", default=DEFAULT_MERGE_THRESHOLD
+    )
     input_path = args.input or cfg_get(cfg, "input")
     output_dir = Path(
         args.output_dir
         or cfg_get(cfg, "output", "dir", default="evaluation/results/tracking_output")
     )
+    read_ahead = (
+        args.read_ahead
+        if args.read_ahead is not None
+        else cfg_get(cfg, "frames", "read_ahead", default=DEFAULT_READ_AHEAD)
+    )
+    decode_workers = args.decode_workers or cfg_get(cfg, "detection", "decode_workers", default=2)
+    output_format = args.output_format or cfg_get(cfg, "output", "format", default="csv")
     tracker = args.tracker or cfg_get(cfg, "tracking", "tracker", default="trackpy")
     search_range = (
         args.search_range
@@ -539,6 +558,12 @@ def main():
         if args.stub_filter is not None
         else cfg_get(cfg, "tracking", "stub_filter", default=5)
     )
+    predict_velocity = args.predict_velocity or cfg_get(
+        cfg, "tracking", "predict_velocity", default=False
+    )
+    streaming_link = args.streaming_link or cfg_get(
+        cfg, "tracking", "streaming_link", default=False
+    )
     adaptive_stop = (
         args.adaptive_stop
         if args.adaptive_stop is not None
@@ -581,6 +606,9 @@ def main():
     trajectory_colormap = args.trajectory_colormap or cfg_get(
         cfg, "output", "trajectory_colormap", default="plasma"
     )
+    trajectory_renderer = args.trajectory_renderer or cfg_get(
+        cfg, "output", "trajectory_renderer", default="auto"
+    )
     save_hexatic_order = args.hexatic_order or cfg_get(
         cfg, "analysis", "hexatic_order", default=False
     )
@@ -591,6 +619,17 @@ def main():
         if args.trace_length is not None
         else cfg_get(cfg, "output", "trace_length", default=30)
     )
+    video_encoder = args.video_encoder or cfg_get(cfg, "output", "video_encoder", default="opencv")
+    ffmpeg_preset = args.ffmpeg_preset or cfg_get(
+        cfg, "output", "ffmpeg_preset", default=DEFAULT_FFMPEG_PRESET
+    )
+    ffmpeg_crf = cfg_get(cfg, "output", "ffmpeg_crf", default=DEFAULT_FFMPEG_CRF)
+    annotate_workers = args.annotate_workers or cfg_get(
+        cfg, "output", "annotate_workers", default=2
+    )
+    video_queue_size = args.video_queue_size or cfg_get(
+        cfg, "output", "video_queue_size", default=8
+    )
 
     if input_path is None:
         parser.error("--input is required (or set 'input' in config.yaml)")
@@ -600,7 +639,8 @@ def main():
     output_dir.mkdir(parents=True, exist_ok=True)
 
     input_path = Path(input_path)
-    is_lammpstrj = input_path.suffix.lower() == ".lammpstrj"
+    is_lammpstrj = _is_lammpstrj(input_path)
+    tracks_path = output_dir / f"tracks{TRACK_FORMATS[output_format]}"
 
     print(f"Config:    {args.config}")
     if not is_lammpstrj:
@@ -614,29 +654,17 @@ def main():
     # -----------------------------------------------------------------------
     if is_lammpstrj:
         print(f"\nParsing LAMMPS trajectory: {input_path}")
-        lammps_frames = load_lammpstrj(input_path)
-        print(f"Found {len(lammps_frames)} timesteps.")
-
-        tracking_data = []
-        for frame_idx, df_frame in enumerate(lammps_frames):
-            for _, atom in df_frame.iterrows():
-                tracking_data.append(
-                    {
-                        "frame": frame_idx,
-                        "timestep": int(atom["timestep"]),
-                        "track_id": int(atom["id"]),
-                        "x": atom["x"],
-                        "y": atom["y"],
-                    }
-                )
+        with load_lammpstrj(input_path) as lammps_frames:
+            print(f"Found {len(lammps_frames)} timesteps.")
+            track_writer = _open_track_writer(tracks_path, columns=LAMMPS_TRACK_COLUMNS)
+            with track_writer:
+                for frame_tracks in iter_lammps_tracks(lammps_frames):
+                    track_writer.append(frame_tracks)
 
         if save_video:
             print("Warning: --save-video is not supported for .lammpstrj input.")
 
-        df_final = pd.DataFrame(tracking_data)
-        csv_path = output_dir / "tracks.csv"
-        df_final.to_csv(csv_path, index=False)
-        print(f"Saved tracking data to {csv_path}")
+        print(f"Saved tracking data ({track_writer.rows_written} rows) to {tracks_path}")
         return
 
     # -----------------------------------------------------------------------
@@ -667,17 +695,19 @@ def main():
         model = get_lodestar_model(checkpoint, device, fp16=lodestar_fp16)
 
     print(f"\nLoading frames from {input_path}...")
-    frames = load_frames(input_path)
+    # Frames are decoded lazily on each pass, so only read-ahead frames are held in memory
+    frames = load_frames(input_path, read_ahead=read_ahead)
     if not frames:
         print("No frames found. Exiting.")
         return
     print(f"Found {len(frames)} frames.")
+    first_frame = frames[0]
 
     # Resolve crop region from config (uses first frame dimensions)
     crop_cfg = cfg_get(cfg, "crop") or {}
     crop_x = crop_y = crop_w = crop_h = None
     if crop_cfg:
-        fh, fw = frames[0].shape[:2]
+        fh, fw = first_frame.shape[:2]
         raw_w = crop_cfg.get("width")
         raw_h = crop_cfg.get("height")
         crop_w = int(raw_w * fw if isinstance(raw_w, float) and raw_w <= 1.0 else (raw_w or fw))
@@ -690,54 +720,97 @@ def main():
             crop_y = int(crop_cfg.get("y", 0))
         print(f"Crop:      x={crop_x} y={crop_y} w={crop_w} h={crop_h} (frame {fw}×{fh})")
 
+    # Open the track file up front so a missing format library fails before detection
+    track_writer = _open_track_writer(tracks_path)
+
     # 1. Detection phase
     all_detections = []
     raw_tracking_data = []
-
-    for i, frame in enumerate(tqdm(frames, desc="Detecting")):
-        detect_frame = (
-            frame[crop_y : crop_y + crop_h, crop_x : crop_x + crop_w]
-            if crop_x is not None
-            else frame
+    det_counts = []
+
+    # Streaming Trackpy links each frame in the output stage, while detection continues,
+    # and writes tracks as soon as they are final instead of keeping every detection
+    linker = None
+    if tracker == "trackpy" and streaming_link:
+        linker = StreamingLinker(
+            search_range,
+            memory=memory,
+            stub_filter=stub_filter,
+            adaptive_stop=adaptive_stop,
+            adaptive_step=adaptive_step,
         )
 
+    # With a crop, only the crop region is read (memory-mapped and zarr-backed TIFF stacks
+    # never touch the pixels outside it)
+    detect_frames = frames.crop(crop_x, crop_y, crop_w, crop_h) if crop_x is not None else frames
+
+    def detect_batch(batch):
+        """Inference stage: runs the model on a list of (cropped) frames."""
         if model_type == "rf-detr":
-            detections = model.predict(detect_frame, threshold=threshold)
+            detections = model.predict(batch, threshold=threshold)
+            # rfdetr returns a bare Detections for a single image
+            return detections if isinstance(detections, list) else [detections]
         elif model_type == "yolo":
-            results = model.predict(detect_frame, conf=threshold, device=device, verbose=False)[0]
-            detections = sv.Detections.from_ultralytics(results)
+            results = model.predict(batch, conf=threshold, device=device, verbose=False)
+            return [sv.Detections.from_ultralytics(r) for r in results]
         elif model_type == "lodestar":
-            detections = detect_lodestar(
+            return detect_lodestar_batch(
                 model,
-                detect_frame,
+                batch,
                 threshold,
                 device,
                 alpha=lodestar_alpha,
                 nms_distance=lodestar_nms_distance,
             )
 
-        # Shift bounding boxes back to full-frame coordinates
+    def collect(i, detections):
+        """Output stage: shifts one frame's detections to full-frame coordinates and stores them."""
         if crop_x is not None and len(detections) > 0:
             detections.xyxy[:, [0, 2]] += crop_x
             detections.xyxy[:, [1, 3]] += crop_y
 
+        det_counts.append(len(detections))
+        if linker is not None:
+            track_writer.append(linker.add(_detections_frame(i, detections)))
+            return
+
         all_detections.append(detections)
+        raw_tracking_data.append(_detections_frame(i, detections))
 
-        for j in range(len(detections)):
-            x1, y1, x2, y2 = detections.xyxy[j]
-            raw_tracking_data.append(
-                {
-                    "frame": i,
-                    "x": (x1 + x2) / 2,
-                    "y": (y1 + y2) / 2,
-                    "w": x2 - x1,
-                    "h": y2 - y1,
-                    "conf": detections.confidence[j] if detections.confidence is not None else 1.0,
-                }
-            )
+    if tile_size:
+        detect_h, detect_w = (crop_h, crop_w) if crop_x is not None else first_frame.shape[:2]
+        try:
+            num_tiles = len(tile_grid(detect_h, detect_w, tile_size, tile_overlap))
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Tiling:    {num_tiles} tiles of {tile_size} px, overlap {tile_overlap} px")
+        # All tiles of a batch of frames go to the model in one call
+        detector = TiledDetector(
+            AdaptiveBatchDetector(detect_batch, batch_size * num_tiles),
+            tile_size,
+            overlap=tile_overlap,
+            merge_threshold=tile_merge_threshold,
+            merge_distance=lodestar_nms_distance if model_type == "lodestar" else None,
+        )
+    else:
+        detector = AdaptiveBatchDetector(detect_batch, batch_size)
+
+    # Frames are decoded by a thread pool and detections collected by an output thread
+    # while the model runs, so the model does not wait on either
+    with tqdm(total=len(detect_frames), desc="Detecting") as progress:
+        stage_times = run_pipeline(
+            detect_frames,
+            detector,
+            collect,
+            batch_size=batch_size,
+            decode_workers=decode_workers,
+            queue_size=max(read_ahead, 1),
+            progress=progress.update,
+        )
+    print(stage_times.summary())
 
     # Detection summary — helps diagnose whether low track count is a detector problem
-    det_counts = [len(d) for d in all_detections]
     if det_counts:
         total = sum(det_counts)
         avg = total / len(det_counts)
@@ -753,12 +826,13 @@ def main():
             )
 
     # 2. Tracking phase
-    df = pd.DataFrame(raw_tracking_data)
+    df = pd.concat(raw_tracking_data, ignore_index=True) if raw_tracking_data else pd.DataFrame()
+    # Track table chunks (frame-sorted DataFrames)
     tracking_data = []
 
-    if df.empty and model_type == "rf-detr":
+    if not any(det_counts) and model_type == "rf-detr":
         # Run one probe frame at threshold=0 to show the actual score range.
-        probe = model.predict(frames[0], threshold=0.0)
+        probe = model.predict(first_frame, threshold=0.0)
         if len(probe) > 0 and probe.confidence is not None:
             max_conf = float(probe.confidence.max())
             print(
@@ -769,7 +843,13 @@ def main():
         else:
             print(f"Warning: 0 detections. The model may not be compatible with this input.")
 
-    if tracker == "trackpy":
+    if linker is not None:
+        track_writer.append(linker.close())
+        # Tracks were written during detection; they are read back below only if needed
+        tracking_data = None
+        print("Linked with Trackpy (streaming) during detection.")
+
+    elif tracker == "trackpy":
         print("Applying Trackpy (offline)...")
         if not df.empty:
             link_kwargs = {"search_range": search_range, "memory": memory}
@@ -780,7 +860,24 @@ def main():
             if stub_filter > 0:
                 df = tp.filter_stubs(df, stub_filter)
             df = df.rename(columns={"particle": "track_id"})
-            tracking_data = df.to_dict("records")
+            tracking_data = [df]
+            track_writer.append(df)
+        else:
+            print("No detections to track.")
+
+    elif tracker == "lap":
+        print("Applying KD-tree + linear assignment linking...")
+        df = link_frames(
+            tqdm(raw_tracking_data, desc="Tracking"),
+            search_range,
+            memory=memory,
+            predict=predict_velocity,
+        )
+        if not df.empty:
+            if stub_filter > 0:
+                df = df[df.groupby("track_id")["frame"].transform("size") >= stub_filter]
+            tracking_data = [df]
+            track_writer.append(df)
         else:
             print("No detections to track.")
 
@@ -791,95 +888,69 @@ def main():
             lost_track_buffer=lost_track_buffer,
             minimum_consecutive_frames=minimum_consecutive_frames,
         )
-        tracked_frames_detections = []
 
         for i, detections in enumerate(tqdm(all_detections, desc="Tracking")):
             detections = byte_tracker.update_with_detections(detections)
-            tracked_frames_detections.append(detections)
-
-            if detections.tracker_id is not None:
-                for j in range(len(detections.tracker_id)):
-                    x1, y1, x2, y2 = detections.xyxy[j]
-                    tracking_data.append(
-                        {
-                            "frame": i,
-                            "track_id": int(detections.tracker_id[j]),
-                            "x": (x1 + x2) / 2,
-                            "y": (y1 + y2) / 2,
-                            "w": x2 - x1,
-                            "h": y2 - y1,
-                            "conf": (
-                                detections.confidence[j]
-                                if detections.confidence is not None
-                                else 1.0
-                            ),
-                        }
-                    )
-            else:
-                tracked_frames_detections[-1] = sv.Detections.empty()
+            if detections.tracker_id is None or len(detections) == 0:
+                continue
+            frame_tracks = _detections_frame(i, detections)
+            frame_tracks.insert(1, "track_id", detections.tracker_id.astype(np.int64))
+            tracking_data.append(frame_tracks)
+
+            # Write each frame's tracks as soon as it is tracked
+            track_writer.append(frame_tracks)
+
+    track_writer.close()
+
+    if tracking_data is None:
+        needs_tracks = save_video or save_trajectory_image or save_hexatic_order
+        df_final = read_tracks(tracks_path) if needs_tracks else pd.DataFrame()
+    elif tracking_data:
+        df_final = pd.concat(tracking_data, ignore_index=True)
+    else:
+        df_final = pd.DataFrame()
 
     # 3. Visualization phase
     if save_video:
         print("Annotating video...")
-        box_annotator = sv.BoxAnnotator()
-        label_annotator = sv.LabelAnnotator()
-        trace_annotator = sv.TraceAnnotator(trace_length=trace_length)
-        df_tracked = pd.DataFrame(tracking_data)
-        annotated_frames = []
-
-        for i, frame in enumerate(tqdm(frames, desc="Visualizing")):
-            if not df_tracked.empty and "track_id" in df_tracked.columns:
-                frame_df = df_tracked[df_tracked["frame"] == i]
-                if not frame_df.empty:
-                    xyxy, tracker_ids = [], []
-                    for _, row in frame_df.iterrows():
-                        x, y, w, h = row["x"], row["y"], row["w"], row["h"]
-                        xyxy.append([x - w / 2, y - h / 2, x + w / 2, y + h / 2])
-                        tracker_ids.append(int(row["track_id"]))
-                    detections = sv.Detections(
-                        xyxy=np.array(xyxy, dtype=np.float32),
-                        tracker_id=np.array(tracker_ids, dtype=int),
-                        class_id=np.zeros(len(xyxy), dtype=int),
-                    )
-                else:
-                    detections = sv.Detections.empty()
-            else:
-                detections = sv.Detections.empty()
-
-            annotated_frame = frame.copy()
-            if detections.tracker_id is not None and len(detections.tracker_id) > 0:
-                labels = [f"#{tid}" for tid in detections.tracker_id]
-                annotated_frame = trace_annotator.annotate(
-                    scene=annotated_frame, detections=detections
-                )
-                annotated_frame = box_annotator.annotate(
-                    scene=annotated_frame, detections=detections
-                )
-                annotated_frame = label_annotator.annotate(
-                    scene=annotated_frame, detections=detections, labels=labels
-                )
-            annotated_frames.append(annotated_frame)
-
         video_path = output_dir / "tracking_visualization.mp4"
-        h, w = annotated_frames[0].shape[:2]
-        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-        out = cv2.VideoWriter(str(video_path), fourcc, fps, (w, h))
-        for f in annotated_frames:
-            out.write(cv2.cvtColor(f, cv2.COLOR_RGB2BGR))
-        out.release()
+        h, w = first_frame.shape[:2]
+        # Frames are annotated by a thread pool and written in order as soon as they are
+        # ready, so only a few annotated frames are in memory at a time
+        annotate = FrameAnnotator(track_boxes(df_final, len(frames)), trace_length=trace_length)
+        try:
+            video_writer = open_video_writer(
+                video_path, fps, (w, h), encoder=video_encoder, preset=ffmpeg_preset, crf=ffmpeg_crf
+            )
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+        with video_writer, tqdm(total=len(frames), desc="Visualizing") as progress:
+            write_video(
+                frames,
+                annotate,
+                video_writer,
+                workers=annotate_workers,
+                queue_size=video_queue_size,
+                progress=progress.update,
+            )
         print(f"Saved annotated video to {video_path}")
 
     # 4. Save results
-    df_final = pd.DataFrame(tracking_data)
-    csv_path = output_dir / "tracks.csv"
-    df_final.to_csv(csv_path, index=False)
-    print(f"Saved tracking data to {csv_path}")
+    print(f"Saved tracking data to {tracks_path}")
 
     if save_trajectory_image and not df_final.empty and "track_id" in df_final.columns:
         print("Rendering trajectory image...")
         img_path = output_dir / "trajectories.png"
-        _save_trajectory_image(df_final, frames[-1], img_path, colormap=trajectory_colormap)
-        print(f"Saved trajectory image to {img_path}")
+        renderer = render_trajectory_image(
+            df_final,
+            frames[-1],
+            img_path,
+            colormap=trajectory_colormap,
+            renderer=trajectory_renderer,
+        )
+        print(f"Saved trajectory image to {img_path} ({renderer})")
 
     if save_hexatic_order and not df_final.empty:
         print("Computing hexatic order parameter...")
@@ -891,7 +962,7 @@ def main():
             import matplotlib.pyplot as plt
             from hexatic_order_analysis import calc_hexatic_from_tracks
 
-            fh, fw = frames[0].shape[:2]
+            fh, fw = first_frame.shape[:2]
             frame_nums, psi6 = calc_hexatic_from_tracks(df_final, fw, fh, verbose=0)
             if frame_nums:
                 plt.figure(figsize=(10, 6))
@@ -910,6 +981,8 @@ def main():
                 "Warning: could not import hexatic_order_analysis — ensure freud is installed in lammps-scripts/.venv"
             )
 
+    frames.close()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,148 @@
+"""Frame-to-frame linking by sparse linear assignment, for dense scenes of similar particles.
+
+Each new frame's detections are matched to the active tracks by minimising the total squared
+displacement, as Trackpy does, but the matching is solved as one sparse linear assignment
+problem instead of by Trackpy's recursive search over subnetworks:
+
+- candidate links are gated with a KD-tree: a detection can only join a track whose
+  (predicted) position is within search_range;
+- the assignment uses the augmented cost matrix of Jaqaman et al. (2008): every track may
+  also end and every detection may start a new track, at a cost above any gated link,
+  so a complete matching always exists and scipy's sparse LAPJV solver
+  (min_weight_full_bipartite_matching) can be used;
+- tracks missing for up to ``memory`` frames stay active, so particles that are missed by
+  the detector for a few frames keep their id (gap closing);
+- optionally, positions are predicted with a constant-velocity model from the track's
+  last two points, which helps with drifting or flowing particles.
+
+Unlike ByteTrack's box IoU, only centre positions are used, so small, identical-looking
+particles are linked as well as large ones.
+
+Example:
+    linker = AssignmentLinker(search_range=10.0, memory=3)
+    for frame, xy in enumerate(positions_per_frame):
+        track_ids = linker.update(xy, frame)
+"""
+
+import numpy as np
+import pandas as pd
+import scipy.sparse
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+from scipy.spatial import cKDTree
+
+
+class AssignmentLinker:
+    """Assigns track ids to the detections of successive frames.
+
+    Args:
+        search_range: Maximum distance between a track's (predicted) position and a
+            detection it may be linked to.
+        memory: Frames a track may be missing and still be continued.
+        predict: Predict each track's position with its last velocity.
+    """
+
+    def __init__(self, search_range, memory=0, predict=False):
+        self.search_range = float(search_range)
+        self.memory = memory
+        self.predict = predict
+        self._next_id = 0
+        # Active tracks
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._pos = np.zeros((0, 2))
+        self._vel = np.zeros((0, 2))
+        self._last_frame = np.zeros(0, dtype=np.int64)
+
+    def _match(self, predicted, positions):
+        """Index of the track each detection is linked to, or -1 for a new track."""
+        num_tracks, num_dets = len(predicted), len(positions)
+        links = np.full(num_dets, -1, dtype=np.int64)
+        if num_tracks == 0 or num_dets == 0:
+            return links
+
+        edges = cKDTree(predicted).sparse_distance_matrix(
+            cKDTree(positions), self.search_range, output_type="ndarray"
+        )
+        if len(edges) == 0:
+            return links
+        track, det = edges["i"].astype(np.int64), edges["j"].astype(np.int64)
+
+        # Augmented matrix: rows = tracks, then "detection starts a track";
+        # columns = detections, then "track ends". Costs are kept strictly positive
+        # because the solver drops explicit zeros.
+        size = num_tracks + num_dets
+        unlinked = self.search_range**2 + 1.0
+        tiny = 1e-9 * unlinked
+        rows = np.concatenate(
+            [track, np.arange(num_tracks), num_tracks + np.arange(num_dets), num_tracks + det]
+        )
+        cols = np.concatenate(
+            [det, num_dets + np.arange(num_tracks), np.arange(num_dets), num_dets + track]
+        )
+        cost = np.concatenate(
+            [
+                edges["v"] ** 2 + tiny,
+                np.full(num_tracks, unlinked),
+                np.full(num_dets, unlinked),
+                np.full(len(edges), tiny),
+            ]
+        )
+        matrix = scipy.sparse.csr_matrix((cost, (rows, cols)), shape=(size, size))
+        row_ind, col_ind = min_weight_full_bipartite_matching(matrix)
+
+        linked = (row_ind < num_tracks) & (col_ind < num_dets)
+        links[col_ind[linked]] = row_ind[linked]
+        return links
+
+    def update(self, positions, frame):
+        """Links one frame's (N, 2) x, y positions and returns their (N,) track ids."""
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+
+        # Tracks missing for more than memory frames can no longer be continued
+        active = frame - self._last_frame <= self.memory + 1
+        ids, pos, vel, last_frame = (
+            self._ids[active],
+            self._pos[active],
+            self._vel[active],
+            self._last_frame[active],
+        )
+        gap = (frame - last_frame).astype(np.float64)
+        predicted = pos + vel * gap[:, None] if self.predict else pos
+        links = self._match(predicted, positions)
+
+        linked = links >= 0
+        track = links[linked]
+        track_ids = np.empty(len(positions), dtype=np.int64)
+        track_ids[linked] = ids[track]
+        num_new = int((~linked).sum())
+        track_ids[~linked] = np.arange(self._next_id, self._next_id + num_new)
+        self._next_id += num_new
+
+        # Linked tracks move to their new detection; new tracks start at rest
+        new_vel = np.zeros_like(positions)
+        new_vel[linked] = (positions[linked] - pos[track]) / gap[track, None]
+        unmatched = np.ones(len(ids), dtype=bool)
+        unmatched[track] = False
+        self._ids = np.concatenate([ids[unmatched], track_ids])
+        self._pos = np.concatenate([pos[unmatched], positions])
+        self._vel = np.concatenate([vel[unmatched], new_vel])
+        self._last_frame = np.concatenate(
+            [last_frame[unmatched], np.full(len(positions), frame, dtype=np.int64)]
+        )
+        return track_ids
+
+
+def link_frames(frames, search_range, memory=0, predict=False):
+    """Links an iterable of per-frame detection DataFrames (columns frame, x, y, ...).
+
+    Returns one DataFrame of all detections with an added track_id column.
+    """
+    linker = AssignmentLinker(search_range, memory=memory, predict=predict)
+    linked = []
+    for df in frames:
+        if df.empty:
+            continue
+        track_ids = linker.update(df[["x", "y"]].to_numpy(), int(df["frame"].iloc[0]))
+        linked.append(df.assign(track_id=track_ids))
+    if not linked:
+        return pd.DataFrame()
+    return pd.concat(linked, ignore_index=True)
@@ -0,0 +1,298 @@
+"""Track table writers and readers for CSV, Parquet, Feather and HDF5 output.
+
+Tracks are written incrementally: callers append per-frame (or larger, frame-sorted)
+DataFrames to a TrackWriter, which buffers about ``chunk_rows`` rows and flushes them as
+one row group / record batch / table append. A frame is never split across two flushes,
+so columnar readers can skip whole row groups when loading a frame range.
+
+Parquet and Feather need ``pyarrow``; HDF5 needs ``tables`` (PyTables).
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Output format -> file suffix
+TRACK_FORMATS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather", "hdf5": ".h5"}
+
+# Column types shared by every writer, so all row groups of a file have one schema
+TRACK_DTYPES = {
+    "frame": np.int64,
+    "timestep": np.int64,
+    "track_id": np.int64,
+    "x": np.float64,
+    "y": np.float64,
+    "w": np.float64,
+    "h": np.float64,
+    "conf": np.float64,
+}
+
+HDF5_KEY = "tracks"
+
+
+def track_format(path):
+    """Returns the track format for a file path from its suffix."""
+    suffix = Path(path).suffix.lower()
+    for fmt, fmt_suffix in TRACK_FORMATS.items():
+        if suffix == fmt_suffix or (fmt == "hdf5" and suffix == ".hdf5"):
+            return fmt
+    raise ValueError(f"Unknown track file format: {path} (expected one of {list(TRACK_FORMATS)})")
+
+
+def _typed(df):
+    """Casts known track columns to their TRACK_DTYPES type."""
+    dtypes = {col: dtype for col, dtype in TRACK_DTYPES.items() if col in df.columns}
+    return df.astype(dtypes)
+
+
+def _import_pyarrow(path):
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            f"Writing or reading {path} requires 'pyarrow'. Run 'pip install pyarrow'."
+        ) from e
+    return pyarrow
+
+
+class _CsvSink:
+    def __init__(self, path):
+        self.path = path
+        self._header = True
+
+    def write(self, df):
+        df.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+        self._header = False
+
+    def close(self):
+        pass
+
+
+class _ParquetSink:
+    def __init__(self, path):
+        self.path = path
+        self._pa = _import_pyarrow(path)
+        import pyarrow.parquet
+
+        self._pq = pyarrow.parquet
+        self._writer = None
+
+    def write(self, df):
+        if self._writer is None:
+            table = self._pa.Table.from_pandas(df, preserve_index=False)
+            self._writer = self._pq.ParquetWriter(self.path, table.schema)
+        else:
+            table = self._pa.Table.from_pandas(df, schema=self._writer.schema, preserve_index=False)
+        self._writer.write_table(table, row_group_size=len(df))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+class _FeatherSink:
+    def __init__(self, path):
+        self.path = path
+        self._pa = _import_pyarrow(path)
+        self._writer = None
+        self._schema = None
+
+    def write(self, df):
+        if self._writer is None:
+            batch = self._pa.RecordBatch.from_pandas(df, preserve_index=False)
+            self._schema = batch.schema
+            self._writer = self._pa.ipc.new_file(str(self.path), self._schema)
+        else:
+            batch = self._pa.RecordBatch.from_pandas(df, schema=self._schema, preserve_index=False)
+        self._writer.write_batch(batch)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+class _Hdf5Sink:
+    def __init__(self, path):
+        self.path = path
+        try:
+            self._store = pd.HDFStore(path, mode="w")
+        except ImportError as e:
+            raise ImportError(f"Writing {path} requires 'tables'. Run 'pip install tables'.") from e
+
+    def write(self, df):
+        self._store.append(HDF5_KEY, df, format="table", data_columns=["frame"], index=False)
+
+    def close(self):
+        if HDF5_KEY in self._store:
+            self._store.create_table_index(HDF5_KEY, columns=["frame"])
+        self._store.close()
+
+
+_SINKS = {"csv": _CsvSink, "parquet": _ParquetSink, "feather": _FeatherSink, "hdf5": _Hdf5Sink}
+
+
+class TrackWriter:
+    """Incrementally writes a frame-sorted track table in any of TRACK_FORMATS.
+
+    Append DataFrames as frames are tracked; rows are buffered and flushed roughly every
+    ``chunk_rows`` rows, always on a frame boundary (the most recent frame stays buffered
+    until a later frame arrives or the writer is closed). Use as a context manager or call
+    close() to write the remaining rows.
+
+    Example:
+        with TrackWriter(output_dir / "tracks.parquet") as writer:
+            for frame_df in per_frame_tracks:
+                writer.append(frame_df)
+    """
+
+    def __init__(self, path, fmt=None, chunk_rows=1_000_000, columns=None):
+        self.path = Path(path)
+        self.format = fmt or track_format(self.path)
+        self.chunk_rows = chunk_rows
+        self.rows_written = 0
+        self._sink = _SINKS[self.format](self.path)
+        self._pending = []
+        self._pending_rows = 0
+        self._columns = list(columns) if columns is not None else None
+
+    def append(self, df):
+        """Buffers a DataFrame of tracks; its frames must not precede already flushed frames."""
+        if df.empty:
+            return
+        if self._columns is None:
+            self._columns = list(df.columns)
+        self._pending.append(_typed(df))
+        self._pending_rows += len(df)
+        if self._pending_rows >= self.chunk_rows:
+            self._flush(final=False)
+
+    def _flush(self, final):
+        data = pd.concat(self._pending, ignore_index=True)[self._columns]
+        frames = data["frame"].to_numpy()
+        if len(frames) > 1 and np.any(frames[1:] < frames[:-1]):
+            data = data.sort_values("frame", kind="stable", ignore_index=True)
+            frames = data["frame"].to_numpy()
+
+        # Row index where each frame starts; the final frame is held back until closing
+        starts = np.flatnonzero(np.diff(frames)) + 1
+        stop = len(data) if final else (starts[-1] if len(starts) else 0)
+
+        begin = 0
+        while begin < stop:
+            # Cut at the first frame boundary at least chunk_rows past begin
+            later = starts[starts >= begin + self.chunk_rows]
+            end = min(int(later[0]), stop) if len(later) else stop
+            self._sink.write(data.iloc[begin:end])
+            self.rows_written += end - begin
+            begin = end
+
+        rest = data.iloc[stop:]
+        self._pending = [rest] if len(rest) else []
+        self._pending_rows = len(rest)
+
+    def close(self):
+        """Flushes all buffered rows and closes the file."""
+        if self._pending:
+            self._flush(final=True)
+        if self.rows_written == 0:
+            # Still write a file (with only a header / schema) when there were no tracks
+            self._sink.write(_typed(pd.DataFrame(columns=self._columns or list(TRACK_DTYPES))))
+        self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_tracks(track_chunks, path, fmt=None, chunk_rows=1_000_000, columns=None):
+    """Writes an iterable of frame-sorted track DataFrames to path. Returns the row count."""
+    with TrackWriter(path, fmt=fmt, chunk_rows=chunk_rows, columns=columns) as writer:
+        for chunk in track_chunks:
+            writer.append(chunk)
+    return writer.rows_written
+
+
+def read_tracks(path, frame_range=None, columns=None):
+    """Loads a track table written by TrackWriter (or any tracks CSV).
+
+    Args:
+        path: Track file; the format is taken from its suffix.
+        frame_range: Optional (start, stop) half-open range of frame numbers to load.
+            Parquet row groups and Feather record batches outside it are skipped, and
+            HDF5 uses its frame index.
+        columns: Optional list of columns to load.
+
+    Returns:
+        pd.DataFrame
+    """
+    fmt = track_format(path)
+    read_columns = None
+    if columns is not None:
+        read_columns = list(columns)
+        if frame_range is not None and "frame" not in read_columns:
+            read_columns.append("frame")
+
+    if fmt == "parquet":
+        _import_pyarrow(path)
+        filters = None
+        if frame_range is not None:
+            filters = [("frame", ">=", frame_range[0]), ("frame", "<", frame_range[1])]
+        df = pd.read_parquet(path, columns=read_columns, filters=filters)
+    elif fmt == "feather":
+        df = _read_feather(path, frame_range, read_columns)
+    elif fmt == "hdf5":
+        where = None
+        if frame_range is not None:
+            where = f"frame >= {int(frame_range[0])} & frame < {int(frame_range[1])}"
+        df = pd.read_hdf(path, HDF5_KEY, where=where, columns=read_columns)
+    else:
+        if frame_range is None:
+            df = pd.read_csv(path, usecols=read_columns)
+        else:
+            chunks = pd.read_csv(path, usecols=read_columns, chunksize=1_000_000)
+            df = pd.concat(
+                chunk[(chunk["frame"] >= frame_range[0]) & (chunk["frame"] < frame_range[1])]
+                for chunk in chunks
+            )
+
+    df = df.reset_index(drop=True)
+    return df[list(columns)] if columns is not None else df
+
+
+def _read_feather(path, frame_range, columns):
+    """Reads the record batches of a memory-mapped Feather file that overlap frame_range."""
+    pa = _import_pyarrow(path)
+    import pyarrow.compute as pc
+
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        batches = []
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if frame_range is not None:
+                frames = batch.column("frame")
+                bounds = pc.min_max(frames)
+                if (
+                    bounds["max"].as_py() < frame_range[0]
+                    or bounds["min"].as_py() >= frame_range[1]
+                ):
+                    continue
+                mask = pc.and_(
+                    pc.greater_equal(frames, frame_range[0]), pc.less(frames, frame_range[1])
+                )
+                batch = batch.filter(mask)
+            if columns is not None:
+                batch = batch.select(columns)
+            batches.append(batch)
+
+        if not batches:
+            schema = (
+                reader.schema
+                if columns is None
+                else pa.schema([reader.schema.field(name) for name in columns])
+            )
+            return schema.empty_table().to_pandas()
+        return pa.Table.from_batches(batches).to_pandas()
@@ -0,0 +1,135 @@
+"""Streaming Trackpy linking: per-frame detections in, finished track rows out.
+
+tp.link_df needs every detection of the movie in one DataFrame before it can link any of
+them. StreamingLinker runs the same Crocker-Grier linker (trackpy.linking.Linker, as used
+by tp.link_iter) one frame at a time, as frames come out of detection, and hands back the
+rows that can be written.
+
+A row is final once its track is decided: either the track already has stub_filter
+points (it survives tp.filter_stubs whatever happens next), or it has been missing for
+more than ``memory`` frames (it can no longer be extended). Rows are released in frame
+order as soon as every track in their frame is decided; rows of tracks that end with
+fewer than stub_filter points are dropped. Only the frames still waiting on an undecided
+track are held in memory, at most about stub_filter * (memory + 1) frames.
+
+The result matches tp.link_df followed by tp.filter_stubs on the whole movie.
+
+Example:
+    linker = StreamingLinker(search_range=10.0, memory=3, stub_filter=5)
+    for frame_df in per_frame_detections:
+        writer.append(linker.add(frame_df))
+    writer.append(linker.close())
+"""
+
+import collections
+
+import numpy as np
+import pandas as pd
+
+# Trackpy's position column order for 2D data
+POS_COLUMNS = ["y", "x"]
+
+
+class StreamingLinker:
+    """Links detections frame by frame and releases the rows of decided tracks.
+
+    Args:
+        search_range: Maximum distance a particle moves between frames.
+        memory: Frames a particle may be missing and still keep its track.
+        stub_filter: Minimum number of points for a track to be kept (0 keeps all).
+        adaptive_stop, adaptive_step: Trackpy adaptive search (see tp.link_df).
+    """
+
+    def __init__(
+        self, search_range, memory=0, stub_filter=0, adaptive_stop=None, adaptive_step=0.95
+    ):
+        from trackpy.linking import Linker
+
+        self.memory = memory
+        self.stub_filter = stub_filter
+        self._linker = Linker(
+            search_range, memory=memory, adaptive_stop=adaptive_stop, adaptive_step=adaptive_step
+        )
+        self._started = False
+        self._last_frame = None
+        # Per track id (trackpy numbers tracks 0, 1, 2, ...): points so far, last frame seen
+        self._length = np.zeros(0, dtype=np.int64)
+        self._last_seen = np.zeros(0, dtype=np.int64)
+        # (frame, DataFrame with track_id) not yet released, oldest first
+        self._pending = collections.deque()
+
+    @property
+    def pending_frames(self):
+        """Number of linked frames held back until their tracks are decided."""
+        return len(self._pending)
+
+    def add(self, df):
+        """Links one frame of detections and returns the track rows that are now final.
+
+        Args:
+            df: Detections of a single frame, with at least columns frame, x and y. Frames
+                must be added in increasing order; empty frames may be skipped or passed.
+
+        Returns:
+            pd.DataFrame of final rows (the input columns plus track_id), frame-sorted;
+            may be empty.
+        """
+        if df.empty:
+            return pd.DataFrame()
+        frame = int(df["frame"].iloc[0])
+        if self._last_frame is not None and frame <= self._last_frame:
+            raise ValueError(f"Frame {frame} added after frame {self._last_frame}")
+
+        if not self._started:
+            self._linker.init_level(df[POS_COLUMNS].to_numpy(dtype=np.float64), frame)
+            self._started = True
+        else:
+            # Frames with no detections are still levels for link_df, which counts
+            # missing frames against memory
+            for empty_frame in range(self._last_frame + 1, frame):
+                self._linker.next_level(np.empty((0, len(POS_COLUMNS))), empty_frame)
+            self._linker.next_level(df[POS_COLUMNS].to_numpy(dtype=np.float64), frame)
+        self._last_frame = frame
+
+        ids = np.asarray(self._linker.particle_ids, dtype=np.int64)
+        if ids.max() >= len(self._length):
+            grow = ids.max() + 1 - len(self._length)
+            self._length = np.concatenate([self._length, np.zeros(grow, dtype=np.int64)])
+            self._last_seen = np.concatenate([self._last_seen, np.zeros(grow, dtype=np.int64)])
+        np.add.at(self._length, ids, 1)
+        self._last_seen[ids] = frame
+
+        self._pending.append((frame, df.assign(track_id=ids)))
+        return self._release()
+
+    def _decided(self, ids):
+        """Mask of the tracks whose survival of the stub filter is already known."""
+        long_enough = self._length[ids] >= self.stub_filter
+        ended = self._last_frame - self._last_seen[ids] > self.memory
+        return long_enough | ended
+
+    def _release(self):
+        """Pops the leading pending frames whose tracks are all decided."""
+        released = []
+        while self._pending:
+            _, frame_df = self._pending[0]
+            ids = frame_df["track_id"].to_numpy()
+            if not self._decided(ids).all():
+                break
+            self._pending.popleft()
+            keep = self._length[ids] >= self.stub_filter
+            released.append(frame_df if keep.all() else frame_df[keep])
+        if not released:
+            return pd.DataFrame()
+        return pd.concat(released, ignore_index=True)
+
+    def close(self):
+        """Ends all tracks and returns the remaining final rows."""
+        released = []
+        while self._pending:
+            _, frame_df = self._pending.popleft()
+            keep = self._length[frame_df["track_id"].to_numpy()] >= self.stub_filter
+            released.append(frame_df[keep])
+        if not released:
+            return pd.DataFrame()
+        return pd.concat(released, ignore_index=True)
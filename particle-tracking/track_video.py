@@ -0,0 +1,283 @@
+"""Annotated tracking video: per-frame box lookup, annotation and streaming encoding.
+
+track_boxes sorts a track table by frame once and keeps a frame → row-range index, so
+looking up the boxes (and trace history) of a frame is a slice instead of a scan of the
+whole table. Because traces are read from the track table rather than accumulated by a
+stateful sv.TraceAnnotator, every frame can be annotated independently:
+write_video annotates frames in a thread pool and writes them in frame order as soon as
+they are ready, holding at most ``queue_size`` annotated frames in memory.
+
+Frames are encoded with OpenCV (mp4v) or piped as raw BGR to an ffmpeg subprocess
+(libx264 with a software preset, so the output does not depend on the GPU).
+
+Example:
+    annotate = FrameAnnotator(track_boxes(df_tracked, len(frames)), trace_length=30)
+    with open_video_writer("tracks.mp4", fps=30, size=(w, h), encoder="ffmpeg") as writer:
+        write_video(frames, annotate, writer, workers=4)
+"""
+
+import collections
+import shutil
+import subprocess
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+
+VIDEO_ENCODERS = ("opencv", "ffmpeg")
+DEFAULT_FFMPEG_PRESET = "veryfast"
+DEFAULT_FFMPEG_CRF = 23
+
+
+class TrackBoxes(NamedTuple):
+    """Tracked boxes sorted by frame: the rows of frame i are starts[i]:starts[i + 1]."""
+
+    xyxy: np.ndarray  # (N, 4) float32
+    track_id: np.ndarray  # (N,) int
+    starts: np.ndarray  # (num_frames + 1,) row index where each frame begins
+
+    def detections(self, frame_idx):
+        """sv.Detections of the tracked boxes in one frame."""
+        import supervision as sv
+
+        start, stop = self.starts[frame_idx], self.starts[frame_idx + 1]
+        if start == stop:
+            return sv.Detections.empty()
+        return sv.Detections(
+            xyxy=self.xyxy[start:stop],
+            tracker_id=self.track_id[start:stop],
+            class_id=np.zeros(stop - start, dtype=int),
+        )
+
+    def traces(self, frame_idx, trace_length):
+        """Box centres of each track in frame frame_idx over its last trace_length frames.
+
+        Returns one (K, 2) float32 array per track, oldest point first, in the order of the
+        tracks' ids.
+        """
+        first = max(frame_idx - trace_length + 1, 0)
+        current = self.track_id[self.starts[frame_idx] : self.starts[frame_idx + 1]]
+        window = slice(self.starts[first], self.starts[frame_idx + 1])
+        track_id, xyxy = self.track_id[window], self.xyxy[window]
+
+        in_frame = np.isin(track_id, current)
+        track_id, xyxy = track_id[in_frame], xyxy[in_frame]
+        centers = np.column_stack([(xyxy[:, 0] + xyxy[:, 2]) / 2, (xyxy[:, 1] + xyxy[:, 3]) / 2])
+        order = np.argsort(track_id, kind="stable")
+        splits = np.flatnonzero(np.diff(track_id[order])) + 1
+        return np.split(centers[order], splits) if len(order) else []
+
+
+def track_boxes(df_tracked, num_frames):
+    """Builds TrackBoxes from a track table (frame, track_id, x, y, w, h) in one pass."""
+    if df_tracked.empty or "track_id" not in df_tracked.columns:
+        return TrackBoxes(
+            np.empty((0, 4), dtype=np.float32),
+            np.empty(0, dtype=int),
+            np.zeros(num_frames + 1, dtype=np.intp),
+        )
+
+    frame = df_tracked["frame"].to_numpy()
+    order = np.argsort(frame, kind="stable")
+    x, y, w, h = (df_tracked[col].to_numpy(dtype=np.float64)[order] for col in "xywh")
+    xyxy = np.column_stack([x - w / 2, y - h / 2, x + w / 2, y + h / 2]).astype(np.float32)
+    track_id = df_tracked["track_id"].to_numpy(dtype=int)[order]
+    starts = np.searchsorted(frame[order], np.arange(num_frames + 1))
+    return TrackBoxes(xyxy, track_id, starts)
+
+
+class FrameAnnotator:
+    """Draws the traces, boxes and #id labels of the tracked particles on one frame.
+
+    Called as annotate(frame_idx, frame) with an RGB frame; returns the annotated frame as
+    BGR for the video writer. Holds no per-frame state, so frames can be annotated in any
+    order and from several threads.
+    """
+
+    def __init__(self, boxes, trace_length=30, trace_thickness=2):
+        import supervision as sv
+
+        self.boxes = boxes
+        self.trace_length = trace_length
+        self.trace_thickness = trace_thickness
+        self._box_annotator = sv.BoxAnnotator()
+        self._label_annotator = sv.LabelAnnotator()
+        # sv.TraceAnnotator's default colour for class 0 (all tracked boxes)
+        self._trace_color = sv.ColorPalette.DEFAULT.by_idx(0).as_bgr()
+
+    def __call__(self, frame_idx, frame):
+        detections = self.boxes.detections(frame_idx)
+        annotated = frame.copy()
+        if len(detections) > 0:
+            traces = [
+                trace.astype(np.int32)
+                for trace in self.boxes.traces(frame_idx, self.trace_length)
+                if len(trace) > 1
+            ]
+            if traces:
+                cv2.polylines(annotated, traces, False, self._trace_color, self.trace_thickness)
+            labels = [f"#{tid}" for tid in detections.tracker_id]
+            annotated = self._box_annotator.annotate(scene=annotated, detections=detections)
+            annotated = self._label_annotator.annotate(
+                scene=annotated, detections=detections, labels=labels
+            )
+        return cv2.cvtColor(annotated, cv2.COLOR_RGB2BGR)
+
+
+class _VideoWriter(ABC):
+    """Context-managed video writer; an exception inside the with block aborts the file."""
+
+    @abstractmethod
+    def write(self, frame_bgr):
+        """Appends one BGR frame."""
+
+    @abstractmethod
+    def close(self):
+        """Finishes the video file."""
+
+    def abort(self):
+        """Releases the writer after a failure; the output file may be incomplete."""
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class _OpenCvWriter(_VideoWriter):
+    def __init__(self, path, fps, size):
+        self._out = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+        if not self._out.isOpened():
+            raise OSError(f"Could not open video writer for {path}")
+
+    def write(self, frame_bgr):
+        self._out.write(frame_bgr)
+
+    def close(self):
+        self._out.release()
+
+
+class _FfmpegWriter(_VideoWriter):
+    def __init__(self, path, fps, size, preset=DEFAULT_FFMPEG_PRESET, crf=DEFAULT_FFMPEG_CRF):
+        executable = shutil.which("ffmpeg")
+        if executable is None:
+            raise FileNotFoundError(
+                "ffmpeg not found on PATH. Install ffmpeg or use the opencv video encoder."
+            )
+        width, height = size
+        command = [
+            executable,
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "bgr24",
+            "-s",
+            f"{width}x{height}",
+            "-r",
+            str(fps),
+            "-i",
+            "-",
+            # yuv420p needs even dimensions
+            "-vf",
+            "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            "-c:v",
+            "libx264",
+            "-preset",
+            preset,
+            "-crf",
+            str(crf),
+            "-pix_fmt",
+            "yuv420p",
+            str(path),
+        ]
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        try:
+            if self._process.poll() is not None:
+                raise OSError(f"ffmpeg exited with status {self._process.returncode}")
+        except BaseException:
+            self.abort()
+            raise
+
+    def write(self, frame_bgr):
+        self._process.stdin.write(np.ascontiguousarray(frame_bgr, dtype=np.uint8).data)
+
+    def close(self):
+        self._process.stdin.close()
+        if self._process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with status {self._process.returncode}")
+
+    def abort(self):
+        self._process.kill()
+        self._process.stdin.close()
+        self._process.wait()
+
+
+def open_video_writer(
+    path, fps, size, encoder="opencv", preset=DEFAULT_FFMPEG_PRESET, crf=DEFAULT_FFMPEG_CRF
+):
+    """Opens a video writer taking BGR frames of size (width, height).
+
+    Args:
+        encoder: "opencv" (mp4v through cv2.VideoWriter) or "ffmpeg" (libx264 through an
+            ffmpeg subprocess, using the given x264 preset and CRF quality).
+
+    Raises:
+        OSError: The video file cannot be opened, or ffmpeg is not installed.
+    """
+    if encoder == "ffmpeg":
+        return _FfmpegWriter(path, fps, size, preset=preset, crf=crf)
+    if encoder == "opencv":
+        return _OpenCvWriter(path, fps, size)
+    raise ValueError(f"Unknown video encoder {encoder!r} (expected one of {VIDEO_ENCODERS})")
+
+
+def write_video(frames, annotate, writer, workers=2, queue_size=8, progress=None):
+    """Annotates every frame in a thread pool and writes the results in frame order.
+
+    Args:
+        frames: FrameSource (or list) of RGB frames. Sources with parallel reads are
+            decoded by the workers; others (videos) are read in order.
+        annotate: Called as annotate(index, frame); returns the BGR frame to write.
+        writer: Object with a write(frame) method, e.g. from open_video_writer.
+        workers: Annotation threads.
+        queue_size: Maximum frames being annotated or waiting to be written.
+        progress: Optional callable invoked as progress(1) after each written frame.
+    """
+    queue_size = max(queue_size, 1)
+
+    def job(index, frame=None):
+        return annotate(index, frames[index] if frame is None else frame)
+
+    if getattr(frames, "parallel_reads", True):
+        jobs = ((index,) for index in range(len(frames)))
+    else:
+        jobs = enumerate(frames)
+
+    pending = collections.deque()
+
+    def write_next():
+        writer.write(pending.popleft().result())
+        if progress is not None:
+            progress(1)
+
+    with ThreadPoolExecutor(max(workers, 1), thread_name_prefix="annotate") as pool:
+        try:
+            for args in jobs:
+                pending.append(pool.submit(job, *args))
+                if len(pending) >= queue_size:
+                    write_next()
+            while pending:
+                write_next()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,156 @@
+"""Static image of every trajectory, coloured from track start to track end.
+
+All segments are built at once: the track table is sorted by (track_id, frame), consecutive
+rows of the same track form a segment, and each segment's progress along its track (0 = first
+segment, 1 = last) selects its colour. Two renderers draw them:
+
+- matplotlib adds all segments as a single LineCollection over the frame, with a colourbar;
+- opencv rasterises the segments straight into the frame with cv2.polylines, one call per
+  colour of the colormap. Use it for millions of segments, where matplotlib gets slow and
+  memory-hungry. The image is written at the frame's own resolution, without a colourbar.
+
+"auto" picks opencv above RASTER_SEGMENT_THRESHOLD segments.
+
+Example:
+    render_trajectory_image(df_tracked, frames[-1], "trajectories.png", colormap="plasma")
+"""
+
+import numpy as np
+
+TRAJECTORY_RENDERERS = ("auto", "matplotlib", "opencv")
+RASTER_SEGMENT_THRESHOLD = 200_000
+
+_LINE_WIDTH = 1.0
+_ALPHA = 0.8
+# Fractional bits of the vertex coordinates passed to cv2.polylines
+_SHIFT = 4
+
+
+def trajectory_segments(df_tracked):
+    """(M, 2, 2) x, y segments of all tracks and their (M,) progress along the track.
+
+    Segments join consecutive detections of a track in frame order and are grouped by
+    track_id. Progress runs linearly from 0 at a track's first segment to 1 at its last;
+    a track with a single segment gets 0, and single-detection tracks have no segments.
+    """
+    track_ids = df_tracked["track_id"].to_numpy()
+    order = np.lexsort((df_tracked["frame"].to_numpy(), track_ids))
+    track_ids = track_ids[order]
+    points = np.stack(
+        [df_tracked["x"].to_numpy(np.float64)[order], df_tracked["y"].to_numpy(np.float64)[order]],
+        axis=1,
+    )
+
+    # A segment starts at every row that is followed by a row of the same track
+    starts = np.flatnonzero(track_ids[:-1] == track_ids[1:])
+    segments = np.stack([points[starts], points[starts + 1]], axis=1)
+
+    # Position of each segment within its track, and the track's segment count
+    first_row = np.flatnonzero(np.r_[True, track_ids[1:] != track_ids[:-1]])
+    track_of_row = np.cumsum(np.r_[True, track_ids[1:] != track_ids[:-1]]) - 1
+    track = track_of_row[starts]
+    index = starts - first_row[track]
+    count = np.bincount(track, minlength=len(first_row))[track]
+    progress = index / np.maximum(count - 1, 1)
+    return segments, progress
+
+
+def _render_matplotlib(segments, progress, background_frame, output_path, cmap):
+    import matplotlib.pyplot as plt
+    from matplotlib.cm import ScalarMappable
+    from matplotlib.collections import LineCollection
+
+    fig, ax = plt.subplots(
+        figsize=(background_frame.shape[1] / 100, background_frame.shape[0] / 100), dpi=100
+    )
+    ax.imshow(background_frame)
+    ax.set_axis_off()
+
+    lc = LineCollection(segments, cmap=cmap, linewidth=_LINE_WIDTH, alpha=_ALPHA)
+    lc.set_array(progress)
+    lc.set_clim(0, 1)
+    ax.add_collection(lc)
+
+    plt.colorbar(
+        ScalarMappable(cmap=cmap),
+        ax=ax,
+        orientation="vertical",
+        fraction=0.02,
+        pad=0.01,
+        label="Track progress  (start → end)",
+    )
+    plt.tight_layout(pad=0)
+    fig.savefig(str(output_path), dpi=150, bbox_inches="tight")
+    plt.close(fig)
+
+
+def rasterize_trajectories(segments, progress, background_frame, cmap, thickness=1):
+    """Draw segments onto a BGR copy of an RGB (or grayscale) frame with OpenCV.
+
+    Colours are looked up in the colormap the way matplotlib does (cmap.N entries), and
+    segments are blended over the frame with the same opacity as the matplotlib renderer.
+    Later (higher-progress) colours are drawn on top.
+    """
+    import cv2
+
+    frame = np.asarray(background_frame)
+    if frame.dtype != np.uint8:
+        frame = cv2.normalize(frame, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+    if frame.ndim == 2:
+        image = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+    else:
+        image = cv2.cvtColor(np.ascontiguousarray(frame[..., :3]), cv2.COLOR_RGB2BGR)
+
+    lut = np.round(cmap(np.arange(cmap.N))[:, 2::-1] * 255).astype(int)
+    color_index = np.minimum((progress * cmap.N).astype(np.int64), cmap.N - 1)
+    order = np.argsort(color_index, kind="stable")
+    color_index = color_index[order]
+    vertices = np.round(segments[order] * (1 << _SHIFT)).astype(np.int32)
+    bounds = np.flatnonzero(np.r_[True, color_index[1:] != color_index[:-1], True])
+
+    overlay = image.copy()
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        cv2.polylines(
+            overlay,
+            list(vertices[lo:hi]),
+            False,
+            tuple(int(c) for c in lut[color_index[lo]]),
+            thickness,
+            cv2.LINE_AA,
+            _SHIFT,
+        )
+    # Pixels without lines are equal in both images, so only the lines are blended
+    return cv2.addWeighted(overlay, _ALPHA, image, 1 - _ALPHA, 0)
+
+
+def render_trajectory_image(
+    df_tracked, background_frame, output_path, colormap="plasma", renderer="auto"
+):
+    """Render all trajectories onto background_frame and save the image to output_path.
+
+    Each trajectory is drawn as a polyline whose colour shifts from the start of the
+    colourmap (start of track) to the end of the colourmap (end of track), making it
+    easy to see where particles came from and where they went.
+
+    Returns the renderer that was used.
+    """
+    import matplotlib
+
+    if renderer not in TRAJECTORY_RENDERERS:
+        raise ValueError(
+            f"Unknown trajectory renderer {renderer!r}; use one of {TRAJECTORY_RENDERERS}"
+        )
+    cmap = matplotlib.colormaps[colormap]
+    segments, progress = trajectory_segments(df_tracked)
+
+    if renderer == "auto":
+        renderer = "opencv" if len(segments) > RASTER_SEGMENT_THRESHOLD else "matplotlib"
+    if renderer == "opencv":
+        import cv2
+
+        image = rasterize_trajectories(segments, progress, background_frame, cmap)
+        if not cv2.imwrite(str(output_path), image):
+            raise OSError(f"Could not write trajectory image {output_path}")
+    else:
+        _render_matplotlib(segments, progress, background_frame, output_path, cmap)
+    return renderer